@@ -0,0 +1,487 @@
+"""
+원본 자막 백업 저장소 (내용 주소 방식)
+
+원본을 덮어쓰기 전에 파일마다 옆에 .bak 복사본(shutil.copy2)을 만드는 대신,
+처리 폴더의 .srt_backups/ 하나에 내용 해시 이름으로 압축해서 저장합니다.
+
+    .srt_backups/
+        index.jsonl                  경로 → 백업 버전 (백업마다 한 줄 덧붙이는 로그)
+        objects/ab/ab12….gz          내용(SHA-256) 하나당 압축 파일 하나 (zstandard 가 있으면 .zst)
+
+- 같은 내용은 한 번만 저장 (재처리/같은 자막 여러 벌이어도 새로 쓰지 않음)
+- 압축 파일은 쓰는 쪽마다 다른 임시 파일에 쓴 뒤 교체, 색인은 파일을 다 쓴 뒤에 기록
+  → 중간에 끊겨도 색인이 가리키는 백업은 온전, 같은 내용을 동시에 백업해도 실패하지 않음
+- --jobs 작업자 프로세스에서도 같은 저장소를 사용 (색인은 덧붙이기만 하므로 잠금 없음)
+
+사용법:
+    python backup_store.py stats "C:/Subtitles"
+    python backup_store.py list "C:/Subtitles/a.srt"
+    python backup_store.py restore "C:/Subtitles/a.srt" [--version N] [-o 출력.srt]
+    python backup_store.py restore "C:/Subtitles/시리즈"          # 폴더 아래 백업된 파일 전부
+    python backup_store.py prune "C:/Subtitles" [--keep 3] [--days 90] [--missing]
+    python backup_store.py migrate "C:/Subtitles"                # 기존 .srt.bak 을 저장소로 옮기고 삭제
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+from srt_stream import atomic_open
+
+try:
+    import zstandard
+except ImportError:  # 선택 의존성: 없으면 gzip
+    zstandard = None
+
+
+BACKUP_DIR_NAME = ".srt_backups"
+INDEX_NAME = "index.jsonl"
+OBJECTS_DIR = "objects"
+LEGACY_SUFFIX = ".bak"
+
+CODEC_GZIP = ".gz"
+CODEC_ZSTD = ".zst"
+
+
+# ────────────────────────────────────────────────────────────────
+# 1. 압축
+# ────────────────────────────────────────────────────────────────
+
+def default_codec() -> str:
+    return CODEC_ZSTD if zstandard is not None else CODEC_GZIP
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def decompress(raw: bytes, codec: str) -> bytes:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd 로 압축된 백업입니다. pip install zstandard 후 다시 실행하세요")
+        return zstandard.ZstdDecompressor().decompress(raw)
+    return gzip.decompress(raw)
+
+
+# ────────────────────────────────────────────────────────────────
+# 2. 저장소
+# ────────────────────────────────────────────────────────────────
+
+class BackupEntry:
+    """색인에 기록된 백업 한 버전"""
+
+    __slots__ = ("path", "hash", "size", "mtime_ns", "created", "codec")
+
+    def __init__(self, path, hash, size, mtime_ns, created, codec=CODEC_GZIP):
+        self.path = path            # 저장소 기준 경로 (처리 폴더 기준 상대 경로, / 구분)
+        self.hash = hash            # 원본 내용 SHA-256
+        self.size = size            # 원본 크기 (압축 전)
+        self.mtime_ns = mtime_ns    # 백업 당시 원본 수정 시각
+        self.created = created      # 백업 시각
+        self.codec = codec          # 내용 파일 압축 방식 (확장자)
+
+    def to_json(self) -> str:
+        return json.dumps({"path": self.path, "hash": self.hash, "size": self.size,
+                           "mtime_ns": self.mtime_ns, "created": self.created,
+                           "codec": self.codec}, ensure_ascii=False)
+
+
+class BackupStore:
+    """
+    백업 저장소 하나 (여러 스레드에서 안전하게 사용)
+    경로는 base(기본: 저장소 폴더의 상위 = 처리 폴더) 기준 상대 경로로 기록, base 밖이면 절대 경로
+
+    색인은 백업 한 번에 한 줄을 덧붙이는 로그(JSON Lines)라서 파일마다 쓰는 양이 한 줄뿐이고,
+    --jobs 작업자 프로세스들이 같은 파일에 동시에 덧붙여도 됨 (O_APPEND).
+    조회/복원/정리할 때만 전체를 읽음 (정리할 때 다시 써서 압축)
+    """
+
+    def __init__(self, root: Path, base: Path | None = None):
+        self.root = Path(root).resolve()
+        self.base = Path(base).resolve() if base else self.root.parent
+        self.objects = self.root / OBJECTS_DIR
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / INDEX_NAME
+        self.codec = default_codec()
+        self._prefix = str(self.base) + os.sep
+        self._lock = threading.Lock()
+        self._log = None            # 색인 덧붙이기용 파일 (처음 백업할 때 엶)
+        self._entries = None        # {경로 키: {해시: BackupEntry}} (처음 조회할 때 읽음)
+        self.bytes_written = 0      # 이 인스턴스가 새로 쓴 압축 바이트
+        self.deduplicated = 0       # 이미 있는 내용이라 쓰지 않은 백업 수
+
+    def key(self, path: Path) -> str:
+        """색인 키 (base 기준 상대 경로, / 구분)"""
+        path = os.path.abspath(path)
+        if path.startswith(self._prefix):
+            path = path[len(self._prefix):]
+        return path.replace(os.sep, "/")
+
+    def source_path(self, key: str) -> Path:
+        """색인 키 → 원본 경로"""
+        path = Path(key)
+        return path if path.is_absolute() else self.base / path
+
+    def object_path(self, digest: str, codec: str) -> Path:
+        return self.objects / digest[:2] / (digest + codec)
+
+    def find_object(self, digest: str) -> str | None:
+        """이미 저장된 내용이면 그 압축 방식, 없으면 None"""
+        for codec in (self.codec, CODEC_GZIP, CODEC_ZSTD):
+            if self.object_path(digest, codec).exists():
+                return codec
+        return None
+
+    # ── 백업 ────────────────────────────────────────────────────
+
+    def backup(self, path: Path, data: bytes | None = None,
+               mtime_ns: int | None = None) -> tuple[str, int]:
+        """
+        원본 내용을 저장소에 백업합니다. (data 가 없으면 파일을 읽음)
+
+        Returns:
+            (내용 해시, 새로 쓴 압축 바이트 수 - 이미 있는 내용이면 0)
+        """
+        if data is None:
+            data = Path(path).read_bytes()
+        if mtime_ns is None:
+            mtime_ns = os.stat(path).st_mtime_ns
+        digest = hashlib.sha256(data).hexdigest()
+
+        written = 0
+        codec = self.find_object(digest)
+        if codec is None:
+            # 내용 파일 먼저 (임시 파일 → 교체), 그다음 색인
+            codec = self.codec
+            raw = compress(data, codec)
+            target = self.object_path(digest, codec)
+            target.parent.mkdir(exist_ok=True)
+            try:
+                with atomic_open(target, "wb") as f:
+                    f.write(raw)
+                written = len(raw)
+            except FileNotFoundError:
+                # 같은 내용을 동시에 백업한 다른 작업자가 이미 저장했으면 성공으로 봄
+                if not target.exists():
+                    raise
+
+        entry = BackupEntry(self.key(path), digest, len(data), mtime_ns, time.time(), codec)
+        with self._lock:
+            if self._log is None:
+                self._log = open(self.index_path, "a", encoding="utf-8")
+            self._log.write(entry.to_json() + "\n")
+            self._log.flush()       # 한 줄을 write 한 번으로 (다른 프로세스 줄과 섞이지 않게)
+            if self._entries is not None:
+                self._entries.setdefault(entry.path, {})[digest] = entry
+            if written:
+                self.bytes_written += written
+            else:
+                self.deduplicated += 1
+        return digest, written
+
+    # ── 조회 / 복원 ─────────────────────────────────────────────
+
+    def _load(self) -> dict:
+        """색인 로그 전체 읽기 (같은 경로/내용은 마지막 줄, 중간에 끊긴 줄은 무시)"""
+        if self._entries is None:
+            entries = {}
+            try:
+                with open(self.index_path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = BackupEntry(**json.loads(line))
+                        except (ValueError, TypeError):
+                            continue
+                        entries.setdefault(entry.path, {})[entry.hash] = entry
+            except FileNotFoundError:
+                pass
+            self._entries = entries
+        return self._entries
+
+    def versions(self, path: Path) -> list[BackupEntry]:
+        """파일 하나의 백업 목록 (최신순)"""
+        with self._lock:
+            entries = list(self._load().get(self.key(path), {}).values())
+        return sorted(entries, key=lambda entry: entry.created, reverse=True)
+
+    def paths(self, folder: Path | None = None) -> list[str]:
+        """백업이 있는 파일 키 목록 (folder 가 주어지면 그 아래만)"""
+        with self._lock:
+            keys = sorted(self._load())
+        if folder is None or Path(folder).resolve() == self.base:
+            return keys
+        prefix = self.key(folder).rstrip("/") + "/"
+        return [key for key in keys if key.startswith(prefix)]
+
+    def read(self, entry: BackupEntry) -> bytes:
+        """백업 내용 (압축 해제, 해시 확인)"""
+        data = decompress(self.object_path(entry.hash, entry.codec).read_bytes(), entry.codec)
+        if hashlib.sha256(data).hexdigest() != entry.hash:
+            raise ValueError(f"백업 내용이 손상되었습니다: {entry.hash}")
+        return data
+
+    def pick(self, path: Path, version: int | None = None) -> BackupEntry | None:
+        """
+        복원할 백업 고르기
+        version 이 없으면 현재 파일 내용과 다른 가장 최근 백업 (= 마지막 덮어쓰기 전 내용)
+        """
+        entries = self.versions(path)
+        if not entries:
+            return None
+        if version is not None:
+            return entries[version] if version < len(entries) else None
+        try:
+            current = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+        except FileNotFoundError:
+            return entries[0]
+        for entry in entries:
+            if entry.hash != current:
+                return entry
+        return entries[0]
+
+    def restore(self, path: Path, version: int | None = None,
+                target: Path | None = None) -> BackupEntry | None:
+        """
+        백업을 원본 자리(또는 target)에 임시 파일 → 교체로 복원합니다.
+        원본 자리에 복원할 때는 지금 내용도 먼저 백업 (복원도 되돌릴 수 있음)
+        """
+        entry = self.pick(path, version)
+        if entry is None:
+            return None
+        data = self.read(entry)
+        target = Path(target) if target else Path(path)
+        if target == Path(path) and target.exists():
+            self.backup(target)
+        with atomic_open(target, "wb") as f:
+            f.write(data)
+        os.utime(target, ns=(time.time_ns(), entry.mtime_ns))
+        return entry
+
+    # ── 정리 / 통계 ─────────────────────────────────────────────
+    # (백업 중인 다른 프로세스가 없을 때 실행)
+
+    def prune(self, keep: int | None = None, days: float | None = None,
+              missing: bool = False) -> dict:
+        """
+        오래된 백업 정리 → 색인 다시 쓰기 → 어디서도 쓰지 않는 내용 파일 삭제
+
+        Args:
+            keep: 파일마다 최신 keep 개만 남김
+            days: 이보다 오래된 백업 삭제 (파일마다 최신 1개는 항상 남김)
+            missing: 원본이 더 이상 없는 파일의 백업 전부 삭제
+        """
+        cutoff = time.time() - days * 86400 if days is not None else None
+        kept, removed = [], 0
+        for key in self.paths():
+            entries = self.versions(self.source_path(key))
+            if missing and not self.source_path(key).exists():
+                removed += len(entries)
+                continue
+            for i, entry in enumerate(entries):
+                if (keep is not None and i >= keep) or (cutoff is not None and i and entry.created < cutoff):
+                    removed += 1
+                else:
+                    kept.append(entry)
+
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            kept.sort(key=lambda entry: entry.created)
+            with atomic_open(self.index_path, "w", encoding="utf-8") as f:
+                f.writelines(entry.to_json() + "\n" for entry in kept)
+            self._entries = None
+        objects, freed = self.collect_garbage()
+        return {"entries": removed, "objects": objects, "bytes": freed}
+
+    def collect_garbage(self) -> tuple[int, int]:
+        """
+        어떤 백업도 가리키지 않는 내용 파일 삭제 (색인에 기록되기 전에 끊긴 파일 포함)
+
+        Returns:
+            (삭제한 파일 수, 삭제한 바이트)
+        """
+        with self._lock:
+            used = {digest for versions in self._load().values() for digest in versions}
+        count = freed = 0
+        for folder in self.objects.iterdir():
+            for file in folder.iterdir():
+                if file.name.split(".", 1)[0] in used:
+                    continue
+                freed += file.stat().st_size
+                count += 1
+                file.unlink()
+        return count, freed
+
+    def migrate(self, folder: Path, delete: bool = True) -> tuple[int, int]:
+        """
+        기존 방식의 .srt.bak 파일을 저장소로 옮깁니다. (수정 시각 유지, delete 면 .bak 삭제)
+
+        Returns:
+            (옮긴 파일 수, .bak 파일 합계 바이트)
+        """
+        count = total = 0
+        for bak in Path(folder).rglob("*.srt" + LEGACY_SUFFIX):
+            if self.root in bak.parents:
+                continue
+            st = bak.stat()
+            self.backup(bak.with_suffix(""), bak.read_bytes(), st.st_mtime_ns)
+            count += 1
+            total += st.st_size
+            if delete:
+                bak.unlink()
+        return count, total
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = [entry for versions in self._load().values() for entry in versions.values()]
+        unique = {entry.hash: entry for entry in entries}
+        stored = sum(self.object_path(h, entry.codec).stat().st_size
+                     for h, entry in unique.items() if self.object_path(h, entry.codec).exists())
+        return {"paths": len({entry.path for entry in entries}), "entries": len(entries),
+                "referenced_bytes": sum(entry.size for entry in entries),
+                "objects": len(unique), "original_bytes": sum(entry.size for entry in unique.values()),
+                "stored_bytes": stored,
+                "index_bytes": self.index_path.stat().st_size if self.index_path.exists() else 0}
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(root: Path) -> BackupStore:
+    """
+    프로세스별로 한 번만 여는 저장소
+    (fork 로 물려받은 파일 핸들/잠금은 쓰지 않도록 프로세스 ID 별로 따로 엶)
+    """
+    key = (os.getpid(), str(root))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = BackupStore(root)
+    return store
+
+
+def find_store(path: Path) -> Path | None:
+    """path 또는 그 상위 폴더에서 가장 가까운 .srt_backups 폴더"""
+    path = Path(path).resolve()
+    for folder in (path, *path.parents):
+        candidate = folder / BACKUP_DIR_NAME
+        if (candidate / INDEX_NAME).exists():
+            return candidate
+    return None
+
+
+# ────────────────────────────────────────────────────────────────
+# 3. 명령줄 실행 (통계 / 목록 / 복원 / 정리 / .bak 옮기기)
+# ────────────────────────────────────────────────────────────────
+
+def _size(n: int) -> str:
+    return f"{n / 1024 / 1024:.1f} MB" if n >= 1 << 20 else f"{n / 1024:.1f} KB"
+
+
+def _time(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="원본 자막 백업 저장소 관리")
+    parser.add_argument("--store", type=Path, default=None,
+                        help=f"저장소 폴더 (기본: 대상 경로에서 가장 가까운 {BACKUP_DIR_NAME})")
+    sub = parser.add_subparsers(dest="command", required=True)
+    stats = sub.add_parser("stats", help="백업 수 / 저장 크기 출력")
+    stats.add_argument("folder", type=Path)
+    listing = sub.add_parser("list", help="파일 하나의 백업 목록")
+    listing.add_argument("path", type=Path)
+    restore = sub.add_parser("restore", help="백업 복원 (파일 또는 폴더 아래 전부)")
+    restore.add_argument("paths", type=Path, nargs="+")
+    restore.add_argument("--version", type=int, default=None,
+                         help="list 의 번호 (기본: 현재 내용과 다른 가장 최근 백업)")
+    restore.add_argument("-o", "--output", type=Path, default=None,
+                         help="원본 대신 이 경로에 복원 (파일 하나일 때)")
+    prune = sub.add_parser("prune", help="오래된 백업 정리")
+    prune.add_argument("folder", type=Path)
+    prune.add_argument("--keep", type=int, default=None, help="파일마다 최신 N 개만 남김")
+    prune.add_argument("--days", type=float, default=None,
+                       help="N 일보다 오래된 백업 삭제 (파일마다 최신 1개는 남김)")
+    prune.add_argument("--missing", action="store_true", help="원본이 없어진 파일의 백업 삭제")
+    migrate = sub.add_parser("migrate", help="기존 .srt.bak 파일을 저장소로 옮기고 삭제")
+    migrate.add_argument("folder", type=Path)
+    migrate.add_argument("--keep-bak", action="store_true", help=".bak 파일을 지우지 않음")
+    args = parser.parse_args()
+
+    if args.command == "restore" and args.output and len(args.paths) > 1:
+        parser.error("-o 는 파일 하나를 복원할 때만 쓸 수 있습니다")
+    if args.command == "prune" and args.keep is not None and args.keep < 1:
+        parser.error("--keep 은 1 이상이어야 합니다")
+
+    target = args.paths[0] if args.command == "restore" else getattr(args, "folder", None) or args.path
+    root = args.store
+    if root is None:
+        root = find_store(target if target.is_dir() else target.parent)
+        if root is None and args.command == "migrate":
+            root = target / BACKUP_DIR_NAME
+    if root is None:
+        print(f"백업 저장소({BACKUP_DIR_NAME})를 찾지 못했습니다: {target}")
+        sys.exit(1)
+
+    store = BackupStore(root)
+    try:
+        if args.command == "stats":
+            info = store.stats()
+            print(f"백업 저장소: {store.root}")
+            print(f"  파일 {info['paths']:,}개, 백업 {info['entries']:,}개, 내용 {info['objects']:,}개")
+            print(f"  원본 합계 {_size(info['referenced_bytes'])} → 중복 제거 {_size(info['original_bytes'])}"
+                  f" → 압축 {_size(info['stored_bytes'])} (색인 {_size(info['index_bytes'])})")
+        elif args.command == "list":
+            entries = store.versions(args.path.resolve())
+            if not entries:
+                print(f"백업이 없습니다: {args.path}")
+            for i, entry in enumerate(entries):
+                print(f"  [{i}] {_time(entry.created)}  {entry.size:>10,} bytes  {entry.hash[:12]}"
+                      f"  (원본 수정 {_time(entry.mtime_ns / 1e9)})")
+        elif args.command == "restore":
+            files = []
+            for path in args.paths:
+                path = path.resolve()
+                if path.is_dir():
+                    files += [store.source_path(key) for key in store.paths(path)]
+                else:
+                    files.append(path)
+            restored = 0
+            for path in files:
+                entry = store.restore(path, args.version, args.output)
+                if entry is None:
+                    print(f"  백업 없음: {path}")
+                    continue
+                restored += 1
+                print(f"  복원: {args.output or path} ← {entry.hash[:12]} ({_time(entry.created)})")
+            print(f"복원 완료: {restored}개 파일")
+        elif args.command == "prune":
+            result = store.prune(args.keep, args.days, args.missing)
+            print(f"정리 완료: 백업 {result['entries']:,}개, 내용 파일 {result['objects']:,}개 삭제 "
+                  f"({_size(result['bytes'])} 확보)")
+        elif args.command == "migrate":
+            count, total = store.migrate(args.folder, delete=not args.keep_bak)
+            print(f"옮기기 완료: .bak {count:,}개 ({_size(total)}) → 저장소 {_size(store.bytes_written)} "
+                  f"(중복 {store.deduplicated:,}개)")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
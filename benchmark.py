@@ -0,0 +1,1437 @@
+"""
+성능 벤치마크 모음
+
+사용법:
+    python benchmark.py rules [--cues 20000] [--cues-per-file 1500] [--seed 0]
+    python benchmark.py translate [--cues 300] [--latency 0.05] [--workers 4] [--http]
+    python benchmark.py srt [--mb 100] [--no-memory]
+    python benchmark.py retry [--cues 2000] [--throttle 0.2] [--errors 0.05] [--http]
+    python benchmark.py pipeline [--files 32] [--kb 100] [--latency 0.05] [--jobs 1,2,4,8]
+    python benchmark.py coldstart [--cues 1500] [--runs 5]
+    python benchmark.py startup [--files 4] [--kb 20] [--runs 7]
+    python benchmark.py timing [--cues 100000]
+    python benchmark.py backup [--files 10000] [--kb 8] [--dup 0.2]
+    python benchmark.py filter [--cues 10000,40000,160000] [--loops 0.02]
+    python benchmark.py profiles [--profiles polite,casual] [--cues 20000] [--files 8]
+    python benchmark.py suite [--save] [--threshold 0.25] [--only parse,merge] [--quick] [--latency 0] [--errors 0]
+    python benchmark.py corpus OUT_DIR [--files 1] [--cues 1500] [--single-char 0.1] [--repeat 0.05] [--bom]
+
+- rules     : 규칙 체인 순차 적용(규칙마다 re.sub) vs 트리거 디스패치 vs 디스패치 + 리터럴 빠른 경로
+              (리터럴 규칙끼리 겹치도록 만든 말뭉치로 결과 동일성도 확인)
+- translate : 블록마다 1회 요청(기존) vs 배치 + 동시 요청, 가짜 번역 백엔드로 측정
+              --http 를 주면 로컬 가짜 DeepL 서버 + 실제 deepl 클라이언트 사용
+- srt       : 여러 SRT 를 이어 붙인 대용량 입력에서 기존 문자열 방식 병합 vs 스트리밍 단계
+              처리 시간과 최대 메모리(tracemalloc) 비교
+- retry     : 429/503 을 섞어 돌려주는 백엔드에서 재시도 없이 vs ResilientBackend
+              (남은 실패 자막 수, 요청/초, 재시도, 지연 p50/p95)
+- pipeline  : 폴더 처리 직렬(파일마다 병합 → 번역 → 규칙 → 저장) vs 파이프라인(--jobs)
+              코어 수별 처리 시간과 출력 동일성
+- coldstart : 새 프로세스에서 규칙 체인 로드 + 첫 파일 적용 시간, XML 파싱/컴파일 vs 규칙 팩
+- startup   : srt_merge_and_translate import 시간(DeepL/.env 초기화 없음 확인)과
+              --no-translate 실행 한 번의 프로세스 시간
+- timing    : 타이밍 엔진(cue_timing, numpy 필요) 속도와 기존 1글자 병합과의 결과 동일성
+              (무작위 규칙/자막 성질 검사는 python -m pytest tests/test_cue_timing.py)
+- backup    : 원본 백업/덮어쓰기 단계만, 파일마다 .bak 복사(기존) vs 백업 저장소(backup_store)
+              처음 처리와 같은 원본을 다시 처리할 때의 시간, 쓴 바이트, 늘어난 디스크/파일 수, 복원 확인
+- filter    : 번역 전 환각/반복 필터, fixtures/hallucination 의 실제 같은 반복 자막이 .expected.srt 와
+              같은지 확인하고, 합성 자막 수를 늘려 가며 자막당 시간(선형 시간)과 절약 문자 비율 측정
+- profiles  : 출력 프로파일 N개(존댓말/반말 등)를 프로파일마다 따로 실행(기존) vs 갈래 체인
+              (번역/공통 규칙 한 번 + 갈라지는 그룹부터), 규칙 단계와 파일 처리 전체 시간, 결과 동일성
+- suite     : 회귀 확인용 모음 (네트워크 없음): 파싱, 1글자 병합, 휴식 표현 제거, 규칙 체인, 환각 필터,
+              get_srt_files, 파일 하나/폴더 처리(가짜 번역 백엔드, --latency/--errors)
+              항목별 최소 시간을 benchmark_baseline.json 과 비교 (--normalize: 기계 속도 보정값으로 나눠 비교),
+              --threshold 넘게 느려진 항목이 있으면 한 번 더 측정 후에도 느리면 종료 코드 1 (--save 로 기준값 갱신)
+- corpus    : 합성 일본어 SRT 생성 (자막 수, 1글자/반복/두 줄/휴식 표현 비율, BOM 여부, 시드 고정)
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import backup_store
+import cue_timing
+import hallucination_filter
+import output_profiles
+import pipeline
+import rate_limit
+import rule_engine
+import srt_stream
+import translation
+
+
+# 합성 자막에 섞을 일반 한국어 문장 조각 (규칙과 무관한 채움용)
+FILLER_WORDS = [
+    "그래", "오늘은", "정말", "괜찮아", "여기", "조금만", "더", "천천히", "같이",
+    "기분", "어때", "지금", "우리", "이제", "처음", "마지막", "진짜", "응", "아",
+    "좋아", "싫어", "보고", "싶어", "있어", "없어", "해줘", "그만", "계속",
+]
+PUNCTUATION = ["", ".", "?", "!", "...", ",", "♡"]
+
+# 합성 일본어 자막 문장 (번역 벤치마크용)
+JAPANESE_PHRASES = [
+    "気持ちいい", "もっと", "ちょっと待って", "大丈夫?", "ここ触って", "好きだよ",
+    "ああ", "うん", "だめ", "すごい", "もう少しだけ", "一緒に行こう", "見ないで",
+    "恥ずかしい", "いいよ", "本当に?", "そこ", "やめて", "ありがとう", "かわいい",
+]
+
+
+# ────────────────────────────────────────────────────────────────
+# 1. 합성 말뭉치 생성
+# ────────────────────────────────────────────────────────────────
+
+def make_rule_corpus(chain: rule_engine.RuleChain, count: int, seed: int = 0) -> list[str]:
+    """
+    규칙 체인 벤치마크용 자막 텍스트(번역 후 한국어)를 만듭니다.
+    일반 단어 사이에 규칙 트리거 문자열을 일정 비율로 섞어 실제처럼 일부 규칙이 매칭되게 합니다.
+    """
+    rng = random.Random(seed)
+    triggers = sorted({t for rule in chain.rules for t in rule.triggers})
+    texts = []
+    for _ in range(count):
+        words = [rng.choice(FILLER_WORDS) for _ in range(rng.randint(2, 7))]
+        if triggers and rng.random() < 0.4:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(triggers))
+        line = " ".join(words) + rng.choice(PUNCTUATION)
+        if rng.random() < 0.15:
+            line += "\n" + " ".join(rng.choice(FILLER_WORDS) for _ in range(3))
+        texts.append(line)
+    return texts
+
+
+def make_japanese_texts(count: int, seed: int = 0) -> list[str]:
+    """번역 벤치마크용 일본어 자막 텍스트 (일부는 두 줄)"""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        line = "".join(rng.choice(JAPANESE_PHRASES) for _ in range(rng.randint(1, 3)))
+        if rng.random() < 0.2:
+            line += "\n" + rng.choice(JAPANESE_PHRASES)
+        texts.append(line)
+    return texts
+
+
+def write_srt_corpus(path: Path, target_bytes: int, seed: int = 0,
+                     single_char_ratio: float = 0.1, cues_per_file: int = 1500) -> int:
+    """
+    일본어 SRT 여러 개(각 cues_per_file 자막)를 이어 붙인 대용량 파일을 만듭니다.
+    일부 자막은 1글자 / 두 줄 / 휴식 표현을 포함합니다.
+
+    Returns:
+        int: 생성한 자막 수
+    """
+    rng = random.Random(seed)
+    count = 0
+    written = 0
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        while written < target_bytes:
+            clock = 0
+            for number in range(1, cues_per_file + 1):
+                start = clock + rng.randint(0, 500)
+                clock = start + rng.randint(300, 4000)
+                roll = rng.random()
+                if roll < single_char_ratio:
+                    text = rng.choice("あうんえおっ")
+                elif roll < single_char_ratio + 0.02:
+                    text = "少し休憩してください。"
+                else:
+                    text = "".join(rng.choice(JAPANESE_PHRASES) for _ in range(rng.randint(1, 3)))
+                    if rng.random() < 0.2:
+                        text += "\n" + rng.choice(JAPANESE_PHRASES)
+                block = f"{number}\n{srt_stream.format_time_line(start, clock)}\n{text}\n\n"
+                f.write(block)
+                written += len(block.encode("utf-8"))
+                count += 1
+    return count
+
+
+# ────────────────────────────────────────────────────────────────
+# 2. 규칙 체인 벤치마크
+# ────────────────────────────────────────────────────────────────
+
+def make_literal_corpus(chain: rule_engine.RuleChain, count: int, seed: int = 0) -> list[str]:
+    """
+    리터럴 빠른 경로 검증용 말뭉치: 리터럴 규칙의 찾을/바꿀 내용을 한 줄에 여러 개씩
+    붙이거나 띄어 섞어서, 규칙끼리 겹치거나 앞 규칙 결과가 뒤 규칙을 만드는 경우를 최대한 만듭니다.
+    """
+    rng = random.Random(seed)
+    pieces = sorted({text for rule in chain.rules if rule.is_literal
+                     for text in (rule.literal, rule.literal_repl) if text})
+    texts = []
+    for _ in range(count):
+        parts = [rng.choice(pieces) for _ in range(rng.randint(2, 6))]
+        texts.append(rng.choice(["", " "]).join(parts) + rng.choice(PUNCTUATION))
+    return texts
+
+
+def bench_rules(args):
+    """순차 적용 / 트리거 디스패치 / 디스패치 + 리터럴 빠른 경로 시간 비교 (결과 동일성도 확인)"""
+    start = time.perf_counter()
+    chain = rule_engine.load_rule_chain(args.rules)
+    load_time = time.perf_counter() - start
+    regex_chain = rule_engine.load_rule_chain(args.rules, literal_fast_path=False)
+    literals = sum(rule.is_literal for rule in chain.rules)
+    print(f"규칙 로드/컴파일: {len(chain)}개 (리터럴 {literals}개), {load_time * 1000:.1f} ms")
+
+    corpora = [("합성 자막", make_rule_corpus(chain, args.cues, args.seed)),
+               ("리터럴 밀집", make_literal_corpus(chain, args.cues, args.seed))]
+    mismatches = 0
+    for title, texts in corpora:
+        print(f"\n{title}: {len(texts):,}개 (파일당 {args.cues_per_file:,}개 기준)")
+        timings = []
+        expected = None
+        for name, apply in (("순차", chain.apply_sequential),
+                            ("디스패치", regex_chain.apply),
+                            ("디스패치+리터럴", chain.apply)):
+            start = time.perf_counter()
+            result = [apply(t) for t in texts]
+            timings.append((name, time.perf_counter() - start))
+            if expected is None:
+                expected = result
+                continue
+            bad = [(t, a, b) for t, a, b in zip(texts, expected, result) if a != b]
+            mismatches += len(bad)
+            for text, want, got in bad[:3]:
+                print(f"  ❌ {name} 불일치: {text!r} → {got!r} (순차: {want!r})")
+
+        changed = sum(1 for t, a in zip(texts, expected) if t != a)
+        files = max(1, len(texts) / args.cues_per_file)
+        print(f"규칙이 적용된 자막: {changed:,}개")
+        print(f"{'방식':<16}{'줄당(µs)':>12}{'파일당(ms)':>14}{'전체(s)':>10}{'배속':>8}")
+        base = timings[0][1]
+        for name, seconds in timings:
+            print(f"{name:<16}{seconds / len(texts) * 1e6:>12.1f}"
+                  f"{seconds / files * 1000:>14.1f}{seconds:>10.2f}{base / seconds:>8.1f}")
+
+    print(f"\n결과 불일치: {mismatches}개")
+    return 1 if mismatches else 0
+
+
+# ────────────────────────────────────────────────────────────────
+# 3. 번역 배치/동시 요청 벤치마크
+# ────────────────────────────────────────────────────────────────
+
+def _run_translate(args, backend_factory):
+    texts = make_japanese_texts(args.cues, args.seed)
+    print(f"합성 자막 블록: {len(texts):,}개, 요청당 지연 {args.latency * 1000:.0f} ms")
+
+    backend = backend_factory()
+    start = time.perf_counter()
+    serial = [translation.translate_texts([t], backend)[0] for t in texts]
+    serial_time = time.perf_counter() - start
+
+    backend = backend_factory()
+    start = time.perf_counter()
+    batched = translation.translate_texts(texts, backend, max_workers=args.workers,
+                                          max_chars=args.batch_chars, max_items=args.batch_items)
+    batched_time = time.perf_counter() - start
+
+    requests = len(translation.make_batches(list(range(len(texts))), texts,
+                                            args.batch_chars, args.batch_items))
+    print(f"{'방식':<16}{'요청 수':>8}{'시간(s)':>10}")
+    print(f"{'블록마다 1회':<16}{len(texts):>8}{serial_time:>10.2f}")
+    print(f"{'배치+동시':<16}{requests:>8}{batched_time:>10.2f}")
+    print(f"속도 향상: {serial_time / batched_time:.1f}배")
+    return 0 if serial == batched else 1
+
+
+def bench_translate(args):
+    """블록당 1회 직렬 번역 vs 배치 + 동시 번역 (결과 동일성도 확인)"""
+    if not args.http:
+        return _run_translate(args, lambda: translation.FakeBackend(latency=args.latency))
+
+    from fake_deepl import FakeDeepLServer
+
+    with FakeDeepLServer(latency=args.latency) as server:
+        print(f"가짜 DeepL 서버: {server.url}")
+        return _run_translate(args, lambda: translation.DeepLBackend("fake-key", server_url=server.url))
+
+
+# ────────────────────────────────────────────────────────────────
+# 4. SRT 파싱/병합 스트리밍 벤치마크
+# ────────────────────────────────────────────────────────────────
+
+def legacy_merge_single_char_captions(srt_content: str) -> str:
+    """
+    스트리밍 파서 도입 전의 merge_single_char_captions (비교 기준 구현)
+    splitlines → 블록 리스트 → 병합 리스트 → 줄 리스트 → join
+    """
+    blocks = []
+    current_block = []
+    for line in srt_content.strip().splitlines():
+        if not line.strip():
+            if current_block:
+                blocks.append(current_block)
+                current_block = []
+            continue
+        current_block.append(line)
+    if current_block:
+        blocks.append(current_block)
+
+    merged = []
+    i = 0
+    while i < len(blocks):
+        block = blocks[i]
+        if len(block) < 3:
+            merged.append(block)
+            i += 1
+            continue
+        num, time_line, text_parts = block[0], block[1], block[2:]
+        for j in range(2, len(block)):
+            block[j] = srt_stream.REST_PHRASE_RE.sub("", block[j])
+        text = " ".join(text_parts).strip()
+        if i + 1 < len(blocks) and len(re.sub(r"\s+", "", text)) == 1:
+            next_block = blocks[i + 1]
+            if len(next_block) < 3:
+                merged.append(block)
+                i += 1
+                continue
+            next_text = " ".join(next_block[2:]).strip()
+            start_str = time_line.split("-->")[0].strip()
+            next_end_str = next_block[1].split("-->")[1].strip()
+            merged.append([num, f"{start_str} --> {next_end_str}", text + next_text])
+            i += 2
+        else:
+            merged.append(block)
+            i += 1
+
+    result_lines = []
+    new_index = 1
+    for block in merged:
+        if len(block) < 3:
+            continue
+        result_lines.append(str(new_index))
+        result_lines.extend(block[1:])
+        result_lines.append("")
+        new_index += 1
+    return "\n".join(result_lines).rstrip() + "\n"
+
+
+def _legacy_file(src: Path, dst: Path):
+    content = src.read_text(encoding="utf-8-sig")
+    dst.write_text(legacy_merge_single_char_captions(content), encoding="utf-8")
+
+
+def _streaming_file(src: Path, dst: Path):
+    cues = srt_stream.remove_rest_phrases(srt_stream.read_srt(src))
+    cues = srt_stream.merge_single_char_cues(srt_stream.drop_empty_cues(cues))
+    with open(dst, "w", encoding="utf-8", newline="\n") as f:
+        srt_stream.write_srt(cues, f)
+
+
+def _measure(func, *args, memory: bool):
+    """(소요 시간, 최대 메모리 바이트 또는 None)"""
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_srt(args):
+    """기존 문자열 방식 vs 스트리밍 단계: 처리량과 최대 메모리"""
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "corpus.srt"
+        cues = write_srt_corpus(src, int(args.mb * 1024 * 1024), args.seed)
+        size_mb = src.stat().st_size / 1024 / 1024
+        print(f"입력: {size_mb:.0f} MB, 자막 {cues:,}개")
+
+        print(f"{'방식':<12}{'시간(s)':>10}{'MB/s':>10}{'최대 메모리(MB)':>18}")
+        for name, func in (("기존(문자열)", _legacy_file), ("스트리밍", _streaming_file)):
+            dst = Path(tmp) / f"{func.__name__}.srt"
+            elapsed, _ = _measure(func, src, dst, memory=False)
+            peak = "-"
+            if not args.no_memory:
+                _, peak_bytes = _measure(func, src, dst, memory=True)
+                peak = f"{peak_bytes / 1024 / 1024:.1f}"
+            print(f"{name:<12}{elapsed:>10.2f}{size_mb / elapsed:>10.1f}{peak:>18}")
+
+        legacy = (Path(tmp) / "_legacy_file.srt").read_text(encoding="utf-8")
+        streaming = (Path(tmp) / "_streaming_file.srt").read_text(encoding="utf-8")
+        same = legacy == streaming
+        print(f"출력 동일: {'예' if same else '아니오 (휴식 표현만 남은 자막 삭제 등 차이)'}")
+    return 0
+
+
+# ────────────────────────────────────────────────────────────────
+# 5. 재시도 / 속도 제한 벤치마크
+# ────────────────────────────────────────────────────────────────
+
+def _run_retry(args, backend_factory):
+    texts = make_japanese_texts(args.cues, args.seed)
+    print(f"합성 자막 블록: {len(texts):,}개, 429 {args.throttle:.0%} / 503 {args.errors:.0%}, "
+          f"요청당 지연 {args.latency * 1000:.0f} ms")
+    options = dict(max_workers=args.workers, max_chars=args.batch_chars, max_items=args.batch_items)
+
+    def failures(results):
+        return sum(text.startswith(translation.FAILURE_MARKER) for text in results)
+
+    start = time.perf_counter()
+    plain = translation.translate_texts(texts, backend_factory(), **options)
+    plain_time = time.perf_counter() - start
+
+    metrics = rate_limit.ClientMetrics()
+    backend = rate_limit.ResilientBackend(
+        backend_factory(), rate=args.rate, max_concurrency=args.workers,
+        retry=rate_limit.RetryPolicy(args.max_retries, base_delay=args.base_delay, seed=args.seed),
+        metrics=metrics,
+    )
+    start = time.perf_counter()
+    resilient = translation.translate_texts(texts, backend, **options)
+    resilient_time = time.perf_counter() - start
+
+    print(f"{'방식':<16}{'실패 블록':>10}{'시간(s)':>10}")
+    print(f"{'재시도 없음':<16}{failures(plain):>10,}{plain_time:>10.2f}")
+    print(f"{'재시도+AIMD':<16}{failures(resilient):>10,}{resilient_time:>10.2f}")
+    print(f"지표: {metrics.format()}")
+    print(f"동시 요청 수: 최종 한도 {backend.concurrency.limit} / 최대 {args.workers} "
+          f"(실제 최대 {backend.concurrency.peak})")
+    return 0 if failures(resilient) == 0 else 1
+
+
+def bench_retry(args):
+    """일시 오류(429/503) 주입 상황에서 재시도 계층 효과 측정"""
+    if not args.http:
+        counter = iter(range(1_000_000))
+        return _run_retry(args, lambda: translation.FakeBackend(
+            latency=args.latency, throttle_rate=args.throttle, error_rate=args.errors,
+            seed=args.seed + next(counter)))
+
+    from fake_deepl import FakeDeepLServer
+
+    with FakeDeepLServer(latency=args.latency, throttle_rate=args.throttle,
+                         error_rate=args.errors, seed=args.seed) as server:
+        print(f"가짜 DeepL 서버: {server.url}")
+        return _run_retry(args, lambda: translation.DeepLBackend(
+            "fake-key", server_url=server.url, network_retries=0))
+
+
+# ────────────────────────────────────────────────────────────────
+# 6. 폴더 파이프라인 벤치마크
+# ────────────────────────────────────────────────────────────────
+
+def _pipeline_jobs(folder: Path) -> list:
+    return [pipeline.FileJob(path, path.with_stem(path.stem + ".ko"), "new", True)
+            for path in sorted(folder.glob("*.srt"))]
+
+
+def _run_serial(folder: Path, backend, options: dict):
+    chain = pipeline.process_rule_chain()
+    for job in _pipeline_jobs(folder):
+        job = pipeline.prepare_file(job)
+        job = pipeline.translate_file(job, backend, {}, **options)
+        pipeline.finish_file(job, chain)
+
+
+def _run_pipelined(folder: Path, backend, options: dict, jobs: int):
+    with ProcessPoolExecutor(max_workers=jobs, initializer=pipeline.process_rule_chain) as cpu_pool, \
+            ThreadPoolExecutor(max_workers=jobs) as io_pool:
+        def translate(job):
+            return pipeline.translate_file(job, backend, {}, **options)
+
+        stages = [(cpu_pool, pipeline.prepare_file), (io_pool, translate), (cpu_pool, pipeline.finish_file)]
+        for job in pipeline.run_pipeline(_pipeline_jobs(folder), stages, window=jobs * 2):
+            if job.error:
+                raise RuntimeError(job.error)
+
+
+def _outputs(folder: Path) -> dict:
+    return {p.name: p.read_bytes() for p in sorted(folder.glob("*.ko.srt"))}
+
+
+def bench_pipeline(args):
+    """폴더 처리: 직렬 vs 파이프라인 (프로세스 풀 + 번역 스레드 풀), 코어 수별"""
+    jobs_list = [int(n) for n in args.jobs.split(",")]
+    pipeline.process_rule_chain().compile()     # 규칙 컴파일은 측정에서 제외 (fork 작업자는 물려받음)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "source"
+        source.mkdir()
+        cues = sum(write_srt_corpus(source / f"{i:04d}.srt", args.kb * 1024, args.seed + i)
+                   for i in range(args.files))
+        print(f"입력: 파일 {args.files}개 x {args.kb} KB, 자막 {cues:,}개, "
+              f"번역 요청당 지연 {args.latency * 1000:.0f} ms, CPU 코어 {os.cpu_count()}개")
+
+        def fresh(name: str) -> Path:
+            folder = Path(tmp) / name
+            shutil.copytree(source, folder)
+            return folder
+
+        def options(executor):
+            return dict(executor=executor, max_chars=args.batch_chars, max_items=args.batch_items)
+
+        folder = fresh("serial")
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            start = time.perf_counter()
+            _run_serial(folder, translation.FakeBackend(latency=args.latency), options(executor))
+            serial_time = time.perf_counter() - start
+        expected = _outputs(folder)
+
+        print(f"{'방식':<16}{'시간(s)':>10}{'속도 향상':>10}{'출력 동일':>10}")
+        print(f"{'직렬':<16}{serial_time:>10.2f}{1.0:>10.1f}{'-':>10}")
+        status = 0
+        for jobs in jobs_list:
+            folder = fresh(f"jobs{jobs}")
+            with ThreadPoolExecutor(max_workers=args.workers) as executor:
+                start = time.perf_counter()
+                _run_pipelined(folder, translation.FakeBackend(latency=args.latency),
+                               options(executor), jobs)
+                elapsed = time.perf_counter() - start
+            same = _outputs(folder) == expected
+            status |= not same
+            print(f"{f'파이프라인 x{jobs}':<16}{elapsed:>10.2f}{serial_time / elapsed:>10.1f}"
+                  f"{'예' if same else '아니오':>10}")
+    return status
+
+
+# ────────────────────────────────────────────────────────────────
+# 7. 규칙 체인 콜드 스타트 벤치마크
+# ────────────────────────────────────────────────────────────────
+
+# 새 파이썬 프로세스에서 실행: import → 체인 로드 → 첫 파일(자막 목록) 적용 시간을 JSON 으로 출력
+COLDSTART_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import rule_engine
+imported = time.perf_counter()
+chain = rule_engine.load_rule_chain(sys.argv[1], cache=sys.argv[2] == "pack")
+loaded = time.perf_counter()
+with open(sys.argv[3], encoding="utf-8") as f:
+    texts = json.load(f)
+for text in texts:
+    chain.apply(text)
+applied = time.perf_counter()
+print(json.dumps({"import": imported - start, "load": loaded - imported,
+                  "first_file": applied - loaded, "fingerprint": chain.fingerprint}))
+"""
+
+
+def _coldstart(template: Path, mode: str, corpus: Path) -> dict:
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", COLDSTART_CHILD, str(template), mode, str(corpus)],
+                            cwd=Path(__file__).parent, capture_output=True, text=True, check=True)
+    result = json.loads(output.stdout)
+    result["process"] = time.perf_counter() - start
+    return result
+
+
+def bench_coldstart(args):
+    """규칙 체인 콜드 스타트: XML 파싱 + 정규식 변환/컴파일 vs 규칙 팩 (새 프로세스마다 측정)"""
+    chain = rule_engine.load_rule_chain(args.rules, cache=False)
+    texts = make_rule_corpus(chain, args.cues, args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 원본 옆에 팩이 생기므로 임시 폴더에 복사해서 측정
+        template = Path(tmp) / args.rules.name
+        if args.rules.is_dir():
+            shutil.copytree(args.rules, template)
+        else:
+            shutil.copy2(args.rules, template)
+        corpus = Path(tmp) / "corpus.json"
+        corpus.write_text(json.dumps(texts, ensure_ascii=False), encoding="utf-8")
+
+        build = _coldstart(template, "pack", corpus)     # 팩이 없으므로 XML 로드 + 팩 저장
+        runs = {mode: [_coldstart(template, mode, corpus) for _ in range(args.runs)]
+                for mode in ("xml", "pack")}
+
+    print(f"규칙 {len(chain)}개, 첫 파일 자막 {len(texts):,}개, 측정 {args.runs}회 중앙값 (ms)")
+    print(f"{'방식':<18}{'import':>9}{'로드':>9}{'첫 파일':>9}{'로드+첫 파일':>14}{'프로세스':>10}")
+    rows = [("XML (기존)", runs["xml"]), ("규칙 팩", runs["pack"]), ("팩 생성 (1회)", [build])]
+    for name, results in rows:
+        values = [statistics.median(r[key] for r in results) * 1000
+                  for key in ("import", "load", "first_file", "process")]
+        print(f"{name:<18}{values[0]:>9.1f}{values[1]:>9.1f}{values[2]:>9.1f}"
+              f"{values[1] + values[2]:>14.1f}{values[3]:>10.1f}")
+
+    same = len({r["fingerprint"] for results in runs.values() for r in results} | {build["fingerprint"]}) == 1
+    xml_load = statistics.median(r["load"] for r in runs["xml"])
+    pack_load = statistics.median(r["load"] for r in runs["pack"])
+    print(f"로드 속도 향상: {xml_load / pack_load:.1f}배, 규칙 지문 동일: {'예' if same else '아니오'}")
+    return 0 if same else 1
+
+
+# ────────────────────────────────────────────────────────────────
+# 8. 시작 시간 벤치마크 (import / 실행당 시작 비용)
+# ────────────────────────────────────────────────────────────────
+
+STARTUP_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import srt_merge_and_translate
+imported = time.perf_counter()
+print(json.dumps({"import": imported - start,
+                  "deepl": "deepl" in sys.modules, "dotenv": "dotenv" in sys.modules}))
+"""
+
+
+def _process_time(command: list, cwd: Path) -> float:
+    start = time.perf_counter()
+    subprocess.run(command, cwd=cwd, capture_output=True, text=True, check=True)
+    return time.perf_counter() - start
+
+
+def bench_startup(args):
+    """
+    srt_merge_and_translate 시작 비용 (새 프로세스마다 측정)
+    - import: .env/DeepL 초기화 없이 모듈만 불러오는 시간 (다른 도구에서 병합 함수를 쓸 때)
+    - 실행: 작은 폴더 하나를 --no-translate 로 처리하는 프로세스 전체 시간 (인터프리터 시작 포함)
+    """
+    root = Path(__file__).parent
+    python = [sys.executable]
+    baseline = [_process_time(python + ["-c", "pass"], root) for _ in range(args.runs)]
+
+    imports = []
+    for _ in range(args.runs):
+        output = subprocess.run(python + ["-c", STARTUP_CHILD], cwd=root,
+                                capture_output=True, text=True, check=True)
+        imports.append(json.loads(output.stdout))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "source"
+        source.mkdir()
+        cues = sum(write_srt_corpus(source / f"{i:03d}.srt", args.kb * 1024, args.seed + i)
+                   for i in range(args.files))
+        runs = []
+        for n in range(args.runs):
+            folder = Path(tmp) / f"run{n}"         # 매번 병합 전 원본으로
+            shutil.copytree(source, folder)
+            command = python + [str(root / "srt_merge_and_translate.py"), str(folder), "--no-translate"]
+            runs.append(_process_time(command, root))
+
+    def ms(values) -> float:
+        return statistics.median(values) * 1000
+
+    first = imports[0]
+    print(f"측정 {args.runs}회 중앙값 (ms)")
+    print(f"  인터프리터 시작 (python -c pass) : {ms(baseline):>8.1f}")
+    print(f"  import srt_merge_and_translate   : {ms([r['import'] for r in imports]):>8.1f}"
+          f"  (deepl import: {'예' if first['deepl'] else '아니오'}, "
+          f"dotenv import: {'예' if first['dotenv'] else '아니오'})")
+    print(f"  --no-translate 실행 (파일 {args.files}개 x {args.kb} KB, 자막 {cues:,}개): {ms(runs):>8.1f}")
+    return 1 if first["deepl"] or first["dotenv"] else 0
+
+
+# ────────────────────────────────────────────────────────────────
+# 9. 타이밍 엔진 벤치마크
+# ────────────────────────────────────────────────────────────────
+
+def make_timing_cues(count: int, seed: int = 0, single_char_ratio: float = 0.15) -> list[srt_stream.Cue]:
+    """
+    타이밍 엔진용 자막: 1글자 / 아주 짧은 자막, 앞 자막과 겹치는 자막,
+    시작 시간 순서가 뒤바뀐 자막(약 1%)을 섞음
+    """
+    rng = random.Random(seed)
+    cues = []
+    clock = 0
+    for number in range(1, count + 1):
+        start = max(0, clock + rng.randint(-300, 600))     # 음수 = 앞 자막과 겹침
+        if rng.random() < 0.01:
+            start = max(0, start - rng.randint(1000, 5000))
+        duration = rng.randint(30, 300) if rng.random() < 0.1 else rng.randint(300, 4000)
+        if rng.random() < single_char_ratio:
+            text = rng.choice("あうんえおっ")
+        else:
+            text = "".join(rng.choice(JAPANESE_PHRASES) for _ in range(rng.randint(1, 3)))
+            if rng.random() < 0.2:
+                text += "\n" + rng.choice(JAPANESE_PHRASES)
+        cues.append(srt_stream.Cue(number, start, start + duration, text.split("\n")))
+        clock = max(clock, start + duration)
+    return cues
+
+
+def _copy_cues(cues: list) -> list:
+    return [srt_stream.Cue(c.index, c.start, c.end, list(c.lines)) for c in cues]
+
+
+def bench_timing(args):
+    """
+    타이밍 엔진: 기존 merge_single_char_cues vs LEGACY_RULES (결과 동일) 속도, 전체 규칙 적용 속도
+    (정렬/겹침 없음/텍스트 보존 등 성질은 tests/test_cue_timing.py)
+    """
+    if cue_timing.np is None:
+        print("numpy 가 설치되어 있지 않습니다 (pip install numpy)")
+        return 1
+
+    cues = make_timing_cues(args.cues, args.seed)
+    full_rules = cue_timing.TimingRules(merge_max_chars=1, merge_max_duration=300,
+                                        min_duration=700, max_cps=17, close_gap=200, min_gap=40)
+    print(f"자막 {len(cues):,}개, 측정 {args.runs}회 최소값 (ms)")
+
+    def best(func) -> tuple[float, list]:
+        times = []
+        for _ in range(args.runs):
+            data = _copy_cues(cues)
+            start = time.perf_counter()
+            result = func(data)
+            times.append(time.perf_counter() - start)
+        return min(times) * 1000, result
+
+    legacy_ms, legacy = best(lambda data: list(srt_stream.merge_single_char_cues(data)))
+    engine_ms, engine = best(lambda data: cue_timing.retime_cues(data, cue_timing.LEGACY_RULES))
+    full_ms, full = best(lambda data: cue_timing.retime_cues(data, full_rules))
+    same = legacy == engine and [c.index for c in legacy] == [c.index for c in engine]
+    print(f"  기존 1글자 병합 (merge_single_char_cues) : {legacy_ms:>8.1f}")
+    print(f"  타이밍 엔진 LEGACY_RULES                 : {engine_ms:>8.1f}  (결과 동일: {'예' if same else '아니오'})")
+    print(f"  타이밍 엔진 전체 규칙                    : {full_ms:>8.1f}  ({len(cues):,} → {len(full):,}개)")
+    return 0 if same else 1
+
+
+# ────────────────────────────────────────────────────────────────
+# 10. 백업 저장소 벤치마크
+# ────────────────────────────────────────────────────────────────
+
+def _written_bytes() -> int | None:
+    """이 프로세스가 write 계열 호출로 쓴 누적 바이트 (/proc/self/io 의 wchar, Linux 만)"""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def _legacy_prepare(job: pipeline.FileJob) -> pipeline.FileJob:
+    """기존 prepare_file: 파일 옆 .bak 로 shutil.copy2 + write_text 로 원본 덮어쓰기"""
+    original = job.path.read_text(encoding="utf-8-sig")
+    job.cues = list(srt_stream.merge_stages(srt_stream.parse_srt_string(original)))
+    merged = srt_stream.srt_to_string(job.cues)
+    job.merged = merged.strip() != original.strip()
+    if job.new_file or job.merged:
+        shutil.copy2(job.path, job.path.with_suffix(job.path.suffix + ".bak"))
+    if job.merged:
+        job.path.write_text(merged, encoding="utf-8-sig")
+    job.hashes = [pipeline.text_hash(cue.text) for cue in job.cues]
+    return job
+
+
+def _tree_usage(folder: Path) -> tuple[int, int]:
+    """(파일 수, 합계 바이트)"""
+    files = [p for p in folder.rglob("*") if p.is_file()]
+    return len(files), sum(p.stat().st_size for p in files)
+
+
+def bench_backup(args):
+    """
+    원본 백업 + 덮어쓰기 단계: 파일마다 .bak (기존) vs 내용 주소 백업 저장소
+    1회차: 처음 처리 (모든 파일 백업), 2회차: 원본을 처음 상태로 되돌려 다시 처리 (다시 받은 자막 등)
+    """
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "source"
+        unique = max(1, round(args.files * (1 - args.dup)))
+        cues = 0
+        for i in range(args.files):
+            path = source / f"{i % 100:02d}" / f"{i:05d}.srt"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if i < unique:
+                cues += write_srt_corpus(path, args.kb * 1024, args.seed + i,
+                                         single_char_ratio=0.1, cues_per_file=max(1, args.kb * 18))
+            else:   # 다른 폴더에 같은 자막이 또 있는 경우
+                twin = rng.randrange(unique)
+                shutil.copy2(source / f"{twin % 100:02d}" / f"{twin:05d}.srt", path)
+        files, size = _tree_usage(source)
+        print(f"입력: 파일 {files:,}개 (같은 내용 {args.files - unique:,}개), "
+              f"{size / 1024 / 1024:.1f} MB, 자막 {cues:,}개 이상")
+
+        def run(folder: Path, prepare, backup_dir) -> tuple[float, int | None]:
+            paths = sorted(folder.rglob("*.srt"))
+            before = _written_bytes()
+            start = time.perf_counter()
+            for path in paths:
+                job = prepare(pipeline.FileJob(path, path.with_stem(path.stem + ".ko"), "new", True,
+                                               backup_dir))
+                if job.error:
+                    raise RuntimeError(job.error)
+            elapsed = time.perf_counter() - start
+            after = _written_bytes()
+            return elapsed, (after - before) if before is not None else None
+
+        def mb(value) -> str:
+            return "-" if value is None else f"{value / 1024 / 1024:.1f}"
+
+        print(f"{'방식':<10}{'회차':>6}{'시간(s)':>10}{'쓴 MB':>10}{'늘어난 MB':>12}{'늘어난 파일':>12}")
+        status = 0
+        for name, prepare in (("기존 .bak", _legacy_prepare), ("백업 저장소", pipeline.prepare_file)):
+            folder = Path(tmp) / ("legacy" if prepare is _legacy_prepare else "store")
+            backup_dir = folder / backup_store.BACKUP_DIR_NAME
+            shutil.copytree(source, folder)
+            for round_no in (1, 2):
+                if round_no == 2:   # 원본을 처음 상태로 (병합 전 내용을 다시 받은 경우)
+                    shutil.copytree(source, folder, dirs_exist_ok=True)
+                before_files, before_size = _tree_usage(folder)
+                elapsed, written = run(folder, prepare, backup_dir)
+                after_files, after_size = _tree_usage(folder)
+                print(f"{name:<10}{round_no:>6}{elapsed:>10.2f}{mb(written):>10}"
+                      f"{mb(after_size - before_size):>12}{after_files - before_files:>12,}")
+
+        # 복원 확인: 무작위 파일을 백업에서 꺼내 원본과 비교
+        store = backup_store.BackupStore(Path(tmp) / "store" / backup_store.BACKUP_DIR_NAME)
+        samples = rng.sample(sorted(source.rglob("*.srt")), min(50, args.files))
+        restored = Path(tmp) / "restored.srt"
+        bad = 0
+        for path in samples:
+            target = Path(tmp) / "store" / path.relative_to(source)
+            store.restore(target, target=restored)
+            bad += restored.read_bytes() != path.read_bytes()
+        info = store.stats()
+        store.close()
+        print(f"백업 저장소: 내용 {info['objects']:,}개, 압축 {mb(info['stored_bytes'])} MB "
+              f"(원본 합계 {mb(info['referenced_bytes'])} MB), "
+              f"복원 확인 {len(samples) - bad}/{len(samples)}개 일치")
+        status |= bool(bad)
+    return status
+
+
+# ────────────────────────────────────────────────────────────────
+# 11. 환각/반복 필터 벤치마크
+# ────────────────────────────────────────────────────────────────
+
+FIXTURE_DIR = Path(__file__).with_name("fixtures") / "hallucination"
+
+# Whisper 환각/반복으로 자주 나오는 문장 (합성 말뭉치용)
+HALLUCINATION_LINES = [
+    "そして戻ってきます。", "少し休憩してください。", "ご視聴ありがとうございました",
+    "もう少しだけこのままでいてね", "ずっと一緒にいたいな。", "私は何をしてたんだっけ",
+]
+
+
+def make_hallucination_cues(count: int, seed: int = 0, loop_ratio: float = 0.02) -> list[srt_stream.Cue]:
+    """
+    음성 인식 자막처럼 만든 합성 자막: 대부분은 서로 다른 대사,
+    loop_ratio 확률로 환각 문장 연속 반복(3~15개) 또는 두 문장이 번갈아 도는 반복(4~10개)
+    """
+    rng = random.Random(seed)
+    cues = []
+    clock = 0
+    while len(cues) < count:
+        if rng.random() < loop_ratio:
+            if rng.random() < 0.5:
+                texts = [rng.choice(HALLUCINATION_LINES)] * rng.randint(3, 15)
+            else:
+                pair = rng.sample(HALLUCINATION_LINES, 2)
+                texts = [pair[i % 2] for i in range(rng.randint(4, 10))]
+        else:
+            text = "".join(rng.choice(JAPANESE_PHRASES) for _ in range(rng.randint(1, 4)))
+            if rng.random() < 0.2:
+                text += "\n" + rng.choice(JAPANESE_PHRASES)
+            texts = [text]
+        for text in texts:
+            start = clock + rng.randint(0, 500)
+            clock = start + rng.randint(800, 4000)
+            cues.append(srt_stream.Cue(len(cues) + 1, start, clock, text.split("\n")))
+    return cues[:count]
+
+
+def check_filter_fixtures(cue_filter) -> int:
+    """fixtures/hallucination/*.srt 를 병합 + 필터한 결과를 같은 이름의 .expected.srt 와 비교 (다른 파일 수)"""
+    bad = 0
+    for path in sorted(FIXTURE_DIR.glob("*.srt")):
+        if path.name.endswith(".expected.srt"):
+            continue
+        stats = hallucination_filter.FilterStats()
+        cues = cue_filter.apply(srt_stream.merge_stages(srt_stream.read_srt(path)), stats)
+        expected = srt_stream.decode_srt_bytes(path.with_suffix(".expected.srt").read_bytes())
+        same = srt_stream.srt_to_string(cues).strip() == expected.strip()
+        bad += not same
+        print(f"  {path.name:<26} {'일치' if same else '다름':<4} 자막 {stats.cues:>3} → {len(cues):>3}개, "
+              f"절약 {stats.saved_characters:>4}자 / {stats.characters:,}자")
+    return bad
+
+
+def bench_filter(args):
+    """
+    환각/반복 필터: 고정 자막(fixtures) 결과 확인 + 자막 수를 늘려 가며 자막당 시간(선형인지)과 절약 문자 비율
+    """
+    cue_filter = hallucination_filter.HallucinationFilter.from_template(args.rules)
+    rule_count = len(cue_filter.rule_chain) if cue_filter.rule_chain is not None else 0
+    print(f"일본어 환각 규칙 {rule_count}개, 고정 자막 ({FIXTURE_DIR.relative_to(Path(__file__).parent)})")
+    status = check_filter_fixtures(cue_filter)
+
+    sizes = [int(n) for n in args.cues.split(",")]
+    print(f"\n합성 자막 (반복 시작 확률 {args.loops:g}), 측정 {args.runs}회 최소값")
+    print(f"{'자막 수':>10}{'시간(ms)':>12}{'µs/자막':>10}{'제외 자막':>12}{'절약 문자':>14}")
+    per_cue = []
+    cue_filter.apply(make_hallucination_cues(min(sizes), args.seed, args.loops))    # 준비 실행 (측정 제외)
+    for size in sizes:
+        source = make_hallucination_cues(size, args.seed, args.loops)
+        times = []
+        for _ in range(args.runs):
+            cues = _copy_cues(source)
+            stats = hallucination_filter.FilterStats()
+            start = time.perf_counter()
+            cue_filter.apply(cues, stats)
+            times.append(time.perf_counter() - start)
+        elapsed = min(times)
+        per_cue.append(elapsed / size * 1e6)
+        print(f"{size:>10,}{elapsed * 1000:>12.1f}{per_cue[-1]:>10.2f}{stats.removed:>12,}"
+              f"{stats.saved_characters:>9,} ({stats.saved_characters / stats.characters:.1%})")
+    growth = per_cue[-1] / per_cue[0]
+    print(f"자막당 시간 변화 (가장 큰 입력 / 가장 작은 입력): {growth:.2f}배 "
+          f"({'선형' if growth < 1.5 else '선형보다 느림'})")
+    return 1 if status or growth >= 1.5 else 0
+
+
+# ────────────────────────────────────────────────────────────────
+# 12. 출력 프로파일 벤치마크
+# ────────────────────────────────────────────────────────────────
+
+def _profile_run(folder: Path, names: tuple, latency: float, options: dict) -> translation.FakeBackend:
+    """폴더의 모든 파일을 직렬로 병합 → 번역 → 규칙/저장 (names 프로파일로)"""
+    backend = translation.FakeBackend(latency=latency)
+    for path in sorted(folder.glob("*.srt")):
+        if output_profiles.is_output_stem(path.stem):
+            continue
+        job = pipeline.FileJob(path, output_profiles.PROFILES[names[0]].output_path(path), "new", True,
+                               profiles=names)
+        job = pipeline.prepare_file(job)
+        job = pipeline.translate_file(job, backend, {}, **options)
+        job = pipeline.finish_file(job)
+        if job.error:
+            raise RuntimeError(job.error)
+    return backend
+
+
+def bench_profiles(args):
+    """
+    출력 프로파일 N개: 프로파일마다 전체 실행(기존, 번역도 다시) vs 갈래 체인(번역/공통 규칙 한 번)
+    1) 규칙 단계만: 전체 체인 1회, 프로파일마다 전체 체인, 갈래 체인 (+ 공통/갈래 구간별 시간, 결과 동일성)
+    2) 파일 처리 전체: 가짜 번역 백엔드로 시간/요청 수/청구 문자, 출력 파일 동일성
+    """
+    names = output_profiles.parse_profiles(args.profiles)
+    base = pipeline.process_rule_chain(args.rules)
+    base.compile()
+    profile_chain = output_profiles.ProfileChain(base.groups, names)
+    full_chains = {name: rule_engine.RuleChain(output_profiles.PROFILES[name].groups(base.groups))
+                   for name in names}
+    texts = make_rule_corpus(base, args.cues, args.seed)
+    source = [srt_stream.Cue(i, i * 1000, i * 1000 + 900, text.split("\n")) for i, text in enumerate(texts)]
+    print(f"출력 프로파일 {', '.join(names)}, 번역문 자막 {len(source):,}개, 측정 {args.runs}회 최소값")
+    print(profile_chain.describe())
+
+    def best(func) -> tuple[float, object]:
+        times = []
+        for _ in range(args.runs):
+            cues = _copy_cues(source)
+            start = time.perf_counter()
+            result = func(cues)
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    single, _ = best(lambda cues: list(base.apply_cues(cues)))
+    separate = {}
+    reference = {}
+    for name, chain in full_chains.items():
+        separate[name], result = best(lambda cues: list(chain.apply_cues(cues)))
+        reference[name] = [cue.lines for cue in result]
+    branched, result = best(profile_chain.apply_cues)
+    same = all([cue.lines for cue in result[name]] == reference[name] for name in names)
+
+    # 구간별 시간: 공통 앞부분 1회 + 갈래마다 나머지
+    root = profile_chain.root
+    prefix, _ = best(lambda cues: list(root.chain.apply_cues(cues)) if root.chain else cues)
+    suffixes = []
+    for child in root.children:
+        spent, _ = best(lambda cues: list(child.chain.apply_cues(cues)) if child.chain else cues)
+        suffixes.append(spent)
+
+    print(f"\n{'규칙 단계':<28}{'시간(ms)':>10}{'전체 1회 대비':>14}")
+    rows = [("전체 체인 1회 (템플릿 그대로)", single),
+            (f"프로파일마다 전체 체인 x{len(names)}", sum(separate.values())),
+            ("갈래 체인 (공통 1회 + 갈래)", branched),
+            ("  공통 앞부분", prefix),
+            ("  갈래 합계", sum(suffixes))]
+    for label, seconds in rows:
+        print(f"{label:<28}{seconds * 1000:>10.1f}{seconds / single:>13.2f}x")
+    print(f"프로파일별 결과 동일 (갈래 체인 vs 전체 체인): {'예' if same else '아니오'}")
+    status = 0 if same else 1
+
+    # 파일 처리 전체 (병합 → 번역 → 규칙/저장)
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(tmp) / "source"
+        corpus.mkdir()
+        cues = sum(write_srt_corpus(corpus / f"{i:03d}.srt", args.kb * 1024, args.seed + i)
+                   for i in range(args.files))
+        print(f"\n파일 {args.files}개 x {args.kb} KB (자막 {cues:,}개), 번역 요청당 지연 {args.latency * 1000:.0f} ms")
+        print(f"{'방식':<28}{'시간(s)':>10}{'요청':>8}{'청구 문자':>12}")
+        hallucination_filter.process_filter()     # 필터/프로파일 체인 로드는 측정에서 제외
+        pipeline.process_profile_chain(names)
+        pipeline.process_profile_chain(names[:1])
+        with ThreadPoolExecutor(max_workers=translation.DEFAULT_WORKERS) as executor:
+            options = dict(executor=executor, max_chars=translation.DEFAULT_BATCH_CHARS,
+                           max_items=translation.DEFAULT_BATCH_ITEMS)
+            runs = [(f"프로파일 1개 ({names[0]})", [names[:1]]),
+                    (f"프로파일마다 실행 x{len(names)}", [(name,) for name in names]),
+                    (f"갈래 체인 {len(names)}개 한 번에", [names])]
+            outputs = {}
+            for label, batches in runs:
+                folder = Path(tmp) / f"run{len(outputs)}"
+                start = time.perf_counter()
+                requests = characters = 0
+                for batch in batches:
+                    shutil.copytree(corpus, folder, dirs_exist_ok=True)   # 매번 병합 전 원본부터
+                    backend = _profile_run(folder, batch, args.latency, options)
+                    requests += backend.requests
+                    characters += backend.characters
+                elapsed = time.perf_counter() - start
+                outputs[label] = {p.name: p.read_bytes() for p in folder.glob("*.ko.*.srt")}
+                print(f"{label:<28}{elapsed:>10.2f}{requests:>8,}{characters:>12,}")
+        labels = list(outputs)
+        same = outputs[labels[1]] == outputs[labels[2]]
+        print(f"출력 파일 동일 (프로파일마다 실행 vs 갈래 체인): {'예' if same else '아니오'}")
+        status |= not same
+    return status
+
+
+# ────────────────────────────────────────────────────────────────
+# 13. 회귀 벤치마크 모음 (합성 말뭉치 + 가짜 번역기, 기준값 저장/비교)
+# ────────────────────────────────────────────────────────────────
+
+BASELINE_PATH = Path(__file__).with_name("benchmark_baseline.json")
+
+# 측정 규모와 말뭉치 설정 (가짜 번역 지연/오류 비율과 함께 기준값에 저장, 설정이 다르면 비교하지 않음)
+SUITE_CONFIG = {
+    "cues": 20000,              # parse / merge / rest_phrases / rules / ja_filter 자막 수
+    "file_cues": 3000,          # file: 파일 하나 자막 수
+    "files": 8,                 # folder: 파일 수
+    "folder_cues": 600,         # folder: 파일당 자막 수
+    "tree_files": 2000,         # get_srt_files: 폴더 트리 안 파일 수
+    "single_char": 0.1,         # 1글자 자막 비율
+    "repeat": 0.05,             # 앞 자막 반복 비율
+    "multiline": 0.2,           # 두 줄 자막 비율
+    "rest": 0.02,               # 휴식 표현 자막 비율
+    "seed": 0,
+}
+QUICK_CONFIG = dict(SUITE_CONFIG, cues=4000, file_cues=600, files=4, folder_cues=200, tree_files=400)
+
+
+def make_srt_text(cues: int, seed: int = 0, single_char_ratio: float = 0.1, repeat_ratio: float = 0.05,
+                  multiline_ratio: float = 0.2, rest_ratio: float = 0.02) -> str:
+    """
+    일본어 SRT 하나 (자막 cues 개, 같은 인자면 항상 같은 내용)
+    - single_char_ratio : "あ" 같은 1글자 자막 (병합 대상)
+    - repeat_ratio      : 앞 자막과 같은 대사 또는 환각 문장 반복 (환각/반복 필터 대상)
+    - multiline_ratio   : 두 줄 자막
+    - rest_ratio        : 휴식 표현 자막 (휴식 표현 제거 대상)
+    """
+    rng = random.Random(seed)
+    blocks = []
+    clock = 0
+    text = ""
+    for number in range(1, cues + 1):
+        start = clock + rng.randint(0, 500)
+        clock = start + rng.randint(300, 4000)
+        roll = rng.random()
+        if roll < single_char_ratio:
+            text = rng.choice("あうんえおっ")
+        elif roll < single_char_ratio + rest_ratio:
+            text = "少し休憩してください。"
+        elif roll < single_char_ratio + rest_ratio + repeat_ratio:
+            text = text if text and rng.random() < 0.5 else rng.choice(HALLUCINATION_LINES)
+        else:
+            text = "".join(rng.choice(JAPANESE_PHRASES) for _ in range(rng.randint(1, 3)))
+            if rng.random() < multiline_ratio:
+                text += "\n" + rng.choice(JAPANESE_PHRASES)
+        blocks.append(f"{number}\n{srt_stream.format_time_line(start, clock)}\n{text}\n")
+    return "\n".join(blocks)
+
+
+def write_srt_file(path: Path, text: str, bom: bool = False):
+    """합성 SRT 저장 (bom 이면 BOM付き UTF-8, Windows 도구로 만든 자막처럼)"""
+    path.write_text(text, encoding="utf-8-sig" if bom else "utf-8", newline="\n")
+
+
+def _corpus_text(config: dict, cues: int, seed: int = 0) -> str:
+    return make_srt_text(cues, config["seed"] + seed, config["single_char"], config["repeat"],
+                         config["multiline"], config["rest"])
+
+
+def _write_folder(folder: Path, config: dict) -> int:
+    """folder 측정용 원본: 파일마다 다른 시드, 홀수 번째는 BOM 포함"""
+    folder.mkdir(parents=True)
+    for i in range(config["files"]):
+        write_srt_file(folder / f"{i:03d}.srt", _corpus_text(config, config["folder_cues"], i + 1), bom=i % 2 == 1)
+    return config["files"]
+
+
+def _write_tree(root: Path, count: int):
+    """get_srt_files 측정용 폴더 트리: 원본 .srt, 결과 .ko.srt / .ko.polite.srt, 기타 파일을 섞어 2단계 하위 폴더에"""
+    names = ["{}.srt", "{}.ko.srt", "{}.ko.polite.srt", "{}.txt"]
+    for i in range(count):
+        folder = root / f"d{i % 10}" / f"e{i // 10 % 10}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / names[i % len(names)].format(f"f{i:05d}")).touch()
+
+
+def calibrate(runs: int = 11) -> float:
+    """
+    기계 속도 보정값: 고정된 순수 Python 작업(문자열 분리/정규식/dict)의 최소 시간 (초)
+    측정값을 이 값으로 나눈 값도 저장하므로 기준값을 만든 기계와 속도가 달라도 대략 비교 가능 (--normalize)
+    """
+    lines = [f"{i}\n00:00:{i % 60:02d},000 --> 00:00:{i % 60:02d},500\nテキスト{i}" for i in range(20000)]
+    pattern = re.compile(r"(\d+):(\d+)")
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        counts = {}
+        for line in lines:
+            parts = line.split("\n")
+            match = pattern.search(parts[1])
+            counts[parts[2][-1]] = counts.get(parts[2][-1], 0) + int(match.group(2))
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+class SuiteCase:
+    """측정 항목 하나: prepare() 결과(측정 제외)를 run() 에 넘겨 시간 측정, 처리량은 units 개 기준"""
+
+    def __init__(self, name: str, description: str, unit: str, units: int, run, prepare=None):
+        self.name = name
+        self.description = description
+        self.unit = unit
+        self.units = units
+        self.run = run
+        self.prepare = prepare or (lambda: None)
+
+
+def suite_cases(config: dict, tmp: Path, make_backend, executor) -> list[SuiteCase]:
+    """측정 항목 목록 (말뭉치/폴더는 tmp 아래에 한 번만 만들고 file/folder 는 매번 새 복사본에서)"""
+    import srt_merge_and_translate as app
+
+    text = _corpus_text(config, config["cues"])
+    cues = list(srt_stream.parse_srt_string(text))
+    lines = [line for cue in cues for line in cue.lines]
+    chain = pipeline.process_rule_chain()
+    korean = [srt_stream.Cue(i, i * 1000, i * 1000 + 900, line.split("\n"))
+              for i, line in enumerate(make_rule_corpus(chain, config["cues"], config["seed"]))]
+    cue_filter = hallucination_filter.process_filter()
+    merged = list(srt_stream.merge_stages(cues))
+
+    file_source = tmp / "file" / "source.srt"
+    file_source.parent.mkdir()
+    write_srt_file(file_source, _corpus_text(config, config["file_cues"], 100), bom=True)
+    folder_source = tmp / "folder"
+    _write_folder(folder_source, config)
+    tree = tmp / "tree"
+    _write_tree(tree, config["tree_files"])
+    counter = iter(range(1_000_000))
+
+    def fresh_copy(source: Path):
+        def prepare() -> Path:
+            target = tmp / f"run{next(counter)}"
+            shutil.copytree(source, target)
+            return target
+        return prepare
+
+    def process_file(folder: Path):
+        app.process_srt_file(folder / file_source.name, executor=executor, backend=make_backend())
+
+    def process_folder(folder: Path):
+        backend = make_backend()
+        for path in sorted(app.get_srt_files(folder)):
+            app.process_srt_file(path, executor=executor, backend=backend)
+
+    return [
+        SuiteCase("parse", "SRT 파싱 (parse_srt_string)", "자막", len(cues),
+                  lambda _: list(srt_stream.parse_srt_string(text))),
+        SuiteCase("merge", "1글자 병합 (merge_single_char_captions)", "자막", len(cues),
+                  lambda _: app.merge_single_char_captions(text)),
+        SuiteCase("rest_phrases", "휴식 표현 제거 (remove_little_rest_phrases)", "줄", len(lines),
+                  lambda _: [app.remove_little_rest_phrases(line) for line in lines]),
+        SuiteCase("rules", "다중 바꾸기 규칙 체인", "자막", len(korean),
+                  lambda source: list(chain.apply_cues(source)), lambda: _copy_cues(korean)),
+        SuiteCase("ja_filter", "일본어 환각/반복 필터", "자막", len(merged),
+                  cue_filter.apply, lambda: _copy_cues(merged)),
+        SuiteCase("get_srt_files", "처리 대상 찾기 (get_srt_files)", "파일", config["tree_files"],
+                  lambda _: app.get_srt_files(tree)),
+        SuiteCase("file", "파일 하나 처리 (process_srt_file)", "자막", config["file_cues"],
+                  process_file, fresh_copy(file_source.parent)),
+        SuiteCase("folder", "폴더 처리 (get_srt_files + process_srt_file)", "파일", config["files"],
+                  process_folder, fresh_copy(folder_source)),
+    ]
+
+
+def run_case(case: SuiteCase, runs: int) -> float:
+    """준비 실행 1회 뒤 runs 회 측정한 최소 시간 (초, 진행 메시지는 숨김)"""
+    times = []
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        for i in range(runs + 1):
+            value = case.prepare()
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                start = time.perf_counter()
+                case.run(value)
+                elapsed = time.perf_counter() - start
+            finally:
+                sys.stdout = stdout
+            if i:
+                times.append(elapsed)
+    return min(times)
+
+
+def compare_baseline(results: dict, baseline: dict, threshold: float, key: str = "seconds") -> list[str]:
+    """
+    시간이 기준값보다 threshold 넘게 늘어난 항목 이름
+    key: "seconds" (같은 기계의 기준값과 비교) 또는 "score" (보정값으로 나눈 값, 다른 기계와 비교)
+    """
+    slower = []
+    for name, result in results.items():
+        base = baseline["results"].get(name)
+        if base is not None and result[key] > base[key] * (1 + threshold):
+            slower.append(name)
+    return slower
+
+
+def bench_suite(args):
+    """
+    회귀 벤치마크 모음: 합성 일본어 SRT + 가짜 번역 백엔드(네트워크 없음)로 항목별 시간 측정
+    --save 면 기준값 파일에 저장, 아니면 기준값과 비교해 threshold 넘게 느려진 항목이 있으면 1 반환
+    (기본은 측정 시간 그대로 비교, --normalize 면 기계 속도 보정값으로 나눈 값으로 비교)
+    """
+    key = "score" if args.normalize else "seconds"
+    config = dict(QUICK_CONFIG if args.quick else SUITE_CONFIG, seed=args.seed,
+                  latency=args.latency, errors=args.errors)
+    only = set(args.only.split(",")) if args.only else None
+    baseline = None
+    if not args.save:
+        if args.baseline.exists():
+            baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+            if baseline.get("config") != config:
+                print(f"기준값 설정이 다릅니다 ({args.baseline.name}): 비교하지 않고 측정만 합니다. "
+                      f"(같은 설정으로 --save 해서 기준값을 다시 만드세요)")
+                baseline = None
+        else:
+            print(f"기준값 파일 없음: {args.baseline} (--save 로 만들 수 있습니다)")
+
+    pipeline.process_rule_chain().compile()         # 규칙/필터 로드는 측정에서 제외
+    hallucination_filter.process_filter()
+    before = calibrate()
+    print(f"측정 {args.runs}회 최소값, 가짜 번역 지연 {args.latency * 1000:.0f} ms / 503 {args.errors:.0%}")
+
+    counter = iter(range(1_000_000))
+
+    def make_backend():
+        # 재시도 대기는 짧게 (오류 주입 시에도 결과가 모두 번역되는지만 확인)
+        return rate_limit.ResilientBackend(
+            translation.FakeBackend(latency=args.latency, error_rate=args.errors, seed=args.seed + next(counter)),
+            max_concurrency=translation.DEFAULT_WORKERS,
+            retry=rate_limit.RetryPolicy(base_delay=0.001, max_delay=0.01, seed=args.seed))
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, \
+            ThreadPoolExecutor(max_workers=translation.DEFAULT_WORKERS) as executor:
+        cases = [case for case in suite_cases(config, Path(tmp), make_backend, executor)
+                 if not only or case.name in only]
+        times = {case.name: run_case(case, args.runs) for case in cases}
+        # 보정값은 측정 앞뒤의 최소값 (측정 중에 기계가 잠깐 느려졌던 영향을 줄임)
+        calibration = min(before, calibrate())
+
+        def record(case: SuiteCase):
+            results[case.name] = {"seconds": round(times[case.name], 6),
+                                  "score": round(times[case.name] / calibration, 4),
+                                  "units": case.units, "unit": case.unit}
+
+        for case in cases:
+            record(case)
+            if baseline and compare_baseline({case.name: results[case.name]}, baseline, args.threshold, key):
+                # 느려 보이면 한 번 더 측정 (한두 번 튄 값 때문에 실패하지 않도록, 두 측정의 최소값)
+                times[case.name] = min(times[case.name], run_case(case, args.runs * 2))
+                record(case)
+
+    print(f"기계 속도 보정값 {calibration * 1000:.1f} ms"
+          + (f" (기준값 {baseline['calibration'] * 1000:.1f} ms)" if baseline else ""))
+    print(f"{'항목':<14}{'시간(ms)':>10}{'처리량(/s)':>14}{'기준 대비':>10}  설명")
+    for case in cases:
+        seconds = times[case.name]
+        base = baseline and baseline["results"].get(case.name)
+        ratio = f"{results[case.name][key] / base[key]:.2f}x" if base else "-"
+        print(f"{case.name:<14}{seconds * 1000:>10.1f}{case.units / seconds:>10,.0f} {case.unit:<3}"
+              f"{ratio:>10}  {case.description}")
+
+    if args.save:
+        if only and args.baseline.exists():
+            # 일부 항목만 측정했으면 나머지 기준값은 유지
+            saved = json.loads(args.baseline.read_text(encoding="utf-8"))
+            if saved.get("config") == config:
+                results = {**saved["results"], **results}
+        args.baseline.write_text(json.dumps({
+            "config": config,
+            "calibration": round(calibration, 6),
+            "python": sys.version.split()[0],
+            "results": results,
+        }, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"기준값 저장: {args.baseline}")
+        return 0
+    if baseline is None:
+        return 0
+    slower = compare_baseline(results, baseline, args.threshold, key)
+    if slower:
+        print(f"성능 저하 (기준값보다 {args.threshold:.0%} 넘게 느림): {', '.join(slower)}")
+        return 1
+    print(f"성능 저하 없음 (허용 {args.threshold:.0%})")
+    return 0
+
+
+def write_corpus(args):
+    """합성 일본어 SRT 파일 생성 (수동 테스트/다른 벤치마크 입력용)"""
+    args.output.mkdir(parents=True, exist_ok=True)
+    for i in range(args.files):
+        text = make_srt_text(args.cues, args.seed + i, args.single_char, args.repeat, args.multiline, args.rest)
+        path = args.output / f"{i:03d}.srt"
+        write_srt_file(path, text, bom=args.bom)
+    print(f"합성 SRT {args.files}개 x 자막 {args.cues:,}개 → {args.output}")
+    return 0
+
+
+# ────────────────────────────────────────────────────────────────
+# 14. 진입점
+# ────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Subtitle-Edit-KOR 성능 벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rules = sub.add_parser("rules", help="규칙 체인 순차 vs 디스패치 vs 리터럴 빠른 경로")
+    rules.add_argument("--rules", type=Path, default=rule_engine.DEFAULT_TEMPLATE)
+    rules.add_argument("--cues", type=int, default=20000)
+    rules.add_argument("--cues-per-file", type=int, default=1500)
+    rules.add_argument("--seed", type=int, default=0)
+    rules.set_defaults(func=bench_rules)
+
+    trans = sub.add_parser("translate", help="블록별 직렬 번역 vs 배치 + 동시 번역")
+    trans.add_argument("--cues", type=int, default=300)
+    trans.add_argument("--latency", type=float, default=0.05, help="요청당 지연 (초)")
+    trans.add_argument("--workers", type=int, default=translation.DEFAULT_WORKERS)
+    trans.add_argument("--batch-chars", type=int, default=translation.DEFAULT_BATCH_CHARS)
+    trans.add_argument("--batch-items", type=int, default=translation.DEFAULT_BATCH_ITEMS)
+    trans.add_argument("--http", action="store_true", help="가짜 DeepL HTTP 서버 + deepl 클라이언트 사용")
+    trans.add_argument("--seed", type=int, default=0)
+    trans.set_defaults(func=bench_translate)
+
+    srt = sub.add_parser("srt", help="대용량 SRT 병합: 문자열 방식 vs 스트리밍")
+    srt.add_argument("--mb", type=float, default=100, help="입력 크기 (MB)")
+    srt.add_argument("--no-memory", action="store_true", help="tracemalloc 메모리 측정 생략")
+    srt.add_argument("--seed", type=int, default=0)
+    srt.set_defaults(func=bench_srt)
+
+    retry = sub.add_parser("retry", help="429/503 주입: 재시도 없음 vs 재시도 + AIMD")
+    retry.add_argument("--cues", type=int, default=2000)
+    retry.add_argument("--latency", type=float, default=0.02, help="요청당 지연 (초)")
+    retry.add_argument("--throttle", type=float, default=0.2, help="429 비율 (0~1)")
+    retry.add_argument("--errors", type=float, default=0.05, help="503 비율 (0~1)")
+    retry.add_argument("--rate", type=float, default=None, help="초당 최대 요청 수")
+    retry.add_argument("--max-retries", type=int, default=rate_limit.DEFAULT_MAX_RETRIES)
+    retry.add_argument("--base-delay", type=float, default=0.05, help="첫 재시도 최대 대기 (초)")
+    retry.add_argument("--workers", type=int, default=translation.DEFAULT_WORKERS)
+    retry.add_argument("--batch-chars", type=int, default=translation.DEFAULT_BATCH_CHARS)
+    retry.add_argument("--batch-items", type=int, default=10)
+    retry.add_argument("--http", action="store_true", help="가짜 DeepL HTTP 서버 + deepl 클라이언트 사용")
+    retry.add_argument("--seed", type=int, default=0)
+    retry.set_defaults(func=bench_retry)
+
+    pipe = sub.add_parser("pipeline", help="폴더 처리: 직렬 vs 파이프라인 (--jobs 별)")
+    pipe.add_argument("--files", type=int, default=32)
+    pipe.add_argument("--kb", type=int, default=100, help="파일당 크기 (KB)")
+    pipe.add_argument("--latency", type=float, default=0.05, help="번역 요청당 지연 (초)")
+    pipe.add_argument("--jobs", default="1,2,4,8", help="비교할 프로세스 수 목록 (쉼표 구분)")
+    pipe.add_argument("--workers", type=int, default=translation.DEFAULT_WORKERS,
+                      help="동시 번역 요청 수 (모든 방식 공통)")
+    pipe.add_argument("--batch-chars", type=int, default=translation.DEFAULT_BATCH_CHARS)
+    pipe.add_argument("--batch-items", type=int, default=translation.DEFAULT_BATCH_ITEMS)
+    pipe.add_argument("--seed", type=int, default=0)
+    pipe.set_defaults(func=bench_pipeline)
+
+    cold = sub.add_parser("coldstart", help="규칙 체인 콜드 스타트: XML vs 규칙 팩")
+    cold.add_argument("--rules", type=Path, default=rule_engine.DEFAULT_TEMPLATE)
+    cold.add_argument("--cues", type=int, default=1500, help="첫 파일 자막 수")
+    cold.add_argument("--runs", type=int, default=5, help="방식별 측정 횟수")
+    cold.add_argument("--seed", type=int, default=0)
+    cold.set_defaults(func=bench_coldstart)
+
+    start = sub.add_parser("startup", help="srt_merge_and_translate import / --no-translate 실행 시작 비용")
+    start.add_argument("--files", type=int, default=4)
+    start.add_argument("--kb", type=int, default=20, help="파일당 크기 (KB)")
+    start.add_argument("--runs", type=int, default=7)
+    start.add_argument("--seed", type=int, default=0)
+    start.set_defaults(func=bench_startup)
+
+    timing = sub.add_parser("timing", help="타이밍 엔진: 기존 1글자 병합 vs NumPy 일괄 처리")
+    timing.add_argument("--cues", type=int, default=100000)
+    timing.add_argument("--runs", type=int, default=3)
+    timing.add_argument("--seed", type=int, default=0)
+    timing.set_defaults(func=bench_timing)
+
+    backup = sub.add_parser("backup", help="원본 백업: 파일마다 .bak vs 내용 주소 백업 저장소")
+    backup.add_argument("--files", type=int, default=10000)
+    backup.add_argument("--kb", type=int, default=8, help="파일당 크기 (KB)")
+    backup.add_argument("--dup", type=float, default=0.2, help="같은 내용 파일 비율 (0~1)")
+    backup.add_argument("--seed", type=int, default=0)
+    backup.set_defaults(func=bench_backup)
+
+    jafilter = sub.add_parser("filter", help="번역 전 환각/반복 필터: 고정 자막 확인 + 자막 수별 시간")
+    jafilter.add_argument("--rules", type=Path, default=rule_engine.DEFAULT_TEMPLATE)
+    jafilter.add_argument("--cues", default="10000,40000,160000", help="비교할 자막 수 목록 (쉼표 구분)")
+    jafilter.add_argument("--loops", type=float, default=0.02, help="자막마다 반복이 시작될 확률 (0~1)")
+    jafilter.add_argument("--runs", type=int, default=3)
+    jafilter.add_argument("--seed", type=int, default=0)
+    jafilter.set_defaults(func=bench_filter)
+
+    profiles = sub.add_parser("profiles", help="출력 프로파일 N개: 프로파일마다 실행 vs 공통 앞부분 공유 갈래 체인")
+    profiles.add_argument("--rules", type=Path, default=rule_engine.DEFAULT_TEMPLATE)
+    profiles.add_argument("--profiles", default="polite,casual", help="비교할 출력 프로파일 (쉼표 구분)")
+    profiles.add_argument("--cues", type=int, default=20000, help="규칙 단계 측정용 번역문 자막 수")
+    profiles.add_argument("--runs", type=int, default=3)
+    profiles.add_argument("--files", type=int, default=8)
+    profiles.add_argument("--kb", type=int, default=60, help="파일당 크기 (KB)")
+    profiles.add_argument("--latency", type=float, default=0.05, help="번역 요청당 지연 (초)")
+    profiles.add_argument("--seed", type=int, default=0)
+    profiles.set_defaults(func=bench_profiles)
+
+    suite = sub.add_parser("suite", help="회귀 벤치마크 모음: 항목별 시간 측정 + 기준값 저장/비교 (오프라인)")
+    suite.add_argument("--save", action="store_true", help="측정값을 기준값 파일에 저장")
+    suite.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    suite.add_argument("--threshold", type=float, default=0.25, help="허용 성능 저하 비율 (0.25 = 25%%)")
+    suite.add_argument("--only", default="", help="측정할 항목만 (쉼표 구분, 예: parse,merge)")
+    suite.add_argument("--runs", type=int, default=5, help="항목별 측정 횟수 (최소값 사용)")
+    suite.add_argument("--normalize", action="store_true",
+                       help="기계 속도 보정값으로 나눈 값으로 비교 (기준값을 만든 기계와 다를 때)")
+    suite.add_argument("--quick", action="store_true", help="작은 규모로 빠르게 (기준값도 따로 만들어야 함)")
+    suite.add_argument("--latency", type=float, default=0.0, help="가짜 번역 요청당 지연 (초)")
+    suite.add_argument("--errors", type=float, default=0.0, help="가짜 번역 503 비율 (0~1)")
+    suite.add_argument("--seed", type=int, default=0)
+    suite.set_defaults(func=bench_suite)
+
+    corpus = sub.add_parser("corpus", help="합성 일본어 SRT 파일 생성")
+    corpus.add_argument("output", type=Path, help="저장할 폴더")
+    corpus.add_argument("--files", type=int, default=1)
+    corpus.add_argument("--cues", type=int, default=1500, help="파일당 자막 수")
+    corpus.add_argument("--single-char", type=float, default=0.1, help="1글자 자막 비율 (0~1)")
+    corpus.add_argument("--repeat", type=float, default=0.05, help="반복 자막 비율 (0~1)")
+    corpus.add_argument("--multiline", type=float, default=0.2, help="두 줄 자막 비율 (0~1)")
+    corpus.add_argument("--rest", type=float, default=0.02, help="휴식 표현 자막 비율 (0~1)")
+    corpus.add_argument("--bom", action="store_true", help="BOM付き UTF-8 로 저장")
+    corpus.add_argument("--seed", type=int, default=0)
+    corpus.set_defaults(func=write_corpus)
+
+    args = parser.parse_args()
+    raise SystemExit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
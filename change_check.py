@@ -1,21 +1,49 @@
+import argparse
 import xml.etree.ElementTree as ET
-import xml.dom.minidom as minidom
 import os
 import re
+import time
+
+from rule_engine import load_rule_chain, rule_pack_path, rule_source_hash, save_rule_pack
+
+
+# 기본 경로 (원시 문자열 사용)
+DEFAULT_INPUT = r".\multiple_replace_groups.template"
+DEFAULT_OUTPUT_DIR = r".\change_check"
 
-def prettify(element):
-    """XML 요소를 문자열로 변환하고 들여쓰기를 적용 (줄바꿈 제거 포함)"""
-    rough_string = ET.tostring(element, encoding='utf-8').decode('utf-8')  # bytes → str 변환
-    rough_string = rough_string.replace("\n", "").strip()  # 줄바꿈 제거 및 공백 정리
-    parsed = minidom.parseString(rough_string)  # 문자열 파싱
-    return parsed.toprettyxml(indent="  ")
 
 def sanitize_filename(name):
     """파일 이름에 사용할 수 없는 문자 제거 및 공백 처리"""
     # 파일 이름에서 허용되지 않는 문자 제거 (윈도우 기준)
     return re.sub(r'[<>:"/\\|?*]', '', name).replace(" ", "_")
 
+
+def write_group(group, output_file):
+    """<Group> 하나를 <Settings><MultipleSearchAndReplaceList> 로 감싸 들여쓰기 후 저장"""
+    new_root = ET.Element('Settings')
+    new_parent = ET.SubElement(new_root, 'MultipleSearchAndReplaceList')
+    new_parent.append(group)
+
+    # 기존 들여쓰기 공백(자식이 있는 요소의 text, 모든 tail)만 제거 후 다시 들여쓰기 적용
+    # 자식이 없는 요소의 text 는 규칙 값이므로 공백뿐이어도 그대로 (<FindWhat>　</FindWhat> 등)
+    for element in new_root.iter():
+        if len(element) and element.text is not None and not element.text.strip():
+            element.text = None
+        if element.tail is not None and not element.tail.strip():
+            element.tail = None
+    ET.indent(new_root, space="  ")
+
+    tree = ET.ElementTree(new_root)
+    with open(output_file, 'wb') as f:
+        tree.write(f, encoding='utf-8', xml_declaration=True)
+        f.write(b"\n")
+
+
 def split_xml_by_group(input_file, output_dir):
+    """
+    템플릿을 <Group> 별 XML 파일로 나눕니다.
+    iterparse 로 그룹 하나씩 읽어 바로 저장하고 메모리에서 지우므로 템플릿 전체 트리를 만들지 않습니다.
+    """
     print(f"🔎 입력 파일 경로: {input_file}")
     print(f"📂 출력 폴더 경로: {output_dir}")
 
@@ -27,57 +55,85 @@ def split_xml_by_group(input_file, output_dir):
         print(f"❌ 출력 폴더 생성 중 오류 발생: {e}")
         return
 
-    # XML 파싱
+    # XML 스트리밍 파싱 (<MultipleSearchAndReplaceList> 바로 아래 <Group> 만)
+    print("📥 XML 파일 파싱 시작...")
+    path = []
+    found_list = False
+    count = 0
     try:
-        print("📥 XML 파일 파싱 시작...")
-        tree = ET.parse(input_file)
-        root = tree.getroot()
-        print("✅ XML 파싱 성공!")
+        for event, element in ET.iterparse(input_file, events=("start", "end")):
+            if event == "start":
+                path.append(element.tag)
+                if element.tag == 'MultipleSearchAndReplaceList':
+                    found_list = True
+                continue
+
+            is_group = path[-2:] == ['MultipleSearchAndReplaceList', 'Group']
+            path.pop()
+            if not is_group:
+                continue
+
+            # Group 태그마다 파일 생성
+            count += 1
+            # <Name> 태그 값 가져오기
+            name = element.findtext('Name')
+            filename = sanitize_filename(name) if name else f"group_{count}"
+            output_file = os.path.join(output_dir, f"{filename}.xml")
+            try:
+                write_group(element, output_file)
+                print(f"✅ 파일 생성 완료: {output_file}")
+            except Exception as e:
+                print(f"❌ 파일 생성 중 오류 발생 ({output_file}): {e}")
+            element.clear()
     except Exception as e:
         print(f"❌ XML 파싱 중 오류 발생: {e}")
         return
 
-    # Group 태그 찾기
-    parent = root.find('MultipleSearchAndReplaceList')
-    if parent is None:
+    if not found_list:
         print("⚠️ <MultipleSearchAndReplaceList> 태그가 발견되지 않았습니다.")
         return
+    print(f"🔎 발견된 <Group> 태그 개수: {count}")
+    if not count:
+        print("⚠️ <Group> 태그가 발견되지 않았습니다.")
 
-    groups = parent.findall('Group')
-    print(f"🔎 발견된 <Group> 태그 개수: {len(groups)}")
 
-    if not groups:
-        print("⚠️ <Group> 태그가 발견되지 않았습니다.")
-        return
+def compile_rules(source, output=None):
+    """
+    규칙 팩(.rulepack) 생성
+    템플릿 파일 또는 그룹 XML 폴더를 파싱/변환해서 rule_engine 이 바로 불러올 수 있는 팩으로 저장합니다.
+    (원본 내용 해시가 들어 있어 원본이 바뀌면 자동으로 무시되고 다시 만들어짐)
+    """
+    print(f"🔎 규칙 원본: {source}")
+    start = time.perf_counter()
+    chain = load_rule_chain(source, cache=False)
+    output = output or rule_pack_path(source)
+    save_rule_pack(chain, output, rule_source_hash(source))
+    elapsed = time.perf_counter() - start
+    print(f"✅ 규칙 팩 생성 완료: {output} "
+          f"(규칙 {len(chain)}개, {os.path.getsize(output):,} bytes, {elapsed * 1000:.0f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="다중 바꾸기 템플릿 그룹별 분리 / 규칙 팩 생성")
+    sub = parser.add_subparsers(dest="command")
+
+    split = sub.add_parser("split", help="템플릿을 그룹별 XML 로 분리 (기본)")
+    split.add_argument("input", nargs="?", default=DEFAULT_INPUT)
+    split.add_argument("output_dir", nargs="?", default=DEFAULT_OUTPUT_DIR)
+
+    pack = sub.add_parser("compile", help="규칙 팩(.rulepack) 생성")
+    pack.add_argument("source", nargs="?", default=DEFAULT_INPUT,
+                      help="템플릿 파일 또는 그룹 XML 폴더")
+    pack.add_argument("-o", "--output", help="팩 파일 (기본: 원본 옆 .rulepack)")
+
+    args = parser.parse_args()
+    if args.command == "compile":
+        compile_rules(args.source, args.output)
+    elif args.command == "split":
+        split_xml_by_group(args.input, args.output_dir)
+    else:
+        split_xml_by_group(DEFAULT_INPUT, DEFAULT_OUTPUT_DIR)
+
 
-    # Group 태그마다 파일 생성
-    for idx, group in enumerate(groups, start=1):
-        # <Name> 태그 값 가져오기
-        name_tag = group.find('Name')
-        if name_tag is not None and name_tag.text:
-            filename = sanitize_filename(name_tag.text)
-        else:
-            filename = f"group_{idx}"
-
-        output_file = os.path.join(output_dir, f"{filename}.xml")
-
-        try:
-            # 새로운 루트 요소와 구조 생성
-            new_root = ET.Element('Settings')
-            new_parent = ET.SubElement(new_root, 'MultipleSearchAndReplaceList')
-            new_parent.append(group)
-
-            # 들여쓰기 적용된 XML 문자열 생성
-            pretty_xml = prettify(new_root)
-
-            # 파일로 저장
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(pretty_xml)
-            print(f"✅ 파일 생성 완료: {output_file}")
-        except Exception as e:
-            print(f"❌ 파일 생성 중 오류 발생 ({output_file}): {e}")
-
-# 사용 예시 (원시 문자열 사용)
-input_xml = r".\multiple_replace_groups.template"
-output_directory = r".\change_check"
-split_xml_by_group(input_xml, output_directory)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+자막 타이밍 엔진 (NumPy 일괄 처리)
+
+srt_stream.merge_single_char_cues 는 '공백 제외 정확히 1글자' 자막을 다음 자막과
+두 개씩만 병합합니다. 이 모듈은 자막 전체의 시작/종료 시간과 글자 수를 NumPy 배열로 올려
+규칙을 한 번에 적용합니다.
+
+    1. 짧은 자막 병합 : 글자 수(merge_max_chars) 또는 표시 시간(merge_max_duration) 기준,
+                       이어지는 짧은 자막은 다음 자막까지 한 묶음으로 (max_run 으로 묶음 크기 제한)
+    2. 최소 표시 시간 : min_duration
+    3. 읽기 속도      : 초당 글자 수(max_cps)를 넘으면 종료 시간을 늘림
+    4. 간격 닫기      : 다음 자막과의 간격이 close_gap 이하이면 이어 붙임
+    5. 겹침 수정      : 시작 시간 순 정렬 + 종료 시간을 다음 시작(- min_gap) 까지로
+
+- 종료 시간을 늘리는 규칙은 모두 다음 자막 시작 - min_gap 을 넘지 않음
+- fix_overlaps 를 켜면(기본) 결과는 항상 시작 시간 순이고 겹치지 않음
+- LEGACY_RULES 는 merge_single_char_cues 와 같은 결과
+  (두 성질 모두 python -m pytest tests/test_cue_timing.py 로 확인)
+
+numpy 는 선택 의존성입니다. (이 모듈을 쓸 때만 필요: pip install numpy)
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Iterable
+
+try:
+    import numpy as np  # 선택 의존성: 타이밍 엔진을 쓸 때만 필요
+except ImportError:
+    np = None
+
+from srt_stream import (
+    Cue,
+    drop_empty_cues,
+    read_srt,
+    remove_rest_phrases,
+    save_srt,
+    srt_to_string,
+)
+
+
+# ────────────────────────────────────────────────────────────────
+# 1. 타이밍 규칙
+# ────────────────────────────────────────────────────────────────
+
+class TimingRules:
+    """
+    타이밍 엔진 규칙 (시간은 ms, None/0 이면 그 규칙은 끔)
+
+    merge_max_chars    : 공백 제외 글자 수가 이 값 이하인 자막은 다음 자막과 병합
+    merge_max_duration : 표시 시간이 이 값보다 짧은 자막도 다음 자막과 병합
+    merge_max_gap      : 다음 자막과의 간격이 이 값보다 크면 병합하지 않음
+    max_run            : 한 묶음의 최대 자막 수 (None: 짧은 자막이 이어지는 만큼, 2: 기존처럼 두 개씩)
+    min_duration       : 최소 표시 시간
+    max_cps            : 초당 글자 수(공백 제외) 상한
+    close_gap          : 다음 자막과의 간격이 이 값 이하이면 간격을 없앰
+    min_gap            : 자막 사이 최소 간격 (늘리기/겹침 수정 모두 다음 시작 - min_gap 까지)
+    fix_overlaps       : 시작 시간 순 정렬 + 겹치는 자막의 종료 시간을 줄임
+    """
+
+    __slots__ = ("merge_max_chars", "merge_max_duration", "merge_max_gap", "max_run",
+                 "min_duration", "max_cps", "close_gap", "min_gap", "fix_overlaps")
+
+    def __init__(self, merge_max_chars: int | None = 1, merge_max_duration: int = 0,
+                 merge_max_gap: int | None = None, max_run: int | None = None,
+                 min_duration: int = 0, max_cps: float | None = None, close_gap: int = 0,
+                 min_gap: int = 0, fix_overlaps: bool = True):
+        if max_run is not None and max_run < 2:
+            raise ValueError(f"max_run 은 2 이상이어야 합니다: {max_run}")
+        self.merge_max_chars = merge_max_chars
+        self.merge_max_duration = merge_max_duration
+        self.merge_max_gap = merge_max_gap
+        self.max_run = max_run
+        self.min_duration = min_duration
+        self.max_cps = max_cps
+        self.close_gap = close_gap
+        self.min_gap = min_gap
+        self.fix_overlaps = fix_overlaps
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"TimingRules({fields})"
+
+
+# 기본: 1글자 자막을 이어지는 만큼 병합 + 겹침 수정
+DEFAULT_RULES = TimingRules()
+
+# merge_single_char_cues 와 같은 결과 (1글자 자막을 두 개씩만 병합, 정렬/겹침 수정 없음)
+LEGACY_RULES = TimingRules(merge_max_chars=1, max_run=2, fix_overlaps=False)
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("cue_timing 에는 numpy 가 필요합니다 (pip install numpy)")
+
+
+# ────────────────────────────────────────────────────────────────
+# 2. 짧은 자막 병합
+# ────────────────────────────────────────────────────────────────
+
+def text_lengths(cues: list[Cue]):
+    """
+    자막별 공백 제외 글자 수 (int64 배열)
+    str.split() 의 공백 기준(str.isspace)은 WHITESPACE_RE 의 \\s 와 같고 정규식 치환보다 빠름
+    """
+    return np.fromiter((len("".join("".join(cue.lines).split())) for cue in cues), np.int64, len(cues))
+
+
+def group_heads(starts, ends, chars, rules: TimingRules = DEFAULT_RULES):
+    """
+    병합 묶음마다 첫 자막 번호 (오름차순 배열)
+
+    병합 대상(짧은) 자막은 다음 자막과 같은 묶음 → 짧은 자막이 이어지는 구간과
+    그 뒤 첫 번째 자막까지가 한 구간이고, max_run 이 있으면 구간을 앞에서부터 max_run 개씩 끊음
+    (max_run=2 이면 merge_single_char_cues 처럼 '짧은 자막 + 다음 자막' 두 개씩)
+    """
+    n = len(starts)
+    joinable = np.zeros(n, dtype=bool)
+    if rules.merge_max_chars is not None:
+        joinable |= chars <= rules.merge_max_chars
+    if rules.merge_max_duration:
+        joinable |= (ends - starts) < rules.merge_max_duration
+    if n:
+        joinable[-1] = False
+    if rules.merge_max_gap is not None and n > 1:
+        joinable[:-1] &= (starts[1:] - ends[:-1]) <= rules.merge_max_gap
+
+    # 앞 자막이 병합 대상이 아니면 새 구간 시작
+    head = np.ones(n, dtype=bool)
+    head[1:] = ~joinable[:-1]
+    if rules.max_run:
+        index = np.arange(n)
+        run_start = np.maximum.accumulate(np.where(head, index, 0))
+        head |= (index - run_start) % rules.max_run == 0
+    return np.flatnonzero(head)
+
+
+def _merge_text(group: list[Cue]) -> list[str]:
+    """묶음 텍스트: 자막마다 줄을 공백으로 이어 띄어쓰기 없이 연결 (한 줄, merge_single_char_cues 와 같음)"""
+    return ["".join(" ".join(cue.lines).strip() for cue in group)]
+
+
+# ────────────────────────────────────────────────────────────────
+# 3. 시간 보정
+# ────────────────────────────────────────────────────────────────
+
+def fix_timing(starts, ends, chars, rules: TimingRules = DEFAULT_RULES):
+    """
+    최소 표시 시간 / 읽기 속도 / 간격 닫기 / 겹침 수정을 적용한 종료 시간 배열
+    (starts 는 fix_overlaps 면 정렬되어 있어야 함)
+    """
+    n = len(starts)
+    if not n:
+        return ends.copy()
+
+    # 늘릴 수 있는 한계: 다음 자막 시작 - min_gap (마지막 자막은 제한 없음)
+    limit = np.empty(n, dtype=np.int64)
+    limit[:-1] = starts[1:] - rules.min_gap
+    limit[-1] = np.iinfo(np.int64).max
+
+    want = ends.copy()
+    if rules.min_duration:
+        np.maximum(want, starts + rules.min_duration, out=want)
+    if rules.max_cps:
+        reading = np.ceil(chars * (1000.0 / rules.max_cps)).astype(np.int64)
+        np.maximum(want, starts + reading, out=want)
+    if rules.close_gap and n > 1:
+        close = np.zeros(n, dtype=bool)
+        close[:-1] = starts[1:] - want[:-1] <= rules.close_gap
+        want = np.where(close, np.maximum(want, limit), want)
+
+    # 늘리기는 한계까지만, 원래부터 한계를 넘던(겹치던) 종료 시간은 fix_overlaps 일 때만 줄임
+    # (fix_overlaps 를 끄면 입력의 겹침/종료 < 시작 도 그대로 둠)
+    if not rules.fix_overlaps:
+        return np.minimum(want, np.maximum(limit, ends))
+    return np.maximum(np.minimum(want, limit), starts)
+
+
+# ────────────────────────────────────────────────────────────────
+# 4. 타이밍 엔진
+# ────────────────────────────────────────────────────────────────
+
+def retime_cues(cues: Iterable[Cue], rules: TimingRules = DEFAULT_RULES) -> list[Cue]:
+    """
+    자막 목록에 타이밍 규칙을 한 번에 적용합니다. (병합 → 시간 보정)
+
+    병합되지 않은 자막은 같은 Cue 객체의 시간만 바꾸고,
+    병합된 묶음은 첫 자막 번호로 새 Cue (시간: 첫 시작 ~ 마지막 종료) 를 만듭니다.
+    """
+    _require_numpy()
+    cues = list(cues)
+    n = len(cues)
+    if not n:
+        return []
+
+    starts = np.fromiter((cue.start for cue in cues), np.int64, n)
+    ends = np.fromiter((cue.end for cue in cues), np.int64, n)
+    chars = text_lengths(cues)
+
+    # 시작 시간 순 정렬 (이미 정렬되어 있으면 그대로)
+    if rules.fix_overlaps and n > 1 and (starts[1:] < starts[:-1]).any():
+        order = np.argsort(starts, kind="stable")
+        cues = [cues[i] for i in order.tolist()]
+        starts, ends, chars = starts[order], ends[order], chars[order]
+
+    # 1. 짧은 자막 병합 (묶음: heads[k] ~ tails[k])
+    heads = group_heads(starts, ends, chars, rules)
+    if len(heads) < n:
+        tails = np.empty_like(heads)
+        tails[:-1] = heads[1:] - 1
+        tails[-1] = n - 1
+        merged = []
+        for head, tail in zip(heads.tolist(), tails.tolist()):
+            if head == tail:
+                merged.append(cues[head])
+            else:
+                group = cues[head:tail + 1]
+                merged.append(Cue(group[0].index, group[0].start, group[-1].end, _merge_text(group)))
+        cues = merged
+        starts, ends = starts[heads], ends[tails]
+        chars = np.add.reduceat(chars, heads)
+
+    # 2~5. 시간 보정
+    new_ends = fix_timing(starts, ends, chars, rules)
+    for cue, end in zip(cues, new_ends.tolist()):
+        cue.end = end
+    return cues
+
+
+def timing_stages(cues: Iterable[Cue], rules: TimingRules = DEFAULT_RULES) -> list[Cue]:
+    """
+    srt_stream.merge_stages 의 타이밍 엔진판
+    휴식 표현 제거 → 빈 자막 삭제 → retime_cues
+    """
+    return retime_cues(drop_empty_cues(remove_rest_phrases(cues)), rules)
+
+
+# ────────────────────────────────────────────────────────────────
+# 5. 명령줄 실행
+# ────────────────────────────────────────────────────────────────
+
+def main():
+    """
+    SRT 파일에 타이밍 규칙을 적용합니다.
+
+    사용법: python cue_timing.py 입력.srt [-o 출력.srt] [--max-chars 1] [--min-duration 700] [--max-cps 17] ...
+    """
+    parser = argparse.ArgumentParser(description="자막 병합/타이밍 보정 (NumPy 일괄 처리)")
+    parser.add_argument("input", type=Path, help="입력 .srt 파일")
+    parser.add_argument("-o", "--output", type=Path, help="출력 파일 (생략 시 화면 출력)")
+    parser.add_argument("--max-chars", type=int, default=1,
+                        help="공백 제외 글자 수가 이 값 이하인 자막을 다음 자막과 병합 (기본 1, -1 이면 끔)")
+    parser.add_argument("--max-duration", type=int, default=0,
+                        help="표시 시간이 이 값(ms)보다 짧은 자막도 병합 (기본 0 = 끔)")
+    parser.add_argument("--max-gap", type=int, default=None,
+                        help="다음 자막과의 간격이 이 값(ms)보다 크면 병합하지 않음")
+    parser.add_argument("--max-run", type=int, default=None,
+                        help="한 묶음의 최대 자막 수 (기본: 제한 없음, 2 = 기존처럼 두 개씩)")
+    parser.add_argument("--min-duration", type=int, default=0, help="최소 표시 시간 (ms)")
+    parser.add_argument("--max-cps", type=float, default=None, help="초당 글자 수 상한")
+    parser.add_argument("--close-gap", type=int, default=0, help="이 값(ms) 이하의 간격은 닫음")
+    parser.add_argument("--min-gap", type=int, default=0, help="자막 사이 최소 간격 (ms)")
+    parser.add_argument("--keep-overlaps", action="store_true",
+                        help="정렬/겹침 수정을 하지 않음 (늘리기만 다음 자막 전까지)")
+    args = parser.parse_args()
+
+    rules = TimingRules(
+        merge_max_chars=None if args.max_chars < 0 else args.max_chars,
+        merge_max_duration=args.max_duration,
+        merge_max_gap=args.max_gap,
+        max_run=args.max_run,
+        min_duration=args.min_duration,
+        max_cps=args.max_cps,
+        close_gap=args.close_gap,
+        min_gap=args.min_gap,
+        fix_overlaps=not args.keep_overlaps,
+    )
+    cues = timing_stages(read_srt(args.input), rules)
+
+    if args.output:
+        count = save_srt(cues, args.output)
+        print(f"타이밍 보정 완료: {args.output} ({count}개 자막)")
+    else:
+        sys.stdout.write(srt_to_string(cues))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+로컬 가짜 DeepL API 서버 (테스트/벤치마크용)
+
+deepl.Translator(key, server_url="http://127.0.0.1:포트") 로 연결하면
+실제 DeepL 대신 이 서버가 응답합니다. 요청마다 지연을 넣을 수 있고,
+일정 비율로 429(요청 과다) / 503 오류를 돌려줘 재시도 동작을 확인할 수 있습니다.
+
+사용법:
+    python fake_deepl.py [--port 8000] [--latency 0.3] [--throttle 0.2] [--errors 0.05]
+
+지원 엔드포인트:
+    POST /v2/translate  (form / JSON 본문 모두 지원)
+    GET|POST /v2/usage
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from translation import fake_translate
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FakeDeepLServer"
+
+    def log_message(self, format, *args):
+        pass  # 요청 로그 출력 안 함
+
+    def _read_params(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8") if length else ""
+        if "json" in (self.headers.get("Content-Type") or ""):
+            return json.loads(body or "{}")
+        params = parse_qs(body)
+        return {key: values if key == "text" else values[0] for key, values in params.items()}
+
+    def _send_json(self, status: int, payload: dict):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self):
+        path = self.path.split("?")[0]
+        params = self._read_params() if self.command == "POST" else {}
+
+        if path == "/v2/usage":
+            self._send_json(200, {"character_count": self.server.characters,
+                                  "character_limit": self.server.character_limit})
+            return
+
+        if path == "/v2/translate":
+            texts = params.get("text") or []
+            if isinstance(texts, str):
+                texts = [texts]
+            status = self.server.inject_error()
+            if status == 429:
+                self._send_json(429, {"message": "Too many requests"})
+                return
+            if status:
+                self._send_json(status, {"message": "Service unavailable"})
+                return
+            time.sleep(self.server.latency)
+            with self.server.lock:
+                self.server.requests += 1
+                self.server.characters += sum(len(t) for t in texts)
+            self._send_json(200, {"translations": [
+                {"detected_source_language": "JA", "text": fake_translate(t)} for t in texts
+            ]})
+            return
+
+        self._send_json(404, {"message": f"not found: {path}"})
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+class FakeDeepLServer(ThreadingHTTPServer):
+    """
+    백그라운드 스레드에서 동작하는 가짜 DeepL 서버
+
+    with FakeDeepLServer(latency=0.2) as server:
+        backend = DeepLBackend("fake-key", server_url=server.url)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, character_limit: int = 500000,
+                 throttle_rate: float = 0.0, error_rate: float = 0.0,
+                 seed: int | None = None):
+        super().__init__((host, port), _Handler)
+        self.latency = latency
+        self.character_limit = character_limit
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.requests = 0
+        self.characters = 0
+        self.throttled = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._thread = None
+
+    def inject_error(self) -> int | None:
+        """이번 번역 요청에 돌려줄 오류 상태 코드 (없으면 None)"""
+        with self.lock:
+            roll = self._random.random()
+            if roll < self.throttle_rate:
+                self.throttled += 1
+                return 429
+            if roll < self.throttle_rate + self.error_rate:
+                self.errors += 1
+                return 503
+        return None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeDeepLServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 가짜 DeepL API 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="요청당 지연 (초)")
+    parser.add_argument("--throttle", type=float, default=0.0, help="429 응답 비율 (0~1)")
+    parser.add_argument("--errors", type=float, default=0.0, help="503 응답 비율 (0~1)")
+    args = parser.parse_args()
+
+    server = FakeDeepLServer(args.host, args.port, latency=args.latency,
+                             throttle_rate=args.throttle, error_rate=args.errors)
+    print(f"가짜 DeepL 서버 실행 중: {server.url} (지연 {args.latency}초, "
+          f"429 {args.throttle:.0%}, 503 {args.errors:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("종료")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
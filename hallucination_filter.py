@@ -0,0 +1,364 @@
+"""
+번역 전 일본어 환각/반복 자막 필터
+
+Whisper 같은 음성 인식 자막에는 무음 구간을 채우는 환각 문장
+("そして戻ってきます", "少し休憩してください", "ご視聴ありがとうございました" ...)과
+같은 문장이 계속 되풀이되는 반복이 섞입니다. 지금까지는 이것도 DeepL 로 번역한 뒤
+다중 바꾸기 규칙(1-1.환각 제거)으로 지웠으므로, 번역 전에 일본어 쪽에서 걸러 청구 문자를 줄입니다.
+
+    1. 일본어 환각 규칙 : 템플릿의 '0.일본어환각제거' 그룹 (템플릿에서 꺼져 있어도 여기서는 사용)
+                          → 텍스트가 남지 않은 자막은 버림
+    2. 자막 안 반복     : 2~10글자 구간이 4번 이상 이어지면 2번으로 줄임
+                          ("気持ちいい気持ちいい気持ちいい気持ちいい" → "気持ちいい気持ちいい")
+    3. 자막 사이 반복   : 정규화한 텍스트(NFKC, 공백/구두점/기호 제외)의 문자 n-gram 해시 집합으로
+                          비슷한 자막(Jaccard 유사도)을 찾아 같은 문장의 반복으로 셈
+                          - 연속 반복이 min_run 개 이상 : 첫 자막 하나로 합침 (종료 시간은 마지막 자막까지)
+                          - 최근 window 개 자막 안에서 max_repeats 번을 넘게 다시 나온 문장 : 버림
+                          ("A B A B A B ..." 처럼 번갈아 도는 반복, 띄엄띄엄 되풀이되는 대사는 남김)
+
+- 자막마다 최근 window 개 문장과만 비교하므로 파일 길이에 대해 선형 시간
+- 짧은 자막(정규화 후 min_chars 글자 미만, "あっ" "うん" 등)은 실제로 되풀이되는 대사라 반복 판정에서 제외
+- 1글자 병합 뒤의 자막에 적용하며 원본 파일은 바꾸지 않음 (번역할 자막과 .ko.srt 에만 반영)
+
+사용법 (결과 미리보기, -o 를 주면 걸러낸 자막을 저장):
+    python hallucination_filter.py 입력.srt [-o 출력.srt] [--show 20]
+"""
+
+import argparse
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import deque
+from pathlib import Path
+
+from rule_engine import DEFAULT_TEMPLATE, RuleChain, RuleGroup, load_groups
+from srt_stream import Cue, drop_empty_cues, merge_stages, read_srt, save_srt
+
+
+# 번역 전에 적용할 템플릿 그룹 (일본어 원문용, 나머지 그룹은 번역 결과용)
+JA_RULE_GROUPS = ("0.일본어환각제거",)
+
+# 반복 판정용 정규화: 공백/구두점/기호(♡ 등) 제거 (가나/한자/장음 기호 ー 는 남음)
+NORMALIZE_RE = re.compile(r"[\W_]+")
+
+# 반복 판정 방식이 바뀌면 올림 (필터 지문에 포함 → 이미 처리한 파일도 규칙 변경으로 다시 처리)
+#   2: 반복 횟수를 최근 window 개 자막 안에서만 셈 (띄엄띄엄 되풀이되는 대사를 버리던 문제)
+FILTER_VERSION = 2
+
+# 자막 안 반복: 첫 두 글자가 다른 2~10글자 구간이 4번 이상 (ああああ 같은 1글자 반복은 제외)
+INLINE_REPEAT_RE = re.compile(r"((.)(?!\2).{1,9}?)\1{3,}")
+
+
+def normalize_text(text: str) -> str:
+    """반복 판정용 텍스트 (NFKC → 공백/구두점/기호 제거)"""
+    return NORMALIZE_RE.sub("", unicodedata.normalize("NFKC", text))
+
+
+def ngram_hashes(text: str, n: int) -> frozenset:
+    """문자 n-gram 해시 집합 (n 글자보다 짧으면 텍스트 전체 하나)"""
+    if len(text) <= n:
+        return frozenset((hash(text),))
+    return frozenset(hash(text[i:i + n]) for i in range(len(text) - n + 1))
+
+
+def similarity(a: frozenset, b: frozenset) -> float:
+    """두 n-gram 해시 집합의 Jaccard 유사도"""
+    if a is b:
+        return 1.0
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+# ────────────────────────────────────────────────────────────────
+# 1. 필터 설정 / 통계
+# ────────────────────────────────────────────────────────────────
+
+class FilterRules:
+    """
+    반복 판정 규칙
+
+    ngram        : 유사도 계산에 쓰는 문자 n-gram 길이 (일본어는 2글자가 적당)
+    similarity   : 이 값 이상이면 같은 문장으로 봄 (1.0 이면 정규화한 텍스트가 같을 때만)
+    min_chars    : 정규화 후 이 글자 수 미만인 자막은 반복 판정에서 제외
+    min_run      : 연속 반복이 이 개수 이상이면 하나로 합침
+    window       : 반복을 찾을 최근 문장 수 (서로 다른 문장 기준), 반복 횟수를 셀 최근 자막 수
+    max_repeats  : 최근 window 개 자막 안에서 한 문장이 (연속 반복 묶음 단위로) 이 횟수를 넘게 나오면 버림
+    inline       : 자막 안 반복 줄이기 사용 여부
+    """
+
+    __slots__ = ("ngram", "similarity", "min_chars", "min_run", "window", "max_repeats", "inline")
+
+    def __init__(self, ngram: int = 2, similarity: float = 0.7, min_chars: int = 6,
+                 min_run: int = 3, window: int = 8, max_repeats: int = 2, inline: bool = True):
+        self.ngram = ngram
+        self.similarity = similarity
+        self.min_chars = min_chars
+        self.min_run = min_run
+        self.window = window
+        self.max_repeats = max_repeats
+        self.inline = inline
+
+    def key(self) -> str:
+        return ",".join(f"{name}={getattr(self, name)}" for name in self.__slots__)
+
+
+class FilterStats:
+    """필터 결과 통계 (파일 여러 개를 한 객체에 누적 가능)"""
+
+    __slots__ = ("cues", "rule_cues", "trimmed", "collapsed", "dropped",
+                 "characters", "saved_characters")
+
+    def __init__(self):
+        self.cues = 0                 # 입력 자막 수
+        self.rule_cues = 0            # 환각 규칙으로 텍스트가 모두 지워진 자막
+        self.trimmed = 0              # 자막 안 반복을 줄인 자막
+        self.collapsed = 0            # 연속 반복이라 앞 자막에 합친 자막
+        self.dropped = 0              # 번갈아 도는 반복이라 버린 자막
+        self.characters = 0           # 입력 문자 수
+        self.saved_characters = 0     # 줄어든 문자 수 (번역하지 않아도 되는 문자)
+
+    @property
+    def removed(self) -> int:
+        """빠진 자막 수"""
+        return self.rule_cues + self.collapsed + self.dropped
+
+    def add(self, other: "FilterStats"):
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def format(self) -> str:
+        return (f"자막 {self.removed:,}개 제외 (환각 규칙 {self.rule_cues:,}, "
+                f"연속 반복 {self.collapsed:,}, 번갈아 반복 {self.dropped:,}), "
+                f"자막 안 반복 {self.trimmed:,}개 줄임, 절약 {self.saved_characters:,}자")
+
+
+class _Sentence:
+    """최근 문장 하나 (반복 판정용)"""
+
+    __slots__ = ("text", "grams", "starts")
+
+    def __init__(self, text: str, grams: frozenset):
+        self.text = text        # 정규화한 텍스트
+        self.grams = grams      # n-gram 해시 집합
+        self.starts = deque()   # 최근 window 개 자막 안에서 나온 위치 (연속 반복 묶음의 첫 자막)
+
+    def occur(self, position: int, window: int) -> int:
+        """position 에서 다시 나옴 → 최근 window 개 자막 안에서 나온 횟수 (오래된 위치는 잊음)"""
+        starts = self.starts
+        while starts and starts[0] <= position - window:
+            starts.popleft()
+        starts.append(position)
+        return len(starts)
+
+
+# ────────────────────────────────────────────────────────────────
+# 2. 필터
+# ────────────────────────────────────────────────────────────────
+
+class HallucinationFilter:
+    """
+    번역 전 일본어 환각/반복 필터
+
+    rule_chain: 일본어 환각 규칙 (None 이면 반복 판정만)
+    """
+
+    def __init__(self, rule_chain: RuleChain | None = None, rules: FilterRules | None = None):
+        self.rule_chain = rule_chain
+        self.rules = rules or FilterRules()
+        self._fingerprint = None
+
+    @classmethod
+    def from_template(cls, template: Path = DEFAULT_TEMPLATE, rules: FilterRules | None = None,
+                      groups=JA_RULE_GROUPS) -> "HallucinationFilter":
+        """템플릿의 일본어 그룹으로 필터 생성 (템플릿이 없으면 반복 판정만)"""
+        rule_chain = None
+        if Path(template).exists():
+            selected = [RuleGroup(group.name, True, group.rules)
+                        for group in load_groups(template) if group.name in groups]
+            if selected:
+                rule_chain = RuleChain(selected)
+        return cls(rule_chain, rules)
+
+    @property
+    def fingerprint(self) -> str:
+        """필터 설정 + 일본어 규칙 해시 (매니페스트 비교용, 바뀌면 규칙 변경으로 다시 처리)"""
+        if self._fingerprint is None:
+            chain = self.rule_chain.fingerprint if self.rule_chain is not None else ""
+            digest = hashlib.sha256(f"{FILTER_VERSION}\0{self.rules.key()}\0{chain}".encode("utf-8"))
+            self._fingerprint = digest.hexdigest()[:16]
+        return self._fingerprint
+
+    def apply(self, cues, stats: FilterStats | None = None) -> list[Cue]:
+        """
+        자막 목록을 걸러 새 목록으로 반환합니다. (Cue 는 그 자리에서 수정)
+        stats 가 주어지면 결과 통계를 더함
+        """
+        cues = list(cues)
+        result = FilterStats()
+        result.cues = len(cues)
+        result.characters = sum(len(cue.text) for cue in cues)
+
+        if self.rule_chain is not None:
+            cues = list(drop_empty_cues(self.rule_chain.apply_cues(cues)))
+            result.rule_cues = result.cues - len(cues)
+        if self.rules.inline:
+            cues = self._trim_inline(cues, result)
+        cues = self._collapse_repeats(cues, result)
+
+        result.saved_characters = result.characters - sum(len(cue.text) for cue in cues)
+        if stats is not None:
+            stats.add(result)
+        return cues
+
+    def _trim_inline(self, cues: list[Cue], stats: FilterStats) -> list[Cue]:
+        """자막 안에서 4번 이상 이어지는 구간을 2번으로"""
+        sub = INLINE_REPEAT_RE.sub
+        for cue in cues:
+            lines = [sub(r"\1\1", line) for line in cue.lines]
+            if lines != cue.lines:
+                cue.lines = lines
+                stats.trimmed += 1
+        return cues
+
+    def _match(self, recent: deque, text: str) -> _Sentence:
+        """최근 문장 중 비슷한 것 (없으면 새로 추가), 찾은 문장은 가장 최근으로 옮김"""
+        rules = self.rules
+        for sentence in reversed(recent):
+            if sentence.text == text:
+                break
+        else:
+            grams = ngram_hashes(text, rules.ngram)
+            threshold = rules.similarity
+            size = len(text)
+            for sentence in reversed(recent):
+                # 길이 차이만으로도 유사도 기준을 넘을 수 없으면 비교하지 않음
+                other = len(sentence.text)
+                if min(size, other) < max(size, other) * threshold:
+                    continue
+                if similarity(sentence.grams, grams) >= threshold:
+                    break
+            else:
+                sentence = _Sentence(text, grams)
+                recent.append(sentence)     # 가장 오래된 문장은 밀려남
+                return sentence
+        if recent[-1] is not sentence:
+            recent.remove(sentence)
+            recent.append(sentence)
+        return sentence
+
+    def _collapse_repeats(self, cues: list[Cue], stats: FilterStats) -> list[Cue]:
+        """연속 반복은 하나로 합치고, 번갈아 도는 반복은 버림"""
+        rules = self.rules
+        recent = deque(maxlen=rules.window)
+        kept = []
+        run = []                # 같은 문장이 이어지는 자막들
+        run_sentence = None
+        run_count = 0           # 이 묶음의 문장이 최근 window 개 자막 안에서 나온 횟수
+
+        def flush():
+            if not run:
+                return
+            if run_count > rules.max_repeats:
+                stats.dropped += len(run)
+            elif len(run) >= rules.min_run:
+                first = run[0]
+                first.end = max(first.end, run[-1].end)
+                kept.append(first)
+                stats.collapsed += len(run) - 1
+            else:
+                kept.extend(run)
+            run.clear()
+
+        for position, cue in enumerate(cues):
+            text = normalize_text(cue.text)
+            if len(text) < rules.min_chars:
+                flush()
+                run_sentence = None
+                kept.append(cue)
+                continue
+
+            sentence = self._match(recent, text)
+            if sentence is not run_sentence:
+                flush()
+                run_sentence = sentence
+                run_count = sentence.occur(position, rules.window)
+            run.append(cue)
+        flush()
+        return kept
+
+
+_filter = None
+_filter_lock = threading.Lock()
+
+
+def process_filter(template: Path = DEFAULT_TEMPLATE) -> HallucinationFilter:
+    """프로세스별 필터 (최초 1회만 템플릿의 일본어 그룹을 로드/컴파일)"""
+    global _filter
+    with _filter_lock:
+        if _filter is None:
+            _filter = HallucinationFilter.from_template(template)
+    return _filter
+
+
+# ────────────────────────────────────────────────────────────────
+# 3. 명령줄
+# ────────────────────────────────────────────────────────────────
+
+def main():
+    """
+    SRT 파일 하나를 병합/정리한 뒤 필터를 적용해 결과를 보여 줍니다. (원본은 그대로)
+
+    사용법: python hallucination_filter.py 입력.srt [-o 출력.srt] [--show 20] [--similarity 0.8] ...
+    """
+    parser = argparse.ArgumentParser(description="번역 전 일본어 환각/반복 자막 필터 (미리보기)")
+    parser.add_argument("input", type=Path, help="입력 .srt 파일")
+    parser.add_argument("-o", "--output", type=Path, help="걸러낸 자막을 저장할 파일")
+    parser.add_argument("--show", type=int, default=20, help="빠지거나 바뀐 자막을 이 개수까지 출력 (기본 20)")
+    parser.add_argument("--template", type=Path, default=DEFAULT_TEMPLATE,
+                        help="일본어 환각 규칙을 읽을 템플릿 (기본: multiple_replace_groups.template)")
+    defaults = FilterRules()
+    parser.add_argument("--similarity", type=float, default=defaults.similarity,
+                        help=f"같은 문장으로 볼 n-gram 유사도 (기본 {defaults.similarity})")
+    parser.add_argument("--min-chars", type=int, default=defaults.min_chars,
+                        help=f"반복 판정에 포함할 최소 글자 수 (기본 {defaults.min_chars})")
+    parser.add_argument("--min-run", type=int, default=defaults.min_run,
+                        help=f"하나로 합칠 연속 반복 수 (기본 {defaults.min_run})")
+    parser.add_argument("--window", type=int, default=defaults.window,
+                        help=f"반복을 찾을 최근 문장 수 (기본 {defaults.window})")
+    parser.add_argument("--max-repeats", type=int, default=defaults.max_repeats,
+                        help=f"최근 문장 안에서 허용할 반복 횟수 (기본 {defaults.max_repeats})")
+    parser.add_argument("--no-inline", action="store_true", help="자막 안 반복은 줄이지 않음")
+    args = parser.parse_args()
+
+    rules = FilterRules(similarity=args.similarity, min_chars=args.min_chars, min_run=args.min_run,
+                        window=args.window, max_repeats=args.max_repeats, inline=not args.no_inline)
+    cue_filter = HallucinationFilter.from_template(args.template, rules)
+    before = list(merge_stages(read_srt(args.input)))
+    texts = {id(cue): cue.text for cue in before}
+    stats = FilterStats()
+    after = cue_filter.apply(before, stats)
+
+    kept = {id(cue) for cue in after}
+    shown = 0
+    for cue in before:
+        if shown >= args.show:
+            break
+        original = texts[id(cue)]
+        if id(cue) not in kept:
+            print(f"  - {original!r}")
+        elif cue.text != original:
+            print(f"  ~ {original!r} → {cue.text!r}")
+        else:
+            continue
+        shown += 1
+
+    print(f"{args.input.name}: 자막 {stats.cues:,}개 → {len(after):,}개, {stats.format()} "
+          f"(전체 {stats.characters:,}자)")
+    if args.output:
+        count = save_srt(after, args.output)
+        print(f"저장: {args.output} ({count}개 자막)")
+
+
+if __name__ == "__main__":
+    main()
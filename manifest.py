@@ -0,0 +1,268 @@
+"""
+증분 처리용 매니페스트
+
+폴더(처리 루트)마다 .srt_manifest.db (SQLite) 하나에 다음을 기록합니다.
+
+- 파일: 원본 크기/수정 시각/해시, 출력(.ko.srt) 크기/수정 시각,
+        처리 당시의 규칙 체인 지문과 번역 설정 해시
+- 자막: 병합 후 자막 텍스트 해시 → 규칙 적용 전 번역 결과
+
+다시 실행하면
+- 원본/출력/규칙/설정이 모두 그대로인 파일은 stat 비교만으로 건너뜀 (해시 계산도 안 함)
+- 규칙만 바뀐 파일은 저장된 번역에 규칙만 다시 적용 (번역 요청 없음)
+- 일부 자막만 바뀐 파일은 바뀐 자막만 번역
+- 지난번 번역 실패 표시가 남은 파일은 실패한 자막만 다시 번역
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from translation import FAILURE_MARKER
+
+
+MANIFEST_NAME = ".srt_manifest.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path            TEXT PRIMARY KEY,
+    size            INTEGER NOT NULL,
+    mtime_ns        INTEGER NOT NULL,
+    source_hash     TEXT NOT NULL,
+    rules_hash      TEXT NOT NULL,
+    settings_hash   TEXT NOT NULL,
+    output_size     INTEGER NOT NULL,
+    output_mtime_ns INTEGER NOT NULL,
+    failures        INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS cues (
+    path        TEXT NOT NULL,
+    position    INTEGER NOT NULL,
+    cue_hash    TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    PRIMARY KEY (path, position)
+) WITHOUT ROWID;
+"""
+
+# 파일 상태 (plan 결과)
+UNCHANGED = "unchanged"        # 변경 없음 → 건너뜀
+NEW = "new"                    # 처음 처리
+SOURCE_CHANGED = "source"      # 원본 변경 → 바뀐 자막만 번역
+RULES_CHANGED = "rules"        # 규칙 변경 → 규칙만 재적용
+SETTINGS_CHANGED = "settings"  # 번역 설정 변경 → 전체 재번역
+OUTPUT_CHANGED = "output"      # 출력 파일 없음/수정됨 → 저장된 번역으로 다시 생성
+FAILED_CUES = "failed"         # 지난번 번역 실패 자막 있음 → 그 자막만 다시 번역
+LEGACY_OUTPUT = "legacy"       # 매니페스트 없이 .ko.srt 만 있음 → 기존처럼 건너뜀
+
+STATUS_LABELS = {
+    UNCHANGED: "변경 없음",
+    NEW: "새 파일",
+    SOURCE_CHANGED: "원본 변경",
+    RULES_CHANGED: "규칙 변경",
+    SETTINGS_CHANGED: "번역 설정 변경",
+    OUTPUT_CHANGED: "출력 파일 변경/없음",
+    FAILED_CUES: "번역 실패 자막 재시도",
+    LEGACY_OUTPUT: "기존 번역본 있음 (매니페스트 없음)",
+}
+
+
+def text_hash(text: str) -> str:
+    """자막 텍스트 해시 (짧은 16진 문자열)"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def file_hash(path: Path) -> str:
+    """파일 내용 해시"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileRecord:
+    """매니페스트에 기록된 파일 하나"""
+
+    __slots__ = ("path", "size", "mtime_ns", "source_hash", "rules_hash",
+                 "settings_hash", "output_size", "output_mtime_ns", "failures")
+
+    def __init__(self, path, size, mtime_ns, source_hash, rules_hash,
+                 settings_hash, output_size, output_mtime_ns, failures=0):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.source_hash = source_hash
+        self.rules_hash = rules_hash
+        self.settings_hash = settings_hash
+        self.output_size = output_size
+        self.output_mtime_ns = output_mtime_ns
+        self.failures = failures            # 번역 실패 표시가 남은 자막 수
+
+
+class FilePlan:
+    """파일 하나에 대해 무엇을 다시 계산해야 하는지 (+ 예상/실제 청구량)"""
+
+    __slots__ = ("path", "status", "cues", "reused", "translate", "characters",
+                 "billable", "requests", "sent_characters", "sent_requests")
+
+    def __init__(self, status: str, path: Path | None = None, cues: int = 0,
+                 reused: int = 0, translate: int = 0, characters: int = 0):
+        self.path = path
+        self.status = status
+        self.cues = cues              # 병합 후 자막 수
+        self.reused = reused          # 저장된 번역을 재사용하는 자막 수
+        self.translate = translate    # 새로 번역해야 하는 자막 수
+        self.characters = characters  # 새로 번역할 문자 수 (번역 메모리 적용 전)
+        self.billable = 0             # 예상 청구 문자 수 (번역 메모리/중복 제거 후)
+        self.requests = 0             # 예상 요청 수
+        self.sent_characters = 0      # 실제 청구 문자 수
+        self.sent_requests = 0        # 실제 요청 수
+
+    @property
+    def needs_work(self) -> bool:
+        return self.status not in (UNCHANGED, LEGACY_OUTPUT)
+
+    @property
+    def label(self) -> str:
+        return STATUS_LABELS[self.status]
+
+
+class Manifest:
+    """처리 루트 폴더 하나의 매니페스트 (여러 스레드에서 안전하게 사용)"""
+
+    def __init__(self, root: Path, path: Path | None = None):
+        self.root = Path(root).resolve()
+        self.path = Path(path) if path else self.root / MANIFEST_NAME
+        self._prefix = str(self.root) + os.sep
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(files)")}
+        if "failures" not in columns:
+            self._conn.execute("ALTER TABLE files ADD COLUMN failures INTEGER NOT NULL DEFAULT 0")
+
+        # 재검사를 빠르게: 파일 기록 전체를 한 번에 메모리로
+        self._files = {
+            row[0]: FileRecord(*row)
+            for row in self._conn.execute("SELECT * FROM files")
+        }
+
+    def key(self, path: Path) -> str:
+        """매니페스트 키 (루트 기준 상대 경로, / 구분)"""
+        path = os.path.abspath(path)
+        if path.startswith(self._prefix):
+            path = path[len(self._prefix):]
+        return path.replace(os.sep, "/")
+
+    def get(self, path: Path) -> FileRecord | None:
+        return self._files.get(self.key(path))
+
+    # ── 상태 판정 ───────────────────────────────────────────────
+
+    def quick_status(self, path: Path, output_path: Path,
+                     rules_hash: str, settings_hash: str) -> str | None:
+        """
+        stat 비교만으로 판정할 수 있는 상태를 반환합니다.
+        원본 내용을 읽어 봐야 알 수 있으면 None.
+        """
+        record = self.get(path)
+        if record is None:
+            return LEGACY_OUTPUT if output_path.exists() else NEW
+        if record.settings_hash != settings_hash:
+            return SETTINGS_CHANGED
+
+        st = os.stat(path)
+        source_same = (st.st_size, st.st_mtime_ns) == (record.size, record.mtime_ns)
+        if not source_same:
+            return None     # 수정 시각만 바뀌었을 수도 있으니 내용 해시로 확인
+        if record.failures:
+            return FAILED_CUES
+
+        try:
+            out = os.stat(output_path)
+            output_same = (out.st_size, out.st_mtime_ns) == (record.output_size, record.output_mtime_ns)
+        except FileNotFoundError:
+            output_same = False
+
+        if record.rules_hash != rules_hash:
+            return RULES_CHANGED
+        if not output_same:
+            return OUTPUT_CHANGED
+        return UNCHANGED
+
+    def content_status(self, path: Path, output_path: Path, rules_hash: str) -> str:
+        """원본 stat 이 달라졌을 때 내용 해시로 판정"""
+        record = self.get(path)
+        if file_hash(path) != record.source_hash:
+            return SOURCE_CHANGED
+        if record.failures:
+            return FAILED_CUES
+        if record.rules_hash != rules_hash:
+            return RULES_CHANGED
+        try:
+            out = os.stat(output_path)
+            if (out.st_size, out.st_mtime_ns) == (record.output_size, record.output_mtime_ns):
+                return UNCHANGED
+        except FileNotFoundError:
+            pass
+        return OUTPUT_CHANGED
+
+    def touch(self, path: Path):
+        """내용은 같고 수정 시각만 바뀐 원본의 stat 갱신"""
+        key = self.key(path)
+        st = os.stat(path)
+        with self._lock:
+            record = self._files[key]
+            record.size, record.mtime_ns = st.st_size, st.st_mtime_ns
+            self._conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+                               (st.st_size, st.st_mtime_ns, key))
+            self._conn.commit()
+
+    # ── 자막 번역 기록 ──────────────────────────────────────────
+
+    def cue_translations(self, path: Path) -> dict:
+        """
+        저장된 {자막 해시: 규칙 적용 전 번역} (번역 실패 표시가 붙은 것은 제외 → 다시 번역)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT cue_hash, translation FROM cues WHERE path = ?", (self.key(path),)
+            ).fetchall()
+        return {h: t for h, t in rows if not t.startswith(FAILURE_MARKER)}
+
+    def update(self, path: Path, output_path: Path, rules_hash: str,
+               settings_hash: str, cues: list[tuple[str, str]]):
+        """
+        처리 완료된 파일 기록
+
+        Args:
+            cues: [(자막 해시, 규칙 적용 전 번역)] 자막 순서대로
+        """
+        key = self.key(path)
+        st = os.stat(path)
+        out = os.stat(output_path)
+        failures = sum(t.startswith(FAILURE_MARKER) for _, t in cues)
+        record = FileRecord(key, st.st_size, st.st_mtime_ns, file_hash(path), rules_hash,
+                            settings_hash, out.st_size, out.st_mtime_ns, failures)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (record.path, record.size, record.mtime_ns, record.source_hash,
+                 record.rules_hash, record.settings_hash, record.output_size,
+                 record.output_mtime_ns, record.failures),
+            )
+            self._conn.execute("DELETE FROM cues WHERE path = ?", (key,))
+            self._conn.executemany(
+                "INSERT INTO cues VALUES (?, ?, ?, ?)",
+                [(key, i, h, t) for i, (h, t) in enumerate(cues)],
+            )
+            self._conn.commit()
+            self._files[key] = record
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
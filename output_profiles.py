@@ -0,0 +1,173 @@
+"""
+출력 프로파일 (존댓말/반말 등 여러 번역본을 한 번에)
+
+프로파일은 템플릿 그룹의 사용 여부만 바꾼 규칙 체인입니다. 병합/번역은 파일마다 한 번만 하고
+다중 바꾸기 규칙 단계에서만 갈라져 프로파일마다 다른 파일로 저장합니다.
+
+    default : .ko.srt         템플릿 그대로
+    polite  : .ko.polite.srt  2-4-1.존댓말 사용, 2-4-2.반말 끔
+    casual  : .ko.casual.srt  2-4-1.존댓말 끔, 2-4-2.반말 사용
+
+ProfileChain 은 프로파일들의 그룹 사용 여부를 앞에서부터 비교해 갈래(트리)로 묶습니다.
+- 모든 프로파일이 같은 앞부분(1.x ~ 2-3)은 한 번만 적용
+- 사용 여부가 갈리는 그룹에서 그때까지의 자막 상태를 복사해 두고 갈래마다 나머지 그룹만 적용
+- 규칙이 모두 같은 프로파일은 같은 결과를 함께 씀
+- 결과는 프로파일마다 전체 체인을 따로 적용한 것과 같음 (python benchmark.py profiles 로 확인)
+"""
+
+import hashlib
+from pathlib import Path
+
+from rule_engine import RuleChain, RuleGroup
+from srt_stream import Cue
+
+
+class OutputProfile:
+    """출력 프로파일 하나 (이름, 출력 파일 이름 접미사, 그룹 사용 여부 덮어쓰기)"""
+
+    __slots__ = ("name", "suffix", "overrides", "description")
+
+    def __init__(self, name: str, suffix: str, overrides: dict, description: str = ""):
+        self.name = name
+        self.suffix = suffix            # 원본 이름 뒤에 붙일 접미사 (a.srt → a.ko.polite.srt)
+        self.overrides = overrides      # {그룹 이름: 사용 여부} (없는 그룹은 템플릿 값)
+        self.description = description
+
+    def output_path(self, source: Path) -> Path:
+        return source.with_stem(source.stem + self.suffix).with_suffix(".srt")
+
+    def groups(self, groups: list[RuleGroup]) -> list[RuleGroup]:
+        """템플릿 그룹에 사용 여부 덮어쓰기를 적용한 그룹 목록 (규칙은 공유)"""
+        missing = set(self.overrides) - {group.name for group in groups}
+        if missing:
+            raise ValueError(f"출력 프로파일 {self.name}: 템플릿에 없는 그룹 {', '.join(sorted(missing))}")
+        return [RuleGroup(group.name, self.overrides.get(group.name, group.enabled), group.rules)
+                for group in groups]
+
+    def __repr__(self):
+        return f"OutputProfile({self.name!r}, {self.suffix!r})"
+
+
+POLITE_GROUP = "2-4-1.존댓말"
+CASUAL_GROUP = "2-4-2.반말"
+
+PROFILES = {
+    "default": OutputProfile("default", ".ko", {}, "템플릿 그대로"),
+    "polite": OutputProfile("polite", ".ko.polite", {POLITE_GROUP: True, CASUAL_GROUP: False}, "존댓말"),
+    "casual": OutputProfile("casual", ".ko.casual", {POLITE_GROUP: False, CASUAL_GROUP: True}, "반말"),
+}
+
+
+def parse_profiles(text: str) -> tuple[str, ...]:
+    """명령줄 값 "polite,casual" → ("polite", "casual") (모르는 이름은 ValueError)"""
+    names = tuple(dict.fromkeys(name.strip() for name in text.split(",") if name.strip()))
+    unknown = [name for name in names if name not in PROFILES]
+    if unknown or not names:
+        raise ValueError(f"알 수 없는 출력 프로파일: {', '.join(unknown) or text!r} "
+                         f"(사용 가능: {', '.join(PROFILES)})")
+    return names
+
+
+def is_output_stem(stem: str) -> bool:
+    """번역 결과 파일 이름인지 (a.ko, a.ko.polite ...)"""
+    return any(stem.endswith(profile.suffix) for profile in PROFILES.values())
+
+
+# ────────────────────────────────────────────────────────────────
+# 1. 갈래 규칙 체인
+# ────────────────────────────────────────────────────────────────
+
+class _Branch:
+    """갈래 하나: 이 구간의 그룹을 적용한 뒤 하위 갈래로 나뉨 (하위 갈래가 없으면 profiles 의 결과)"""
+
+    __slots__ = ("chain", "groups", "profiles", "children")
+
+    def __init__(self, chain: RuleChain | None, groups: list[str], profiles: list[str], children: list):
+        self.chain = chain            # 이 구간의 규칙 체인 (사용 중인 규칙이 없으면 None)
+        self.groups = groups          # 이 구간의 그룹 이름 (표시용)
+        self.profiles = profiles      # 여기서 끝나는 프로파일
+        self.children = children
+
+
+def _copy_cues(cues: list[Cue]) -> list[Cue]:
+    """갈래로 나눌 때 자막 상태 복사 (규칙 적용은 cue.lines 를 새 목록으로 바꾸므로 얕은 복사로 충분)"""
+    return [Cue(cue.index, cue.start, cue.end, cue.lines) for cue in cues]
+
+
+class ProfileChain:
+    """
+    여러 출력 프로파일의 규칙 체인 (공통 앞부분은 한 번만, 갈라지는 그룹부터 갈래마다)
+
+    apply_cues(cues) → {프로파일 이름: 규칙을 적용한 자막 목록}
+    """
+
+    def __init__(self, groups: list[RuleGroup], names: tuple[str, ...]):
+        self.names = tuple(names)
+        self.profiles = [PROFILES[name] for name in self.names]
+        self.group_names = [group.name for group in groups]
+        states = {profile.name: [group.enabled for group in profile.groups(groups)]
+                  for profile in self.profiles}
+        self.root = self._build(groups, states, list(self.names), 0)
+
+        digest = hashlib.sha256()
+        for profile in self.profiles:
+            chain = RuleChain(profile.groups(groups))
+            digest.update(f"{profile.name}\0{profile.suffix}\0{chain.fingerprint}\n".encode("utf-8"))
+        self.fingerprint = digest.hexdigest()[:16]
+
+    def _build(self, groups: list[RuleGroup], states: dict, names: list[str], start: int) -> _Branch:
+        first = states[names[0]]
+        end = start
+        while end < len(groups) and all(states[name][end] == first[end] for name in names):
+            end += 1
+
+        segment = [RuleGroup(group.name, first[i], group.rules)
+                   for i, group in enumerate(groups[start:end], start)]
+        chain = RuleChain(segment)
+        branch = _Branch(chain if len(chain) else None, [group.name for group in segment], [], [])
+        if end == len(groups):
+            branch.profiles = names
+            return branch
+
+        # 사용 여부가 갈리는 그룹: 같은 값끼리 묶어 하위 갈래로
+        parts = {}
+        for name in names:
+            parts.setdefault(states[name][end], []).append(name)
+        branch.children = [self._build(groups, states, part, end) for part in parts.values()]
+        return branch
+
+    def apply_cues(self, cues) -> dict[str, list[Cue]]:
+        results = {}
+        self._apply(self.root, list(cues), results)
+        return {name: results[name] for name in self.names}
+
+    def _apply(self, branch: _Branch, cues: list[Cue], results: dict):
+        if branch.chain is not None:
+            cues = list(branch.chain.apply_cues(cues))
+        for name in branch.profiles:
+            results[name] = cues
+        last = len(branch.children) - 1
+        for i, child in enumerate(branch.children):
+            # 마지막 갈래는 지금 상태를 그대로 넘겨받고, 나머지는 복사본에서 시작
+            self._apply(child, cues if i == last else _copy_cues(cues), results)
+
+    def describe(self) -> str:
+        """갈래 구조 요약 (규칙 수)"""
+        lines = []
+
+        def walk(branch: _Branch, depth: int, label: str):
+            rules = len(branch.chain) if branch.chain is not None else 0
+            span = f"{branch.groups[0]} ~ {branch.groups[-1]}" if branch.groups else "-"
+            lines.append(f"{'  ' * depth}{label}: 규칙 {rules}개 ({span})")
+            for child in branch.children:
+                walk(child, depth + 1, "갈래 " + ", ".join(_leaf_names(child)))
+
+        walk(self.root, 0, "공통")
+        return "\n".join(lines)
+
+
+def _leaf_names(branch: _Branch) -> list[str]:
+    names = list(branch.profiles)
+    for child in branch.children:
+        names.extend(_leaf_names(child))
+    return names
@@ -0,0 +1,302 @@
+"""
+여러 SRT 파일 파이프라인 처리
+
+파일 하나의 처리를 세 단계로 나눠 여러 파일이 서로 다른 단계를 동시에 진행합니다.
+
+    1. prepare_file   (CPU, 프로세스 풀) : 읽기 → 휴식 표현 제거 → 1글자 병합 → 백업 저장소/원본 덮어쓰기
+                                           → 일본어 환각/반복 필터 (번역할 자막만, 원본에는 쓰지 않음)
+                                           (merge_file: 번역 없이 이 단계만)
+    2. translate_file (I/O, 스레드 풀)  : 저장된 번역 재사용 + 바뀐 자막만 배치 번역
+    3. finish_file    (CPU, 프로세스 풀) : 다중 바꾸기 규칙 적용 → .ko.srt 저장
+                                           (출력 프로파일이 여럿이면 공통 규칙은 한 번, 갈라지는 그룹부터 따로
+                                            → .ko.polite.srt / .ko.casual.srt ...)
+
+- run_pipeline(): 단계 사이를 Future 로 이어 붙이고, 동시에 진행 중인 파일 수를
+  window 개로 제한(단계 사이 대기열 크기 제한)하며 결과는 입력 순서대로 돌려줌
+- 각 단계 함수는 순서대로 직접 호출해도 되므로(직렬 모드) 결과 파일은 모드와 관계없이 같음
+- 각 단계는 세부 단계별 시간을 job.timings 에 기록 (run_metrics.STAGES, 작업자 프로세스에서도 함께 돌아옴)
+- 이 모듈은 import 시 부수 효과가 없어서 프로세스 풀 작업자가 안전하게 불러올 수 있음
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+
+from backup_store import BACKUP_DIR_NAME, open_store
+from hallucination_filter import FilterStats, process_filter
+from manifest import text_hash
+from output_profiles import PROFILES, ProfileChain
+from rule_engine import DEFAULT_TEMPLATE, load_rule_chain
+from run_metrics import stage_timer
+from srt_stream import (
+    decode_srt_bytes,
+    drop_empty_cues,
+    merge_single_char_cues,
+    merge_stages,
+    parse_srt_string,
+    remove_rest_phrases,
+    save_srt,
+    save_srt_text,
+    srt_to_string,
+)
+from translation import FAILURE_MARKER, TranslationStats, retry_failures, translate_cues
+
+
+class FileJob:
+    """파이프라인을 따라 이동하는 파일 하나의 작업 상태 (프로세스 간 전달 가능)"""
+
+    __slots__ = ("path", "output_path", "backup_dir", "backup", "status", "new_file",
+                 "cues", "hashes", "merged", "translations", "reused", "translated",
+                 "count", "stats", "messages", "error", "timings", "ja_filter", "filtered",
+                 "profiles", "outputs")
+
+    def __init__(self, path: Path, output_path: Path, status: str, new_file: bool,
+                 backup_dir: Path | None = None, ja_filter: bool = True, profiles: tuple = ()):
+        self.path = path
+        self.output_path = output_path
+        self.backup_dir = backup_dir or path.parent / BACKUP_DIR_NAME   # 백업 저장소 (처리 폴더의 .srt_backups)
+        self.backup = None            # 백업한 원본 내용 해시
+        self.status = status
+        self.new_file = new_file      # 처음 처리하는 파일 (항상 백업)
+        self.cues = []                # 병합된 자막 (번역 후에는 번역문, 저장 후에는 규칙 적용 결과)
+        self.hashes = []              # 병합된 자막 텍스트 해시
+        self.merged = False           # 병합으로 원본이 바뀌었는지
+        self.translations = []        # [(자막 해시, 규칙 적용 전 번역)]
+        self.reused = 0               # 저장된 번역을 재사용한 자막 수
+        self.translated = 0           # 새로 번역한 자막 수
+        self.count = 0                # 저장한 자막 수
+        self.stats = None             # TranslationStats
+        self.messages = []            # 출력할 진행 메시지 (작업자 프로세스에서는 바로 출력하지 않음)
+        self.error = None             # 오류 메시지 (이후 단계는 건너뜀)
+        self.timings = {}             # 세부 단계별 시간 {단계: 초}
+        self.ja_filter = ja_filter    # 번역 전 일본어 환각/반복 필터 사용 여부
+        self.filtered = None          # hallucination_filter.FilterStats
+        self.profiles = profiles      # 출력 프로파일 이름 (비어 있으면 output_path 하나, 템플릿 그대로)
+        self.outputs = []             # 저장한 파일 [(경로, 자막 수)]
+
+
+# ────────────────────────────────────────────────────────────────
+# 1. 단계 함수
+# ────────────────────────────────────────────────────────────────
+
+def load_texts(path: Path, ja_filter: bool = True) -> list[tuple[str, str]]:
+    """[CPU] 실행 계획용: 원본을 읽어 병합(+ 환각/반복 필터)한 자막의 (해시, 텍스트) 목록 (파일은 쓰지 않음)"""
+    cues = merge_stages(parse_srt_string(path.read_text(encoding="utf-8-sig")))
+    if ja_filter:
+        cues = process_filter().apply(cues)
+    return [(text_hash(cue.text), cue.text) for cue in cues]
+
+
+def prepare_file(job: FileJob) -> FileJob:
+    """[CPU] 원본 읽기 → 병합 → (변경 시) 백업 + 원본 덮어쓰기 → 환각/반복 필터 → 자막 해시"""
+    timings = job.timings
+    try:
+        # 원본 내용 읽기 (BOM付き UTF-8도 처리, 백업은 읽은 bytes 그대로)
+        with stage_timer(timings, "read"):
+            raw = job.path.read_bytes()
+            original_content = decode_srt_bytes(raw)
+
+        # 휴식 표현 제거 → 1글자 자막 병합 (merge_stages 와 같은 순서, 단계별 시간을 재려고 나눠 실행)
+        with stage_timer(timings, "parse"):
+            cues = list(parse_srt_string(original_content))
+        with stage_timer(timings, "rest_phrases"):
+            cues = list(drop_empty_cues(remove_rest_phrases(cues)))
+        with stage_timer(timings, "merge"):
+            job.cues = list(merge_single_char_cues(cues))
+            merged_content = srt_to_string(job.cues)
+            job.merged = merged_content.strip() != original_content.strip()
+
+        # 원본 백업 (백업 저장소, 같은 내용은 한 번만 저장)
+        # 처음 처리할 때, 또는 병합으로 원본을 덮어쓸 때만
+        if job.new_file or job.merged:
+            with stage_timer(timings, "backup"):
+                job.backup, written = open_store(job.backup_dir).backup(job.path, raw)
+            note = "" if written else ", 이미 있는 내용"
+            job.messages.append(f"백업 저장: {job.backup[:12]} ({job.backup_dir.name}{note})")
+
+        # 병합으로 변경이 있었다면 원본 파일 덮어쓰기 (임시 파일에 쓴 뒤 교체)
+        if job.merged:
+            with stage_timer(timings, "write_source"):
+                save_srt_text(merged_content, job.path)
+            job.messages.append("1글자 병합 수정 완료 (원본 덮어쓰기)")
+        else:
+            job.messages.append("1글자 병합 변경 사항 없음")
+
+        # 번역 전 일본어 환각/반복 필터 (load_texts 와 같은 결과 → 실행 계획 예상치와 일치)
+        if job.ja_filter:
+            job.filtered = FilterStats()
+            with stage_timer(timings, "ja_filter"):
+                job.cues = process_filter().apply(job.cues, job.filtered)
+            if job.filtered.removed or job.filtered.trimmed:
+                job.messages.append(f"환각/반복 필터: {job.filtered.format()}")
+
+        job.hashes = [text_hash(cue.text) for cue in job.cues]
+    except Exception as e:
+        job.error = str(e)
+    return job
+
+
+def merge_file(job: FileJob) -> FileJob:
+    """[CPU] 병합/정리만 (번역 없음): prepare_file 후 자막은 메인 프로세스로 돌려보내지 않음"""
+    job = prepare_file(job)
+    job.count = len(job.cues)
+    job.cues = []
+    job.hashes = []
+    return job
+
+
+def translate_file(job: FileJob, backend, stored: dict, **options) -> FileJob:
+    """
+    [I/O] 저장된 번역({자막 해시: 번역})은 재사용하고 나머지만 번역
+    options 는 translate_texts() 인자 (executor, max_chars, max_items, memory)
+    """
+    if job.error:
+        return job
+    start = time.perf_counter()
+    try:
+        stats = TranslationStats()
+        options = dict(options, stats=stats)
+        pending = [cue for cue, h in zip(job.cues, job.hashes) if h not in stored]
+        for _ in translate_cues(pending, backend, **options):
+            pass
+
+        # 재시도를 모두 써도 실패한 자막만 한 번 더 번역 (후처리 재시도)
+        failed = sum(cue.text.startswith(FAILURE_MARKER) for cue in pending)
+        if failed:
+            fixed = retry_failures(pending, backend, **options)
+            job.messages.append(f"번역 실패 {failed}개 재시도: {fixed}개 성공")
+
+        for cue, h in zip(job.cues, job.hashes):
+            if h in stored:
+                cue.lines = stored[h].splitlines()
+
+        job.reused = len(job.cues) - len(pending)
+        job.translated = len(pending)
+        job.stats = stats
+        # 규칙 적용 전 번역 결과 (매니페스트 기록용)
+        job.translations = [(h, cue.text) for cue, h in zip(job.cues, job.hashes)]
+    except Exception as e:
+        job.error = str(e)
+    job.timings["translate"] = time.perf_counter() - start
+    return job
+
+
+_rule_chain = None
+_rule_chain_lock = threading.Lock()
+
+
+def process_rule_chain(template: Path = DEFAULT_TEMPLATE):
+    """
+    프로세스별 규칙 체인 (최초 1회만 로드/컴파일, 템플릿이 없으면 None)
+    메인 프로세스에서 먼저 불러 두면 fork 로 만든 작업자는 컴파일된 체인을 그대로 물려받음
+    """
+    global _rule_chain
+    with _rule_chain_lock:
+        if _rule_chain is None and template.exists():
+            _rule_chain = load_rule_chain(template)
+    return _rule_chain
+
+
+_profile_chains = {}
+
+
+def process_profile_chain(names: tuple, template: Path = DEFAULT_TEMPLATE) -> ProfileChain | None:
+    """프로세스별 출력 프로파일 체인 (프로파일 조합마다 1회, 규칙은 process_rule_chain 의 것을 공유)"""
+    rule_chain = process_rule_chain(template)
+    if rule_chain is None:
+        return None
+    with _rule_chain_lock:
+        chain = _profile_chains.get(names)
+        if chain is None:
+            chain = _profile_chains[names] = ProfileChain(rule_chain.groups, names)
+    return chain
+
+
+def finish_file(job: FileJob, rule_chain=None) -> FileJob:
+    """
+    [CPU] 다중 바꾸기 규칙 적용 → 빈 자막 정리 → .ko.srt 저장
+    job.profiles 가 있으면 프로파일마다 저장 (공통 규칙은 한 번만 적용)
+    """
+    if job.error:
+        return job
+    try:
+        with stage_timer(job.timings, "rules"):
+            if job.profiles:
+                profile_chain = process_profile_chain(job.profiles)
+                if profile_chain is not None:
+                    variants = profile_chain.apply_cues(job.cues)
+                else:
+                    variants = dict.fromkeys(job.profiles, job.cues)
+                targets = [(PROFILES[name].output_path(job.path), variants[name]) for name in job.profiles]
+            else:
+                rule_chain = rule_chain or process_rule_chain()
+                cues = job.cues
+                if rule_chain is not None:
+                    cues = rule_chain.apply_cues(cues)
+                targets = [(job.output_path, cues)]
+            # 규칙이 같은 프로파일은 같은 목록을 받으므로 한 번만 정리
+            cleaned = {}
+            for path, cues in targets:
+                if id(cues) not in cleaned:
+                    cleaned[id(cues)] = list(drop_empty_cues(cues))
+            targets = [(path, cleaned[id(cues)]) for path, cues in targets]
+
+        # 한국어 자막 파일 저장
+        with stage_timer(job.timings, "write"):
+            job.outputs = [(path, save_srt(cues, path)) for path, cues in targets]
+        job.count = job.outputs[0][1]
+        job.cues = []       # 결과는 파일에 있으므로 메인 프로세스로 돌려보내지 않음
+    except Exception as e:
+        job.error = str(e)
+    return job
+
+
+# ────────────────────────────────────────────────────────────────
+# 2. 파이프라인 실행기
+# ────────────────────────────────────────────────────────────────
+
+class _Chain:
+    """항목 하나를 단계(executor, 함수) 목록에 차례로 통과시키는 Future 연결"""
+
+    def __init__(self, item, stages: list):
+        self.stages = stages
+        self.result = Future()
+        self._submit(0, item)
+
+    def _submit(self, index: int, value):
+        if index == len(self.stages):
+            self.result.set_result(value)
+            return
+        executor, func = self.stages[index]
+        try:
+            future = executor.submit(func, value)
+        except Exception as e:
+            self.result.set_exception(e)
+            return
+        future.add_done_callback(lambda f: self._done(index, f))
+
+    def _done(self, index: int, future: Future):
+        error = future.exception()
+        if error is not None:
+            self.result.set_exception(error)
+        else:
+            self._submit(index + 1, future.result())
+
+
+def run_pipeline(items, stages: list, window: int):
+    """
+    items 를 stages 순서대로 처리한 결과를 입력 순서대로 내보냅니다. (generator)
+
+    Args:
+        stages: [(executor, 함수)] - 함수는 이전 단계 결과 하나를 받아 다음 단계로 넘길 값을 반환
+        window: 동시에 진행 중인 항목 수 상한 (다음 항목은 앞 항목 결과를 내보낸 뒤 시작)
+    """
+    in_flight = deque()
+    for item in items:
+        if len(in_flight) >= window:
+            yield in_flight.popleft().result.result()
+        in_flight.append(_Chain(item, stages))
+    while in_flight:
+        yield in_flight.popleft().result.result()
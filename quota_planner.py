@@ -0,0 +1,127 @@
+"""
+DeepL 문자 한도 기반 실행 계획
+
+실행 전에 처리할 파일마다 청구될 문자 수(병합, 매니페스트 재사용, 번역 메모리 적용 후)를
+미리 계산하고, 사용량은 한 번만 조회해서 남은 한도 안에 들어가는 파일만 고릅니다.
+실행 중에는 실제로 보낸 문자 수를 직접 차감하며, 한도를 넘게 되는 파일은 시작하지 않고
+(파일 단위로 멈춤) 남은 파일 목록을 상태 파일에 저장해 다음 실행에서 이어서 처리합니다.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+STATE_NAME = ".srt_run_state.json"
+
+# 파일 선택 순서
+ORDER_PATH = "path"          # 발견 순서 그대로 (앞에서부터 들어가는 것만)
+ORDER_SMALLEST = "smallest"  # 청구 문자 수가 적은 파일부터 (완료 파일 수 최대)
+ORDERS = (ORDER_PATH, ORDER_SMALLEST)
+
+
+def fetch_remaining(backend) -> tuple[int | None, bool]:
+    """
+    사용량을 한 번 조회합니다.
+
+    Returns:
+        (남은 문자 수 또는 None(한도 정보 없음), 한도 초과 여부)
+    """
+    usage = backend.get_usage()
+    if usage.any_limit_reached:
+        return 0, True
+    if not usage.character.valid:
+        return None, False
+    return usage.character.limit - usage.character.count, False
+
+
+def pack_plans(plans: list, remaining: int | None, order: str = ORDER_PATH) -> tuple[list, list]:
+    """
+    남은 한도 안에 들어가는 파일을 고릅니다.
+    청구 문자가 없는 파일(규칙만 재적용 등)은 항상 포함합니다.
+
+    Returns:
+        (실행할 계획 목록(원래 순서), 보류할 계획 목록)
+    """
+    if remaining is None:
+        return list(plans), []
+
+    paid = [plan for plan in plans if plan.billable > 0]
+    if order == ORDER_SMALLEST:
+        paid.sort(key=lambda plan: plan.billable)
+
+    budget = remaining
+    deferred = set()
+    for plan in paid:
+        if plan.billable <= budget:
+            budget -= plan.billable
+        else:
+            deferred.add(id(plan))
+
+    selected = [plan for plan in plans if id(plan) not in deferred]
+    return selected, [plan for plan in plans if id(plan) in deferred]
+
+
+class QuotaBudget:
+    """실행 중 남은 한도를 직접 차감 (여러 스레드에서 안전하게 사용)"""
+
+    def __init__(self, remaining: int | None):
+        self.remaining = remaining      # None 이면 무제한
+        self.projected = 0              # 예약한(예상) 문자 수 합계
+        self.actual = 0                 # 실제로 보낸 문자 수 합계
+        self._lock = threading.Lock()
+
+    def reserve(self, characters: int) -> bool:
+        """파일 하나를 시작하기 전에 예상 문자 수를 예약. 남은 한도를 넘으면 False"""
+        with self._lock:
+            if self.remaining is not None and characters > self.remaining:
+                return False
+            if self.remaining is not None:
+                self.remaining -= characters
+            self.projected += characters
+            return True
+
+    def settle(self, reserved: int, actual: int):
+        """파일 처리 후 예약분을 실제 사용량으로 정산"""
+        with self._lock:
+            if self.remaining is not None:
+                self.remaining += reserved - actual
+            self.actual += actual
+
+
+# ────────────────────────────────────────────────────────────────
+# 이어서 처리하기 위한 상태 파일
+# ────────────────────────────────────────────────────────────────
+
+def save_state(path: Path, root: Path, deferred: list, remaining: int | None, reason: str):
+    """보류한 파일 목록을 저장 (임시 파일에 쓴 뒤 교체)"""
+    state = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "reason": reason,
+        "remaining_characters": remaining,
+        "pending": [
+            {"path": plan.path.relative_to(root).as_posix(), "billable": plan.billable}
+            for plan in deferred
+        ],
+    }
+    temp = path.with_suffix(path.suffix + ".tmp")
+    temp.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(temp, path)
+
+
+def load_state(path: Path) -> list[str] | None:
+    """저장된 보류 파일 목록 (루트 기준 상대 경로). 상태 파일이 없으면 None"""
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    return [item["path"] for item in state.get("pending", [])]
+
+
+def clear_state(path: Path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,295 @@
+"""
+번역 요청 속도 제한 / 재시도 / 동시 요청 수 자동 조절
+
+일시적인 429(요청 과다), 5xx, 연결 오류 때문에 "[번역 실패]" 가 .ko.srt 에
+그대로 남지 않도록 백엔드 앞에 한 겹을 둡니다.
+
+- TokenBucket        : 초당 요청 수 제한 (버스트 허용)
+- AdaptiveConcurrency: AIMD 방식 동시 요청 수 조절
+                       (429 → 절반으로 감소, 성공이 이어지면 1씩 증가)
+- RetryPolicy        : 지수 백오프 + 지터 (full jitter)
+- SampleWindow       : 최근 N개 값으로 p50/p95, 횟수/합계/최대는 전체 누적 (메모리 일정)
+- ClientMetrics      : 요청/초, 재시도, 429 횟수, 지연 p50/p95
+- ResilientBackend   : 위 기능을 묶은 백엔드 래퍼 (translate_batch / get_usage 그대로 제공)
+"""
+
+import math
+import random
+import threading
+import time
+from collections import deque
+
+from translation import TranslationError
+
+
+# 기본 재시도 설정
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 0.5    # 첫 재시도 최대 대기 (초)
+DEFAULT_MAX_DELAY = 30.0    # 재시도 대기 상한 (초)
+
+# 백분위 계산에 쓰는 최근 값 개수 (감시 모드처럼 오래 돌아도 메모리/정렬 비용 일정)
+DEFAULT_SAMPLE_WINDOW = 2048
+
+
+# ────────────────────────────────────────────────────────────────
+# 1. 속도 제한 / 동시 요청 수 조절
+# ────────────────────────────────────────────────────────────────
+
+class TokenBucket:
+    """
+    초당 rate 개의 토큰이 채워지는 버킷 (최대 burst 개)
+    요청 하나마다 토큰 하나를 쓰고, 없으면 채워질 때까지 기다립니다.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD 동시 요청 수 제한
+
+    - 429 를 받으면 한도를 절반으로 (최소 minimum)
+    - 현재 한도만큼 연속으로 성공하면 한도 +1 (최대 maximum)
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1, initial: int | None = None):
+        self.maximum = max(1, maximum)
+        self.minimum = max(1, min(minimum, self.maximum))
+        self.limit = min(self.maximum, max(self.minimum, initial or self.maximum))
+        self.active = 0
+        self.peak = 0                 # 실제 동시 요청 수 최대값
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.active >= self.limit:
+                self._cond.wait()
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    def on_success(self):
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.maximum:
+                self.limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    def on_throttle(self):
+        with self._cond:
+            self.limit = max(self.minimum, self.limit // 2)
+            self._successes = 0
+
+
+class RetryPolicy:
+    """지수 백오프 + full jitter: 0 ~ min(max_delay, base_delay * 2^attempt) 사이 임의 대기"""
+
+    def __init__(self, max_retries: int = DEFAULT_MAX_RETRIES,
+                 base_delay: float = DEFAULT_BASE_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY, seed: int | None = None):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._random = random.Random(seed)
+
+    def delay(self, attempt: int) -> float:
+        return self._random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+# ────────────────────────────────────────────────────────────────
+# 2. 지표
+# ────────────────────────────────────────────────────────────────
+
+def percentile(values: list[float], fraction: float) -> float:
+    """정렬된 목록의 백분위 값 (최근접 순위)"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))
+    return values[index]
+
+
+class SampleWindow:
+    """
+    시간 값 모음: 백분위는 최근 size 개로, 횟수/합계/최대는 처음부터 누적
+    (잠금 없음 → 쓰는 쪽의 잠금 안에서 사용)
+    """
+
+    def __init__(self, size: int = DEFAULT_SAMPLE_WINDOW):
+        self.recent = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        self.recent.append(value)
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def extend(self, values):
+        for value in values:
+            self.add(value)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def summary(self) -> dict:
+        """횟수/합계/최대 + 최근 값 기준 p50/p95"""
+        recent = sorted(self.recent)
+        return {"count": self.count, "total": self.total, "max": self.max,
+                "p50": percentile(recent, 0.50), "p95": percentile(recent, 0.95)}
+
+
+class ClientMetrics:
+    """번역 요청 지표 (여러 스레드에서 안전하게 누적)"""
+
+    def __init__(self):
+        self.requests = 0       # 실제 보낸 요청 수 (재시도 포함)
+        self.successes = 0
+        self.retries = 0
+        self.throttled = 0      # 429 응답 수
+        self.failures = 0       # 재시도를 모두 써도 실패한 배치 수
+        self.latencies = SampleWindow()     # 요청별 응답 시간 (초)
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool, throttled: bool = False):
+        with self._lock:
+            self.requests += 1
+            self.latencies.add(latency)
+            if ok:
+                self.successes += 1
+            if throttled:
+                self.throttled += 1
+
+    def add_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def add_failure(self):
+        with self._lock:
+            self.failures += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            latencies = self.latencies.summary()
+            elapsed = max(time.monotonic() - self.started, 1e-9)
+            return {
+                "requests": self.requests,
+                "requests_per_second": self.requests / elapsed,
+                "successes": self.successes,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "failures": self.failures,
+                "p50_ms": latencies["p50"] * 1000,
+                "p95_ms": latencies["p95"] * 1000,
+            }
+
+    def format(self) -> str:
+        info = self.summary()
+        return (f"요청 {info['requests']:,}회 ({info['requests_per_second']:.1f}/s), "
+                f"재시도 {info['retries']:,}회, 429 {info['throttled']:,}회, "
+                f"최종 실패 {info['failures']:,}회, "
+                f"지연 p50 {info['p50_ms']:.0f} ms / p95 {info['p95_ms']:.0f} ms")
+
+
+# ────────────────────────────────────────────────────────────────
+# 3. 백엔드 래퍼
+# ────────────────────────────────────────────────────────────────
+
+class ResilientBackend:
+    """
+    속도 제한 + 재시도 + 동시 요청 수 자동 조절 백엔드 래퍼
+
+    backend = ResilientBackend(DeepLBackend(key, network_retries=0), rate=5, max_concurrency=4)
+    translate_texts(texts, backend)   # 일시 오류는 백오프 후 재시도, 끝내 실패하면 TranslationError
+    """
+
+    def __init__(self, backend, rate: float | None = None, burst: int | None = None,
+                 max_concurrency: int = 4, min_concurrency: int = 1,
+                 retry: RetryPolicy | None = None, metrics: ClientMetrics | None = None,
+                 sleep=time.sleep):
+        self.backend = backend
+        self.name = backend.name
+        self.options = backend.options
+        self.metered = getattr(backend, "metered", True)
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.concurrency = AdaptiveConcurrency(max_concurrency, min_concurrency)
+        self.retry = retry or RetryPolicy()
+        self.metrics = metrics or ClientMetrics()
+        self._sleep = sleep
+
+    def _call(self, func, *args, request: bool = True):
+        """
+        func(*args) 를 재시도 정책대로 호출
+        request=False 면 번역 요청이 아닌 호출(사용량 조회 등)로 보고
+        속도 제한 토큰/동시 요청 슬롯/요청 지표는 쓰지 않고 백오프 재시도만 함
+        """
+        attempt = 0
+        while True:
+            if request:
+                if self.bucket is not None:
+                    self.bucket.acquire()
+                self.concurrency.acquire()
+            start = time.perf_counter()
+            try:
+                result = func(*args)
+            except TranslationError as e:
+                if request:
+                    self.metrics.record(time.perf_counter() - start, ok=False, throttled=e.throttled)
+                    if e.throttled:
+                        self.concurrency.on_throttle()
+                if not e.retryable or attempt >= self.retry.max_retries:
+                    if request:
+                        self.metrics.add_failure()
+                    raise
+                error = e
+            else:
+                if request:
+                    self.metrics.record(time.perf_counter() - start, ok=True)
+                    self.concurrency.on_success()
+                return result
+            finally:
+                if request:
+                    self.concurrency.release()
+
+            # 동시 요청 슬롯을 돌려준 뒤 대기
+            delay = self.retry.delay(attempt)
+            attempt += 1
+            if request:
+                self.metrics.add_retry()
+            print(f"{'번역 요청' if request else '요청'} 재시도 {attempt}/{self.retry.max_retries} "
+                  f"({delay:.1f}초 후): {error}")
+            self._sleep(delay)
+
+    def translate_batch(self, texts: list[str]) -> list[str]:
+        return self._call(self.backend.translate_batch, texts)
+
+    def get_usage(self):
+        # 사용량 조회는 번역 요청이 아니므로 속도 제한 토큰/동시 요청 슬롯/요청 지표는 쓰지 않음
+        # (DeepL 클라이언트 재시도를 끄고 쓰므로 일시 오류 재시도는 여기서 함)
+        return self._call(self.backend.get_usage, request=False)
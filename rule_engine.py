@@ -0,0 +1,750 @@
+"""
+Subtitle Edit 다중 바꾸기 템플릿 규칙 엔진
+
+multiple_replace_groups.template (또는 change_check.py 가 만든 그룹별 XML)을
+읽어서 Subtitle Edit GUI 없이 파이썬에서 모든 규칙을 적용합니다.
+
+- 그룹/항목의 <Enabled> 값과 그룹 순서(0. → 1. → 2. → 3.)를 그대로 따름
+- 모든 정규식은 로드 시 한 번만 컴파일
+- .NET 정규식/치환 문법($1, (?<name>...), 가변 길이 lookbehind)을 파이썬 re 로 변환
+- 빠른 경로: 각 규칙이 매칭되려면 반드시 포함해야 하는 리터럴(트리거)을 뽑아
+  하나의 접두사 트리(trie) 정규식으로 합치고, 트리거 → 규칙 디스패치 테이블로
+  실제로 매칭 가능성이 있는 규칙만 순서대로 실행 (결과는 순차 적용과 동일)
+- 리터럴 빠른 경로: 정규식 기호가 없는 규칙(RegularExpression 으로 표시돼 있어도)은
+  로드 시 리터럴로 분류해 str.replace 로 적용하고, 치환 후에는 텍스트 전체가 아니라
+  바뀐 구간 주변만 트리거 트리로 다시 검사 (정규식 규칙만 re 로 실행)
+"""
+
+import argparse
+import hashlib
+import marshal
+import re
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from srt_stream import atomic_open, drop_empty_cues, parse_srt_string, srt_to_string
+
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # Python 3.10 이하
+    import sre_constants
+    import sre_parse
+
+
+# 기본 템플릿 경로 (이 파일과 같은 폴더)
+DEFAULT_TEMPLATE = Path(__file__).with_name("multiple_replace_groups.template")
+
+# 트리거 추출 시 문자 클래스를 펼칠 최대 글자 수 ([이코] 같은 작은 클래스만)
+MAX_CLASS_TRIGGERS = 16
+
+
+# ────────────────────────────────────────────────────────────────
+# 1. .NET 정규식 → 파이썬 re 변환
+# ────────────────────────────────────────────────────────────────
+
+def _split_lookbehind(match: re.Match) -> str:
+    """
+    (?<!가|벗겨) 처럼 길이가 다른 대안을 가진 lookbehind 를
+    길이가 고정된 lookbehind 여러 개로 나눕니다.
+
+    - 부정: (?<!a|bc)  → (?<!a)(?<!bc)
+    - 긍정: (?<=a|bc)  → (?:(?<=a)|(?<=bc))
+    """
+    kind, body = match.group(1), match.group(2)
+    alternatives = body.split("|")
+    if kind == "!":
+        return "".join(f"(?<!{alt})" for alt in alternatives)
+    return "(?:" + "|".join(f"(?<={alt})" for alt in alternatives) + ")"
+
+
+def convert_pattern(find_what: str) -> str:
+    """
+    Subtitle Edit(.NET) 정규식을 파이썬 re 문법으로 변환합니다.
+
+    - (?<name>...) 이름 그룹 → (?P<name>...)
+    - 파이썬이 거부하는 가변 길이 lookbehind 는 고정 길이 lookbehind 로 분리
+    """
+    pattern = re.sub(r"\(\?<([A-Za-z_]\w*)>", r"(?P<\1>", find_what)
+    try:
+        re.compile(pattern)
+    except re.error:
+        # 괄호가 중첩되지 않은 단순 대안 lookbehind 만 분리 (그 외는 그대로 두고 에러로 보고)
+        pattern = re.sub(r"\(\?<([!=])([^()]*\|[^()]*)\)", _split_lookbehind, pattern)
+    return pattern
+
+
+def convert_replacement(replace_with: str, group_count: int) -> str:
+    """
+    .NET 치환 문자열을 파이썬 re 치환 템플릿으로 변환합니다.
+
+    - $1, $12 → \\g<1>, \\g<12> (.NET 처럼 존재하는 그룹 번호까지만 숫자를 읽음)
+    - ${name} → \\g<name>
+    - $$      → $
+    - 역슬래시는 .NET 에서 일반 문자이므로 이스케이프
+    """
+    out = []
+    i = 0
+    n = len(replace_with)
+    while i < n:
+        ch = replace_with[i]
+        if ch == "\\":
+            out.append("\\\\")
+            i += 1
+            continue
+        if ch != "$" or i + 1 >= n:
+            out.append(ch)
+            i += 1
+            continue
+
+        nxt = replace_with[i + 1]
+        if nxt == "$":
+            out.append("$")
+            i += 2
+            continue
+        if nxt == "{":
+            end = replace_with.find("}", i + 2)
+            if end != -1:
+                name = replace_with[i + 2:end]
+                if name.isdigit() or name.isidentifier():
+                    out.append(f"\\g<{name}>")
+                    i = end + 1
+                    continue
+        if nxt.isdigit():
+            j = i + 1
+            while j < n and replace_with[j].isdigit():
+                j += 1
+            # 가장 긴 유효 그룹 번호를 찾을 때까지 뒤에서부터 숫자를 줄임
+            while j > i + 2 and int(replace_with[i + 1:j]) > group_count:
+                j -= 1
+            if int(replace_with[i + 1:j]) <= group_count:
+                out.append(f"\\g<{replace_with[i + 1:j]}>")
+                i = j
+                continue
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+# ────────────────────────────────────────────────────────────────
+# 2. 트리거 리터럴 추출 (매칭에 반드시 필요한 문자열)
+# ────────────────────────────────────────────────────────────────
+
+def _better(candidate: set, best: set | None) -> bool:
+    """트리거 후보 비교: 가장 짧은 문자열이 길수록, 개수가 적을수록 좋음"""
+    if best is None:
+        return True
+    key_c = (min(map(len, candidate)), -len(candidate))
+    key_b = (min(map(len, best)), -len(best))
+    return key_c > key_b
+
+
+def _class_literals(items) -> set | None:
+    """[이코] 처럼 작은 문자 클래스를 글자 집합으로 펼침 (범위/카테고리/부정은 None)"""
+    chars = set()
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            chars.add(chr(av))
+        elif op is sre_constants.RANGE and av[1] - av[0] < MAX_CLASS_TRIGGERS:
+            chars.update(chr(c) for c in range(av[0], av[1] + 1))
+        else:
+            return None
+    if not chars or len(chars) > MAX_CLASS_TRIGGERS:
+        return None
+    return chars
+
+
+def _required_literals(items) -> set | None:
+    """
+    파싱된 정규식(sre_parse) 시퀀스에서 "모든 매칭이 이 중 하나는 반드시 포함하는"
+    문자열 집합을 구합니다. 확신할 수 없으면 None.
+    """
+    best = None
+    run = []
+
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+
+        # 연속 리터럴 구간이 끝나면 후보로 등록
+        if run:
+            candidate = {"".join(run)}
+            if _better(candidate, best):
+                best = candidate
+            run = []
+
+        candidate = None
+        if op is sre_constants.SUBPATTERN:
+            add_flags = av[1]
+            if not add_flags & sre_constants.SRE_FLAG_IGNORECASE:
+                candidate = _required_literals(av[-1])
+        elif op is getattr(sre_constants, "ATOMIC_GROUP", None):
+            candidate = _required_literals(av)
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+                    getattr(sre_constants, "POSSESSIVE_REPEAT", None)):
+            if av[0] >= 1:
+                candidate = _required_literals(av[2])
+        elif op is sre_constants.BRANCH:
+            alternatives = [_required_literals(alt) for alt in av[1]]
+            if all(alternatives):
+                candidate = set().union(*alternatives)
+        elif op is sre_constants.IN:
+            candidate = _class_literals(av)
+
+        if candidate and _better(candidate, best):
+            best = candidate
+
+    if run:
+        candidate = {"".join(run)}
+        if _better(candidate, best):
+            best = candidate
+    return best
+
+
+def extract_triggers(pattern: re.Pattern) -> frozenset:
+    """
+    컴파일된 정규식에서 트리거 리터럴 집합을 구합니다.
+    빈 집합이면 트리거를 알 수 없으므로 규칙을 항상 실행해야 합니다.
+    """
+    if pattern.flags & re.IGNORECASE:
+        return frozenset()
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return frozenset()
+    required = _required_literals(parsed.data)
+    return frozenset(required) if required else frozenset()
+
+
+def build_trie_regex(words) -> str:
+    """
+    문자열 목록을 접두사 트리 형태의 하나의 정규식으로 합칩니다.
+    예: ["가나", "가나다", "가라"] → 가(?:나(?:다)?|라)
+
+    같은 위치에서는 항상 가장 긴 문자열이 매칭됩니다 (greedy 선택).
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node) -> str:
+        alternatives = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return ""
+        body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+        if "" in node:
+            return f"(?:{body})?"
+        return body
+
+    return emit(trie)
+
+
+def literal_text(pattern: re.Pattern) -> str | None:
+    """
+    정규식이 순수 리터럴(정규식 기호 없음)이면 그 문자열, 아니면 None
+    대소문자 무시 패턴은 대소문자가 없는 글자(한글/일본어 등)로만 이뤄졌을 때만 리터럴로 봅니다.
+    """
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return None
+    if not parsed.data or any(op is not sre_constants.LITERAL for op, _ in parsed.data):
+        return None
+    text = "".join(chr(av) for _, av in parsed.data)
+    if pattern.flags & re.IGNORECASE and text.lower() != text.upper():
+        return None
+    return text
+
+
+# ────────────────────────────────────────────────────────────────
+# 3. 규칙 / 그룹 자료구조
+# ────────────────────────────────────────────────────────────────
+
+class Rule:
+    """다중 바꾸기 항목 하나 (컴파일된 정규식 + 파이썬 치환 템플릿)"""
+
+    __slots__ = ("group", "position", "find_what", "replace_with", "description",
+                 "enabled", "search_type", "regex", "flags", "repl", "triggers",
+                 "literal", "literal_repl", "_pattern")
+
+    def __init__(self, group: str, position: int, find_what: str, replace_with: str,
+                 description: str = "", enabled: bool = True,
+                 search_type: str = "RegularExpression"):
+        self.group = group
+        self.position = position            # 그룹 내 순번 (1부터)
+        self.find_what = find_what
+        self.replace_with = replace_with
+        self.description = description
+        self.enabled = enabled
+        self.search_type = search_type
+
+        if search_type == "RegularExpression":
+            pattern = re.compile(convert_pattern(find_what), re.MULTILINE)
+            self.repl = convert_replacement(replace_with, pattern.groups)
+        else:
+            # Normal / CaseSensitive 검색은 리터럴 치환
+            flags = re.IGNORECASE if search_type == "Normal" else 0
+            pattern = re.compile(re.escape(find_what), flags)
+            self.repl = replace_with.replace("\\", "\\\\")
+        self._pattern = pattern
+        self.regex = pattern.pattern        # 변환된 파이썬 정규식 (규칙 팩에 저장)
+        self.flags = pattern.flags
+        self.triggers = extract_triggers(pattern)
+
+        # 순수 리터럴이면 찾을/바꿀 문자열 (바꿀 내용은 $$ 등을 미리 풀어 둠)
+        self.literal = literal_text(pattern)
+        self.literal_repl = None
+        if self.literal is not None:
+            self.literal_repl = pattern.match(self.literal).expand(self.repl)
+            self.triggers = frozenset((self.literal,))
+
+    @property
+    def pattern(self) -> re.Pattern:
+        """컴파일된 정규식 (규칙 팩에서 불러온 규칙은 처음 쓸 때 컴파일)"""
+        if self._pattern is None:
+            self._pattern = re.compile(self.regex, self.flags)
+        return self._pattern
+
+    @property
+    def is_literal(self) -> bool:
+        return self.literal is not None
+
+    def to_state(self) -> tuple:
+        """규칙 팩 저장용 (기본 자료형만)"""
+        return (self.group, self.position, self.find_what, self.replace_with, self.description,
+                self.enabled, self.search_type, self.regex, self.flags, self.repl,
+                tuple(self.triggers), self.literal, self.literal_repl)
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "Rule":
+        """to_state() 결과에서 규칙 복원 (변환/트리거 추출/컴파일 없이)"""
+        rule = cls.__new__(cls)
+        (rule.group, rule.position, rule.find_what, rule.replace_with, rule.description,
+         rule.enabled, rule.search_type, rule.regex, rule.flags, rule.repl,
+         triggers, rule.literal, rule.literal_repl) = state
+        rule.triggers = frozenset(triggers)
+        rule._pattern = None
+        return rule
+
+    def apply(self, text: str) -> str:
+        if self.literal is not None:
+            return text.replace(self.literal, self.literal_repl)
+        return self.pattern.sub(self.repl, text)
+
+    def __repr__(self):
+        return f"Rule({self.group!r}#{self.position}: {self.find_what!r} → {self.replace_with!r})"
+
+
+class RuleGroup:
+    """다중 바꾸기 그룹 (이름, 사용 여부, 규칙 목록)"""
+
+    __slots__ = ("name", "enabled", "rules")
+
+    def __init__(self, name: str, enabled: bool, rules: list[Rule]):
+        self.name = name
+        self.enabled = enabled
+        self.rules = rules
+
+    def __repr__(self):
+        return f"RuleGroup({self.name!r}, enabled={self.enabled}, rules={len(self.rules)})"
+
+
+# ────────────────────────────────────────────────────────────────
+# 4. XML 로드 (템플릿 파일 또는 change_check 폴더)
+# ────────────────────────────────────────────────────────────────
+
+def _is_true(element, tag: str) -> bool:
+    """<Enabled> 값 해석 (태그가 없으면 사용으로 간주)"""
+    value = element.findtext(tag)
+    return value is None or value.strip().lower() == "true"
+
+
+def parse_groups(root) -> list[RuleGroup]:
+    """<Settings> 루트 요소에서 그룹 목록을 문서 순서대로 읽습니다."""
+    parent = root.find("MultipleSearchAndReplaceList")
+    if parent is None:
+        return []
+
+    groups = []
+    for idx, group in enumerate(parent.findall("Group"), start=1):
+        name = (group.findtext("Name") or f"group_{idx}").strip()
+        rules = []
+        for pos, item in enumerate(group.findall("MultipleSearchAndReplaceItem"), start=1):
+            rules.append(Rule(
+                group=name,
+                position=pos,
+                find_what=item.findtext("FindWhat") or "",
+                replace_with=item.findtext("ReplaceWith") or "",
+                description=(item.findtext("Description") or "").strip(),
+                enabled=_is_true(item, "Enabled"),
+                search_type=(item.findtext("SearchType") or "RegularExpression").strip(),
+            ))
+        groups.append(RuleGroup(name, _is_true(group, "Enabled"), rules))
+    return groups
+
+
+def group_sort_key(path: Path) -> tuple:
+    """
+    change_check 그룹 파일 정렬 키: 파일 이름 앞의 번호(2-4-1.)를 숫자 튜플로 비교
+    → 1. < 1-1. < 1-2. < 2. < 2-1. < 2-1-1. ...
+    """
+    prefix = re.match(r"^[\d-]+", path.name)
+    numbers = tuple(int(n) for n in prefix.group().split("-") if n) if prefix else ()
+    return (numbers, path.name)
+
+
+def load_groups(source: Path = DEFAULT_TEMPLATE) -> list[RuleGroup]:
+    """
+    규칙 그룹을 불러옵니다.
+
+    Args:
+        source: multiple_replace_groups.template 파일 또는
+                change_check.py 가 생성한 그룹별 XML 폴더
+
+    Returns:
+        list[RuleGroup]: 적용 순서대로 정렬된 그룹 목록
+    """
+    source = Path(source)
+    if source.is_dir():
+        groups = []
+        for xml_file in sorted(source.glob("*.xml"), key=group_sort_key):
+            groups.extend(parse_groups(ET.parse(xml_file).getroot()))
+        return groups
+    return parse_groups(ET.parse(source).getroot())
+
+
+# ────────────────────────────────────────────────────────────────
+# 5. 규칙 체인 (순차 적용 / 디스패치 적용)
+# ────────────────────────────────────────────────────────────────
+
+class RuleChain:
+    """
+    사용 중인 그룹의 사용 중인 규칙을 순서대로 적용하는 체인
+
+    apply()            : 트리거 디스패치 빠른 경로 (기본)
+    apply_sequential() : 모든 규칙을 하나씩 re.sub (기준 구현, 벤치마크 비교용)
+
+    literal_fast_path=False 면 리터럴 규칙도 re.sub + 전체 재검사로 실행 (벤치마크 비교용)
+    """
+
+    def __init__(self, groups: list[RuleGroup], literal_fast_path: bool = True,
+                 state: dict | None = None):
+        self.groups = groups
+        self.rules = [rule for group in groups if group.enabled
+                      for rule in group.rules if rule.enabled]
+        self.literal_fast_path = literal_fast_path
+
+        # 디스패치 자료는 규칙 팩에 저장된 것(state)이 있으면 그대로 사용
+        if state is None:
+            state = self._analyze()
+        self._always = list(state["always"])
+        self._dispatch = {trigger: set(indices) for trigger, indices in state["dispatch"].items()}
+        self._scanner = re.compile(state["scanner"]) if state["scanner"] else None
+        self._inert = frozenset(state["inert"]) if literal_fast_path else frozenset()
+        self._fingerprint = state.get("fingerprint")
+
+    def _analyze(self) -> dict:
+        """트리거 디스패치 자료 계산 (규칙 팩에 저장되는 부분)"""
+        # 트리거가 없는 규칙은 항상 실행
+        always = [i for i, rule in enumerate(self.rules) if not rule.triggers]
+
+        # 트리거 → 규칙 번호 디스패치 테이블
+        by_trigger = {}
+        for i, rule in enumerate(self.rules):
+            for trigger in rule.triggers:
+                by_trigger.setdefault(trigger, set()).add(i)
+
+        # 같은 위치에서는 가장 긴 트리거만 매칭되므로, 그 접두사인 트리거의 규칙도 함께 포함
+        dispatch = {}
+        for trigger in by_trigger:
+            indices = set()
+            for end in range(1, len(trigger) + 1):
+                indices |= by_trigger.get(trigger[:end], set())
+            dispatch[trigger] = tuple(sorted(indices))
+
+        return {
+            "always": always,
+            "dispatch": dispatch,
+            "scanner": build_trie_regex(by_trigger) if by_trigger else "",
+            "inert": tuple(sorted(self._inert_literals())),
+        }
+
+    def to_state(self) -> dict:
+        """규칙 팩 저장용 디스패치 자료 (기본 자료형만)"""
+        state = self._analyze()
+        state["fingerprint"] = self.fingerprint
+        return state
+
+    def compile(self):
+        """모든 정규식을 미리 컴파일 (fork 전에 불러 두면 작업자 프로세스가 그대로 물려받음)"""
+        for rule in self.rules:
+            rule.pattern
+
+    def _inert_literals(self) -> frozenset:
+        """
+        치환해도 후보 재계산이 필요 없는 리터럴 규칙 번호
+
+        바꿀 내용이 뒤 규칙의 어떤 트리거와도 겹치지 않으면(포함/접두사·접미사 공유 없음)
+        치환으로 새 트리거가 생길 수 없으므로 기존 후보 목록을 그대로 이어 씁니다.
+        삭제(빈 문자열)는 양옆 글자가 이어져 트리거가 생길 수 있어 제외합니다.
+        """
+        inert = set()
+        later = set()       # 뒤 규칙들의 트리거
+        prefixes = set()    # 그 트리거들의 (자기 자신 제외) 접두사
+        suffixes = set()    # 그 트리거들의 (자기 자신 제외) 접미사
+        joined = ""         # 바꿀 내용이 트리거 안에 들어가는지 확인용
+        for i in range(len(self.rules) - 1, -1, -1):
+            rule = self.rules[i]
+            text = rule.literal_repl
+            if rule.literal is not None and text and text not in joined:
+                n = len(text)
+                if not (any(text[j:] in prefixes or text[:j] in suffixes for j in range(1, n))
+                        or any(text[a:b] in later for a in range(n) for b in range(a + 1, n + 1))):
+                    inert.add(i)
+            new = rule.triggers - later
+            if new:
+                later |= new
+                for trigger in new:
+                    prefixes.update(trigger[:j] for j in range(1, len(trigger)))
+                    suffixes.update(trigger[j:] for j in range(1, len(trigger)))
+                joined += "\0" + "\0".join(new)
+        return frozenset(inert)
+
+    @classmethod
+    def from_path(cls, source: Path = DEFAULT_TEMPLATE, literal_fast_path: bool = True) -> "RuleChain":
+        return cls(load_groups(source), literal_fast_path)
+
+    def __len__(self):
+        return len(self.rules)
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        실제로 적용되는 규칙(사용 중인 그룹의 사용 중인 항목)의 해시
+        설명 변경이나 꺼진 규칙 수정은 결과에 영향이 없으므로 포함하지 않음
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            for rule in self.rules:
+                digest.update("\0".join((rule.search_type, rule.find_what, rule.replace_with)).encode("utf-8"))
+                digest.update(b"\n")
+            self._fingerprint = digest.hexdigest()[:16]
+        return self._fingerprint
+
+    def candidates(self, text: str, after: int = -1) -> list[int]:
+        """text 에 매칭될 가능성이 있는 규칙 번호(after 이후)를 순서대로 반환"""
+        found = set(self._always)
+        if self._scanner is not None:
+            search = self._scanner.search
+            dispatch = self._dispatch
+            pos = 0
+            m = search(text, pos)
+            while m:
+                found |= dispatch[m.group()]
+                pos = m.start() + 1
+                m = search(text, pos)
+        return sorted(i for i in found if i > after)
+
+    def apply(self, text: str) -> str:
+        """
+        규칙 체인을 적용합니다. (순차 적용과 결과 동일)
+
+        텍스트가 바뀌면 바뀐 텍스트로 후보를 다시 계산하므로,
+        앞 규칙의 치환 결과가 뒤 규칙의 매칭을 새로 만들어도 놓치지 않습니다.
+        바꿀 내용이 뒤 규칙의 트리거를 만들 수 없는 리터럴 규칙은 다시 계산하지 않습니다.
+        """
+        rules = self.rules
+        literal_fast_path = self.literal_fast_path
+        inert = self._inert
+        pending = self.candidates(text)
+        k = 0
+        while k < len(pending):
+            index = pending[k]
+            rule = rules[index]
+            if literal_fast_path and rule.literal is not None:
+                if rule.literal in text:
+                    text = text.replace(rule.literal, rule.literal_repl)
+                    if index not in inert:
+                        pending = self.candidates(text, after=index)
+                        k = 0
+                        continue
+                k += 1
+                continue
+
+            new_text = rule.pattern.sub(rule.repl, text)
+            if new_text != text:
+                text = new_text
+                pending = self.candidates(text, after=index)
+                k = 0
+            else:
+                k += 1
+        return text
+
+    def apply_sequential(self, text: str) -> str:
+        """모든 규칙을 순서대로 re.sub 하는 기준 구현"""
+        for rule in self.rules:
+            text = rule.pattern.sub(rule.repl, text)
+        return text
+
+    def apply_cues(self, cues, sequential: bool = False):
+        """
+        Cue 스트림 규칙 적용 단계 (generator)
+        Subtitle Edit 처럼 자막의 텍스트 줄들을 하나의 문단으로 묶어 적용합니다.
+        """
+        apply = self.apply_sequential if sequential else self.apply
+        for cue in cues:
+            cue.lines = apply("\n".join(cue.lines)).split("\n")
+            yield cue
+
+    def apply_srt(self, srt_content: str, sequential: bool = False) -> str:
+        """
+        SRT 전체 문자열에 규칙을 적용합니다. (번호는 다시 매기고 시간은 유지)
+        규칙 적용 후 텍스트가 남지 않은 자막은 삭제합니다.
+        """
+        cues = self.apply_cues(parse_srt_string(srt_content), sequential)
+        return srt_to_string(drop_empty_cues(cues))
+
+
+# ────────────────────────────────────────────────────────────────
+# 6. 규칙 팩 (XML 파싱/정규식 변환 결과 캐시)
+# ────────────────────────────────────────────────────────────────
+
+RULE_PACK_MAGIC = b"SEKRULES"
+RULE_PACK_VERSION = 1           # 팩 구조가 바뀌면 올림
+RULE_PACK_SUFFIX = ".rulepack"
+
+
+def rule_pack_path(source: Path) -> Path:
+    """
+    규칙 팩 기본 위치 (원본 옆)
+    multiple_replace_groups.template → multiple_replace_groups.rulepack
+    change_check (폴더)             → change_check.rulepack
+    """
+    source = Path(source)
+    if source.is_dir():
+        return source.with_name(source.name + RULE_PACK_SUFFIX)
+    return source.with_suffix(RULE_PACK_SUFFIX)
+
+
+def rule_source_hash(source: Path) -> str:
+    """
+    규칙 원본 내용 해시 (템플릿 파일 또는 폴더의 그룹 XML 전체)
+    규칙 엔진 코드, 팩 버전, 파이썬 버전도 포함해서 변환 방식이 바뀌어도 팩이 무효화됩니다.
+    """
+    source = Path(source)
+    digest = hashlib.sha256()
+    digest.update(f"{RULE_PACK_VERSION}\0{sys.version_info[:2]}\0{marshal.version}\0".encode())
+    digest.update(Path(__file__).read_bytes())
+    if source.is_dir():
+        for xml_file in sorted(source.glob("*.xml"), key=group_sort_key):
+            digest.update(b"\0" + xml_file.name.encode("utf-8") + b"\0")
+            digest.update(xml_file.read_bytes())
+    else:
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def save_rule_pack(chain: RuleChain, path: Path, source_hash: str):
+    """
+    규칙 체인을 규칙 팩으로 저장 (임시 파일에 쓴 뒤 교체)
+
+    그룹 순서/사용 여부, 변환된 정규식과 치환 템플릿, 트리거, 리터럴 분류,
+    디스패치 테이블과 트리거 트리 정규식을 marshal(기본 자료형만, 불러올 때 코드 실행 없음)로 저장합니다.
+    """
+    data = {
+        "version": RULE_PACK_VERSION,
+        "source_hash": source_hash,
+        "groups": [(group.name, group.enabled, [rule.to_state() for rule in group.rules])
+                   for group in chain.groups],
+        "chain": chain.to_state(),
+    }
+    # 쓰는 쪽마다 다른 임시 파일 → 여러 프로세스가 같은 팩을 동시에 저장해도 충돌 없음
+    with atomic_open(path, "wb") as f:
+        f.write(RULE_PACK_MAGIC + marshal.dumps(data))
+
+
+def load_rule_pack(path: Path, source_hash: str | None = None,
+                   literal_fast_path: bool = True) -> RuleChain | None:
+    """
+    규칙 팩에서 체인을 복원합니다. (정규식은 처음 쓸 때 컴파일)
+    파일이 없거나, 형식/버전이 다르거나, source_hash 와 맞지 않으면 None
+    """
+    try:
+        raw = Path(path).read_bytes()
+    except OSError:
+        return None
+    if not raw.startswith(RULE_PACK_MAGIC):
+        return None
+    try:
+        data = marshal.loads(raw[len(RULE_PACK_MAGIC):])
+    except (EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != RULE_PACK_VERSION:
+        return None
+    if source_hash is not None and data.get("source_hash") != source_hash:
+        return None
+
+    groups = [RuleGroup(name, enabled, [Rule.from_state(state) for state in rules])
+              for name, enabled, rules in data["groups"]]
+    return RuleChain(groups, literal_fast_path, state=data["chain"])
+
+
+def load_rule_chain(source: Path = DEFAULT_TEMPLATE, literal_fast_path: bool = True,
+                    cache: bool = True) -> RuleChain:
+    """
+    템플릿(또는 그룹 폴더)에서 규칙 체인을 만듭니다.
+
+    cache=True 면 원본 옆의 규칙 팩(.rulepack)을 먼저 확인해서, 원본 내용 해시가 같으면
+    XML 파싱/정규식 변환 없이 바로 불러오고, 없거나 오래됐으면 XML 에서 만든 뒤 팩을 새로 저장합니다.
+    """
+    source = Path(source)
+    if not cache:
+        return RuleChain.from_path(source, literal_fast_path)
+
+    pack_path = rule_pack_path(source)
+    source_hash = rule_source_hash(source)
+    chain = load_rule_pack(pack_path, source_hash, literal_fast_path)
+    if chain is None:
+        chain = RuleChain.from_path(source, literal_fast_path)
+        try:
+            save_rule_pack(chain, pack_path, source_hash)
+        except OSError:
+            pass    # 쓰기 권한이 없는 폴더 등 → 캐시 없이 사용
+    return chain
+
+
+# ────────────────────────────────────────────────────────────────
+# 7. 명령줄 실행
+# ────────────────────────────────────────────────────────────────
+
+def main():
+    """
+    SRT 파일에 규칙 체인을 적용합니다.
+
+    사용법: python rule_engine.py 입력.srt [-o 출력.srt] [--rules 템플릿또는폴더]
+    """
+    parser = argparse.ArgumentParser(description="다중 바꾸기 템플릿 규칙을 SRT 에 적용")
+    parser.add_argument("input", type=Path, help="입력 .srt 파일")
+    parser.add_argument("-o", "--output", type=Path, help="출력 파일 (생략 시 화면 출력)")
+    parser.add_argument("--rules", type=Path, default=DEFAULT_TEMPLATE,
+                        help="multiple_replace_groups.template 또는 change_check 폴더")
+    args = parser.parse_args()
+
+    chain = load_rule_chain(args.rules)
+    content = args.input.read_text(encoding="utf-8-sig")
+    result = chain.apply_srt(content)
+
+    if args.output:
+        args.output.write_text(result, encoding="utf-8-sig")
+        print(f"규칙 {len(chain)}개 적용 완료: {args.output}")
+    else:
+        sys.stdout.write(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+"""
+다중 바꾸기 규칙 정적 분석 + 규칙별 적중 프로파일러
+
+템플릿(또는 change_check 폴더)의 사용 중인 규칙 체인을 대상으로
+
+- 정적 분석 (말뭉치 없이)
+  - 중복: 앞 규칙과 검색 방식/찾을 내용이 같은 규칙 (앞 규칙이 이미 모두 바꿔서 거의 실행되지 않음)
+  - 가려짐: 리터럴 규칙인데 앞 규칙이 그 문자열을 먼저 바꿔 버려 매칭될 수 없는 규칙 (추정)
+  - 역추적 위험: 중첩 반복 ((a+)+), 겹치는 문자 집합의 연속 가변 반복 (\\s*\\s{1,}),
+                 앞글자가 겹치는 대안의 반복 ((a|ab)+)
+- 프로파일 (SRT 말뭉치 지정 시)
+  - 체인을 순서대로 적용하면서 규칙마다 바뀐 자막 수, 매칭 수, 누적 시간, 최악 자막 시간 측정
+
+결과는 정렬 가능한 CSV(엑셀용 UTF-8 BOM) 또는 JSON 으로 저장합니다.
+
+사용법:
+    python rule_profiler.py 번역폴더 -o rules.csv
+    python rule_profiler.py 번역폴더 a.ko.srt --rules change_check --sort worst -o rules.json
+    python rule_profiler.py -o static.csv            # 말뭉치 없이 정적 분석만
+"""
+
+import argparse
+import csv
+import json
+import string
+import time
+from pathlib import Path
+
+from rule_engine import DEFAULT_TEMPLATE, Rule, load_rule_chain
+from srt_stream import read_srt
+
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # Python 3.10 이하
+    import sre_constants
+    import sre_parse
+
+
+# 문자 집합이 겹치는지 확인할 때 쓰는 표본 글자 (ASCII + 공백류 + 한글/일본어/기호)
+PROBE_CHARS = string.printable + "　가힣ㄱㅋㅏ아앗あアン漢ー！？…♡~～"
+
+# 정렬 기준 (order 는 오름차순, 나머지는 내림차순)
+SORT_KEYS = {
+    "order": "order",
+    "hits": "hits",
+    "matches": "matches",
+    "time": "total_ms",
+    "worst": "worst_ms",
+}
+
+REPORT_FIELDS = [
+    "order", "group", "position", "search_type", "find_what", "replace_with", "description",
+    "literal", "triggers", "always_runs", "hits", "matches", "total_ms", "worst_ms", "worst_text",
+    "dead", "duplicate_of", "shadowed_by", "hazards",
+]
+
+
+def rule_label(rule: Rule) -> str:
+    """보고서용 규칙 이름 (그룹#순번)"""
+    return f"{rule.group}#{rule.position}"
+
+
+# ────────────────────────────────────────────────────────────────
+# 1. 역추적 위험 패턴 검사
+# ────────────────────────────────────────────────────────────────
+
+_REPEATS = tuple(op for op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+                               getattr(sre_constants, "POSSESSIVE_REPEAT", None)) if op)
+
+_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: str.isdigit,
+    sre_constants.CATEGORY_NOT_DIGIT: lambda ch: not ch.isdigit(),
+    sre_constants.CATEGORY_SPACE: str.isspace,
+    sre_constants.CATEGORY_NOT_SPACE: lambda ch: not ch.isspace(),
+    sre_constants.CATEGORY_WORD: lambda ch: ch.isalnum() or ch == "_",
+    sre_constants.CATEGORY_NOT_WORD: lambda ch: not (ch.isalnum() or ch == "_"),
+}
+
+
+def _class_matches(items, ch: str) -> bool:
+    """[...] 문자 클래스가 ch 를 포함하는지"""
+    negate = False
+    found = False
+    for op, av in items:
+        if op is sre_constants.NEGATE:
+            negate = True
+        elif op is sre_constants.LITERAL:
+            found |= ch == chr(av)
+        elif op is sre_constants.RANGE:
+            found |= av[0] <= ord(ch) <= av[1]
+        elif op is sre_constants.CATEGORY:
+            found |= _CATEGORIES.get(av, lambda _: True)(ch)
+        else:
+            found = True     # 알 수 없는 항목은 겹친다고 가정
+    return found != negate
+
+
+def char_set(item) -> frozenset | None:
+    """
+    한 글자짜리 항목(리터럴/., 문자 클래스)이 매칭하는 표본 글자 집합
+    한 글자 항목이 아니면 None
+    """
+    op, av = item
+    if op is sre_constants.LITERAL:
+        return frozenset(chr(av))
+    if op is sre_constants.NOT_LITERAL:
+        return frozenset(ch for ch in PROBE_CHARS if ch != chr(av))
+    if op is sre_constants.ANY:
+        return frozenset(ch for ch in PROBE_CHARS if ch != "\n")
+    if op is sre_constants.IN:
+        return frozenset(ch for ch in PROBE_CHARS if _class_matches(av, ch))
+    return None
+
+
+def _unwrap(body) -> list:
+    """반복 대상이 그룹 하나뿐이면 그 그룹의 내용 ((...)+ → ...)"""
+    items = list(body)
+    while len(items) == 1 and items[0][0] is sre_constants.SUBPATTERN:
+        items = list(items[0][1][-1])
+    return items
+
+
+def _single_char_body(body) -> frozenset | None:
+    """반복 대상이 한 글자 항목 하나면 그 글자 집합"""
+    items = _unwrap(body)
+    return char_set(items[0]) if len(items) == 1 else None
+
+
+def _first_chars(items) -> frozenset | None:
+    """시퀀스의 첫 글자가 될 수 있는 표본 글자 집합 (알 수 없으면 None)"""
+    for item in items:
+        op, av = item
+        if op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            continue        # 폭이 0인 항목은 건너뜀
+        if op is sre_constants.SUBPATTERN:
+            return _first_chars(av[-1])
+        if op is sre_constants.BRANCH:
+            sets = [_first_chars(alt) for alt in av[1]]
+            return None if None in sets else frozenset().union(*sets)
+        if op in _REPEATS:
+            return _first_chars(av[2]) if av[0] >= 1 else None
+        return char_set(item)
+    return None
+
+
+def _has_variable_repeat(items) -> bool:
+    """시퀀스 안(중첩 포함)에 길이가 변하는 반복이 있는지"""
+    for op, av in items:
+        if op in _REPEATS:
+            if av[0] != av[1] or _has_variable_repeat(av[2]):
+                return True
+        elif op is sre_constants.SUBPATTERN:
+            if _has_variable_repeat(av[-1]):
+                return True
+        elif op is sre_constants.BRANCH:
+            if any(_has_variable_repeat(alt) for alt in av[1]):
+                return True
+    return False
+
+
+def _scan_hazards(items, found: set):
+    previous = None     # 직전 가변 반복의 (글자 집합, 무제한 여부)
+    for item in items:
+        op, av = item
+        if op in _REPEATS:
+            low, high, body = av
+            unbounded = high == sre_constants.MAXREPEAT
+            if unbounded and _has_variable_repeat(body):
+                found.add("중첩 반복")
+            if unbounded:
+                for sub_op, sub_av in _unwrap(body):
+                    if sub_op is sre_constants.BRANCH:
+                        firsts = [_first_chars(alt) for alt in sub_av[1]]
+                        known = [f for f in firsts if f]
+                        if any(a & b for i, a in enumerate(known) for b in known[i + 1:]):
+                            found.add("겹치는 대안 반복")
+
+            chars = _single_char_body(body)
+            if low != high and chars is not None:
+                if previous is not None and previous[0] & chars and (previous[1] or unbounded):
+                    found.add("연속 가변 반복 겹침")
+                previous = (chars, unbounded)
+            else:
+                previous = None
+            _scan_hazards(body, found)
+            continue
+
+        if op not in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            previous = None
+        if op is sre_constants.SUBPATTERN:
+            _scan_hazards(av[-1], found)
+        elif op is sre_constants.BRANCH:
+            for alt in av[1]:
+                _scan_hazards(alt, found)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            _scan_hazards(av[1], found)
+
+
+def backtracking_hazards(rule: Rule) -> list[str]:
+    """규칙 정규식의 역추적 위험 유형 목록 (없으면 빈 목록)"""
+    try:
+        parsed = sre_parse.parse(rule.pattern.pattern, rule.pattern.flags)
+    except Exception:
+        return []
+    found = set()
+    _scan_hazards(parsed.data, found)
+    return sorted(found)
+
+
+# ────────────────────────────────────────────────────────────────
+# 2. 중복 / 가려진 규칙
+# ────────────────────────────────────────────────────────────────
+
+def find_duplicates(rules: list[Rule]) -> dict[int, int]:
+    """{규칙 번호: 같은 검색 방식/찾을 내용을 가진 첫 앞 규칙 번호}"""
+    first = {}
+    duplicates = {}
+    for i, rule in enumerate(rules):
+        key = (rule.search_type, rule.find_what)
+        if key in first:
+            duplicates[i] = first[key]
+        else:
+            first[key] = i
+    return duplicates
+
+
+def find_shadowed(rules: list[Rule], skip=()) -> dict[int, int]:
+    """
+    {리터럴 규칙 번호: 그 문자열을 먼저 바꿔 버리는 앞 규칙 번호}
+
+    리터럴 문자열만 따로 놓고 앞 규칙을 적용해 보므로 추정입니다.
+    (앞뒤 문맥을 보는 lookaround 규칙은 실제 자막에서는 다르게 동작할 수 있음)
+    """
+    shadowed = {}
+    for i, rule in enumerate(rules):
+        if i in skip:
+            continue
+        text = rule.literal
+        if text is None:
+            continue
+        for j in range(i):
+            earlier = rules[j]
+            if earlier.triggers and not any(t in text for t in earlier.triggers):
+                continue
+            result = earlier.apply(text)
+            if result != text and text not in result:
+                shadowed[i] = j
+                break
+    return shadowed
+
+
+# ────────────────────────────────────────────────────────────────
+# 3. 말뭉치 프로파일
+# ────────────────────────────────────────────────────────────────
+
+class RuleStats:
+    """규칙 하나의 프로파일 결과"""
+
+    __slots__ = ("hits", "matches", "total", "worst", "worst_text")
+
+    def __init__(self):
+        self.hits = 0           # 텍스트를 바꾼 자막 수
+        self.matches = 0        # 바꾼 횟수 (매칭 수)
+        self.total = 0.0        # 누적 시간 (초)
+        self.worst = 0.0        # 자막 하나에서 걸린 최장 시간 (초)
+        self.worst_text = ""    # 그 자막 (규칙 적용 직전 텍스트)
+
+
+def load_corpus(paths: list[Path], pattern: str = "*.ko.srt", limit: int | None = None) -> list[str]:
+    """
+    SRT 파일/폴더에서 자막 텍스트(줄을 \\n 으로 묶은 문단)를 읽습니다.
+    폴더는 pattern 에 맞는 파일을 하위 폴더까지 찾습니다.
+    """
+    files = []
+    for path in paths:
+        files.extend(sorted(path.rglob(pattern)) if path.is_dir() else [path])
+
+    texts = []
+    for file in files:
+        for cue in read_srt(file):
+            texts.append(cue.text)
+            if limit and len(texts) >= limit:
+                return texts
+    return texts
+
+
+def profile_rules(rules: list[Rule], texts: list[str]) -> list[RuleStats]:
+    """
+    모든 자막에 규칙을 순서대로 적용하며 (체인 결과와 동일) 규칙별 적중/시간을 측정합니다.
+    """
+    stats = [RuleStats() for _ in rules]
+    clock = time.perf_counter
+    for text in texts:
+        for rule, stat in zip(rules, stats):
+            start = clock()
+            new_text, count = rule.pattern.subn(rule.repl, text)
+            elapsed = clock() - start
+            stat.total += elapsed
+            if elapsed > stat.worst:
+                stat.worst = elapsed
+                stat.worst_text = text
+            if count and new_text != text:
+                stat.hits += 1
+                stat.matches += count
+                text = new_text
+    return stats
+
+
+# ────────────────────────────────────────────────────────────────
+# 4. 보고서
+# ────────────────────────────────────────────────────────────────
+
+def build_report(chain, texts: list[str] | None = None) -> list[dict]:
+    """규칙마다 정적 분석 + (말뭉치가 있으면) 프로파일 결과를 담은 행 목록 (체인 순서)"""
+    rules = chain.rules
+    duplicates = find_duplicates(rules)
+    shadowed = find_shadowed(rules, skip=duplicates)
+    stats = profile_rules(rules, texts) if texts else None
+
+    rows = []
+    for i, rule in enumerate(rules):
+        row = {
+            "order": i + 1,
+            "group": rule.group,
+            "position": rule.position,
+            "search_type": rule.search_type,
+            "find_what": rule.find_what,
+            "replace_with": rule.replace_with,
+            "description": rule.description,
+            "literal": rule.is_literal,
+            "triggers": len(rule.triggers),
+            "always_runs": not rule.triggers,
+            "hits": None,
+            "matches": None,
+            "total_ms": None,
+            "worst_ms": None,
+            "worst_text": "",
+            "dead": None,
+            "duplicate_of": rule_label(rules[duplicates[i]]) if i in duplicates else "",
+            "shadowed_by": rule_label(rules[shadowed[i]]) if i in shadowed else "",
+            "hazards": ", ".join(backtracking_hazards(rule)),
+        }
+        if stats is not None:
+            stat = stats[i]
+            row.update(
+                hits=stat.hits,
+                matches=stat.matches,
+                total_ms=round(stat.total * 1000, 3),
+                worst_ms=round(stat.worst * 1000, 3),
+                worst_text=stat.worst_text[:80],
+                dead=stat.hits == 0,
+            )
+        rows.append(row)
+    return rows
+
+
+def sort_rows(rows: list[dict], key: str) -> list[dict]:
+    field = SORT_KEYS[key]
+    if field == "order":
+        return sorted(rows, key=lambda row: row["order"])
+    return sorted(rows, key=lambda row: (row[field] is None, -(row[field] or 0), row["order"]))
+
+
+def write_report(rows: list[dict], path: Path, summary: dict):
+    """확장자가 .json 이면 JSON, 아니면 CSV (엑셀에서 바로 열리도록 UTF-8 BOM)"""
+    if path.suffix.lower() == ".json":
+        data = {"summary": summary, "rules": rows}
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        return
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def summarize(rows: list[dict], cues: int, elapsed: float) -> dict:
+    profiled = cues > 0
+    return {
+        "rules": len(rows),
+        "cues": cues,
+        "elapsed_seconds": round(elapsed, 3),
+        "literal": sum(row["literal"] for row in rows),
+        "always_runs": sum(row["always_runs"] for row in rows),
+        "dead": sum(bool(row["dead"]) for row in rows) if profiled else None,
+        "duplicates": sum(bool(row["duplicate_of"]) for row in rows),
+        "shadowed": sum(bool(row["shadowed_by"]) for row in rows),
+        "hazards": sum(bool(row["hazards"]) for row in rows),
+        "total_ms": round(sum(row["total_ms"] for row in rows), 3) if profiled else None,
+    }
+
+
+def print_summary(rows: list[dict], summary: dict, top: int = 10):
+    print(f"\n📊 규칙 {summary['rules']:,}개 분석 ({summary['elapsed_seconds']:.1f}초)")
+    print(f"  - 순수 리터럴(str.replace 로 적용): {summary['literal']:,}개, "
+          f"트리거 없이 항상 실행: {summary['always_runs']:,}개")
+    print(f"  - 중복: {summary['duplicates']:,}개, 가려짐(추정): {summary['shadowed']:,}개, "
+          f"역추적 위험: {summary['hazards']:,}개")
+    if summary["cues"]:
+        print(f"  - 말뭉치 자막 {summary['cues']:,}개, 규칙 적용 합계 {summary['total_ms']:,.1f} ms")
+        print(f"  - 한 번도 적중하지 않은 규칙: {summary['dead']:,}개")
+        print(f"\n⏱️ 누적 시간 상위 {top}개")
+        for row in sort_rows(rows, "time")[:top]:
+            print(f"  {row['total_ms']:>9.1f} ms  최악 {row['worst_ms']:>7.3f} ms  "
+                  f"적중 {row['hits']:>6,}  {row['group']}#{row['position']}: {row['find_what'][:40]}")
+
+    hazards = [row for row in rows if row["hazards"]]
+    if hazards:
+        print("\n⚠️ 역추적 위험 규칙")
+        for row in hazards[:top]:
+            print(f"  {row['group']}#{row['position']} [{row['hazards']}]: {row['find_what'][:60]}")
+        if len(hazards) > top:
+            print(f"  ... 외 {len(hazards) - top}개")
+
+
+# ────────────────────────────────────────────────────────────────
+# 5. 명령줄 실행
+# ────────────────────────────────────────────────────────────────
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="다중 바꾸기 규칙 정적 분석 / 규칙별 적중 프로파일")
+    parser.add_argument("corpus", type=Path, nargs="*",
+                        help="프로파일에 쓸 SRT 파일 또는 폴더 (생략 시 정적 분석만)")
+    parser.add_argument("--rules", type=Path, default=DEFAULT_TEMPLATE,
+                        help="multiple_replace_groups.template 또는 change_check 폴더")
+    parser.add_argument("--glob", default="*.ko.srt",
+                        help="폴더에서 찾을 파일 패턴 (기본: *.ko.srt, 규칙 적용 대상인 번역본)")
+    parser.add_argument("--limit", type=int, default=None, help="최대 자막 수")
+    parser.add_argument("--sort", choices=sorted(SORT_KEYS), default="time",
+                        help="보고서 정렬 기준 (기본: time)")
+    parser.add_argument("--top", type=int, default=10, help="화면에 보여줄 상위 규칙 수")
+    parser.add_argument("-o", "--output", type=Path, help="보고서 파일 (.csv 또는 .json)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    chain = load_rule_chain(args.rules)
+    texts = load_corpus(args.corpus, args.glob, args.limit) if args.corpus else []
+    if args.corpus and not texts:
+        print(f"⚠️ 말뭉치에서 자막을 찾지 못했습니다. (패턴: {args.glob}) 정적 분석만 수행합니다.")
+
+    start = time.perf_counter()
+    rows = build_report(chain, texts)
+    summary = summarize(rows, len(texts), time.perf_counter() - start)
+    rows = sort_rows(rows, args.sort if texts or args.sort == "order" else "order")
+
+    print_summary(rows, summary, args.top)
+    if args.output:
+        write_report(rows, args.output, summary)
+        print(f"\n✅ 보고서 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+실행 지표 (단계별 시간 / 카운터 / 이벤트 로그 / Prometheus 텍스트 파일)
+
+pipeline 의 단계 함수가 파일마다 단계별 시간을 job.timings 에 기록하고
+(--jobs 작업자 프로세스에서도 FileJob 과 함께 메인 프로세스로 돌아옴),
+메인 프로세스의 RunMetrics 가 모아서 다음으로 내보냅니다.
+
+- 실행 끝 요약 표 : 단계별 횟수, 합계, 최대 (실행 전체), p50 / p95 (단계마다 최근 값)
+- --metrics-log   : 파일마다 한 줄씩 JSON Lines 이벤트 (단계별 시간, 자막/청구 문자/캐시 적중/실패 수)
+- --metrics-prom  : Prometheus 텍스트 파일 (node_exporter textfile collector 용, 감시 모드는 파일마다 갱신)
+
+단계 (STAGES):
+    read, parse, rest_phrases, merge, backup, write_source,  prepare_file (파일마다)
+    ja_filter
+    translate                                                translate_file (파일마다)
+    batch                                                    번역 배치 하나 (재시도/대기 포함)
+    request                                                  번역 요청 하나 (ResilientBackend 지연)
+    rules, write                                             finish_file (파일마다)
+
+사용법 (파일 하나 프로파일, 임시 복사본으로 실행하므로 원본은 그대로):
+    python run_metrics.py 입력.srt [--tracemalloc] [--top 25]
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from rate_limit import SampleWindow
+
+
+STAGES = {
+    "read": "읽기",
+    "parse": "파싱",
+    "rest_phrases": "휴식 표현 제거",
+    "merge": "1글자 병합",
+    "backup": "백업",
+    "write_source": "원본 덮어쓰기",
+    "ja_filter": "환각/반복 필터",
+    "translate": "번역 (파일)",
+    "batch": "번역 배치",
+    "request": "번역 요청",
+    "rules": "다중 바꾸기 규칙",
+    "write": ".ko.srt 저장",
+}
+
+COUNTERS = {
+    "files": "처리한 파일",
+    "errors": "오류 파일",
+    "merged_files": "병합으로 원본이 바뀐 파일",
+    "cues": "자막",
+    "filtered_cues": "환각/반복 필터로 뺀 자막",
+    "filtered_characters": "환각/반복 필터로 줄인 문자",
+    "reused_cues": "저장된 번역 재사용 자막",
+    "translated_cues": "번역한 자막",
+    "billed_characters": "청구 문자",
+    "requests": "번역 배치 요청",
+    "cache_hits": "번역 메모리 적중",
+    "cache_misses": "번역 메모리 미적중",
+    "duplicates": "중복 문장",
+    "saved_characters": "절약한 문자",
+    "failures": "번역 실패 문장",
+}
+
+PROM_PREFIX = "srt"
+
+
+@contextmanager
+def stage_timer(timings: dict, stage: str):
+    """with 블록 시간을 timings[stage] 에 더함 (같은 단계를 여러 번 지나면 합계)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+class RunMetrics:
+    """실행 하나의 지표 (여러 스레드에서 안전하게 누적)"""
+
+    def __init__(self, log_path: Path | None = None, prom_path: Path | None = None):
+        self.log_path = Path(log_path) if log_path else None
+        self.prom_path = Path(prom_path) if prom_path else None
+        self.spans = {stage: SampleWindow() for stage in STAGES}    # 단계 → 시간 (초)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.statuses = {}                              # 매니페스트 상태 → 파일 수 (건너뛴 파일 포함)
+        self.client = None                              # rate_limit.ClientMetrics (요청 지연)
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._log = open(self.log_path, "a", encoding="utf-8") if self.log_path else None
+        self.event("run_start", pid=os.getpid())
+
+    def event(self, name: str, **fields):
+        """이벤트 한 줄 기록 (--metrics-log 가 없으면 무시)"""
+        if self._log is None:
+            return
+        line = json.dumps({"event": name, "time": round(time.time(), 3), **fields}, ensure_ascii=False)
+        with self._lock:
+            self._log.write(line + "\n")
+            self._log.flush()
+
+    def record_skip(self, path: Path, status: str):
+        """처리하지 않고 건너뛴 파일 (변경 없음 등)"""
+        with self._lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.event("skip", path=str(path), status=status)
+
+    def record_job(self, job, status: str):
+        """단계를 모두 마친(또는 오류로 멈춘) 파일 하나"""
+        stats = job.stats
+        cues = len(job.hashes) or job.count
+        with self._lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            for stage, seconds in job.timings.items():
+                self.spans.setdefault(stage, SampleWindow()).add(seconds)
+            counters = self.counters
+            counters["files"] += 1
+            counters["errors"] += job.error is not None
+            counters["merged_files"] += job.merged
+            counters["cues"] += cues
+            counters["reused_cues"] += job.reused
+            counters["translated_cues"] += job.translated
+            if job.filtered is not None:
+                counters["filtered_cues"] += job.filtered.removed
+                counters["filtered_characters"] += job.filtered.saved_characters
+            if stats is not None:
+                self.spans["batch"].extend(stats.batch_times)
+                counters["billed_characters"] += stats.characters
+                counters["requests"] += stats.requests
+                counters["cache_hits"] += stats.cache_hits
+                counters["cache_misses"] += stats.cache_misses
+                counters["duplicates"] += stats.duplicates
+                counters["saved_characters"] += stats.saved_characters
+                counters["failures"] += stats.failures
+
+        fields = {"path": str(job.path), "status": status, "error": job.error,
+                  "timings": {stage: round(seconds, 6) for stage, seconds in job.timings.items()},
+                  "cues": cues, "merged": job.merged, "reused": job.reused,
+                  "translated": job.translated}
+        if job.filtered is not None:
+            fields.update(filtered_cues=job.filtered.removed,
+                          filtered_characters=job.filtered.saved_characters)
+        if stats is not None:
+            fields.update(billed_characters=stats.characters, requests=stats.requests,
+                          cache_hits=stats.cache_hits, cache_misses=stats.cache_misses,
+                          failures=stats.failures,
+                          batch_max=round(max(stats.batch_times, default=0.0), 6))
+        self.event("file", **fields)
+
+    # ── 요약 ────────────────────────────────────────────────────
+
+    def stage_rows(self) -> list[dict]:
+        """
+        단계별 요약 (기록이 있는 단계만, STAGES 순서)
+        횟수/합계/최대는 실행 전체 누적, p50/p95 는 단계마다 최근 값 기준
+        """
+        with self._lock:
+            spans = {stage: window.summary() for stage, window in self.spans.items()}
+        if self.client is not None:
+            with self.client._lock:
+                spans["request"] = self.client.latencies.summary()
+        return [{"stage": stage, **summary} for stage, summary in spans.items() if summary["count"]]
+
+    def format_table(self) -> str:
+        """실행 끝 요약 표 (시간은 ms, 합계는 초)"""
+        rows = self.stage_rows()
+        lines = [f"{'단계':<14}{'횟수':>8}{'합계(s)':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'최대(ms)':>10}"]
+        for row in rows:
+            lines.append(f"{STAGES.get(row['stage'], row['stage']):<14}{row['count']:>8,}"
+                         f"{row['total']:>10.2f}{row['p50'] * 1000:>10.1f}"
+                         f"{row['p95'] * 1000:>10.1f}{row['max'] * 1000:>10.1f}")
+        with self._lock:
+            counters = [f"{COUNTERS[name]} {value:,}" for name, value in self.counters.items() if value]
+        if counters:
+            lines.append("  " + ", ".join(counters))
+        return "\n".join(lines)
+
+    def prometheus_text(self) -> str:
+        """Prometheus 텍스트 형식 (단계 시간은 summary, 카운터는 counter)"""
+        p = PROM_PREFIX
+        out = [f"# HELP {p}_stage_seconds 처리 단계별 시간 (파일당, batch/request 는 요청당)",
+               f"# TYPE {p}_stage_seconds summary"]
+        for row in self.stage_rows():
+            label = f'stage="{row["stage"]}"'
+            for quantile in ("0.5", "0.95"):
+                value = row["p50"] if quantile == "0.5" else row["p95"]
+                out.append(f'{p}_stage_seconds{{{label},quantile="{quantile}"}} {value:.6f}')
+            out.append(f"{p}_stage_seconds_sum{{{label}}} {row['total']:.6f}")
+            out.append(f"{p}_stage_seconds_count{{{label}}} {row['count']}")
+        with self._lock:
+            counters = dict(self.counters)
+            statuses = dict(self.statuses)
+        for name, value in counters.items():
+            out.append(f"# TYPE {p}_{name}_total counter")
+            out.append(f"{p}_{name}_total {value}")
+        out.append(f"# TYPE {p}_files_by_status_total counter")
+        for status, value in sorted(statuses.items()):
+            out.append(f'{p}_files_by_status_total{{status="{status}"}} {value}')
+        if self.client is not None:
+            info = self.client.summary()
+            for name in ("retries", "throttled"):
+                out.append(f"# TYPE {p}_request_{name}_total counter")
+                out.append(f"{p}_request_{name}_total {info[name]}")
+        out.append(f"# TYPE {p}_run_start_timestamp_seconds gauge")
+        out.append(f"{p}_run_start_timestamp_seconds {self.started:.3f}")
+        out.append(f"# TYPE {p}_last_update_timestamp_seconds gauge")
+        out.append(f"{p}_last_update_timestamp_seconds {time.time():.3f}")
+        return "\n".join(out) + "\n"
+
+    def write_prometheus(self):
+        """--metrics-prom 파일 갱신 (임시 파일에 쓴 뒤 교체 → 수집기가 반쯤 쓴 파일을 읽지 않음)"""
+        if self.prom_path is None:
+            return
+        from srt_stream import atomic_open
+
+        text = self.prometheus_text()
+        with atomic_open(self.prom_path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(text)
+
+    def close(self):
+        """요약 이벤트 기록 + Prometheus 파일 갱신 후 로그 닫기"""
+        self.write_prometheus()
+        with self._lock:
+            counters = dict(self.counters)
+            statuses = dict(self.statuses)
+        self.event("run_end", elapsed=round(time.time() - self.started, 3), counters=counters,
+                   statuses=statuses,
+                   stages={row["stage"]: {key: round(value, 6) if isinstance(value, float) else value
+                                          for key, value in row.items() if key != "stage"}
+                           for row in self.stage_rows()})
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+
+# ────────────────────────────────────────────────────────────────
+# 파일 하나 프로파일 (cProfile / tracemalloc)
+# ────────────────────────────────────────────────────────────────
+
+def profile_file(path: Path, use_tracemalloc: bool = False, top: int = 25):
+    """
+    파일 하나를 임시 폴더에 복사해 병합 → 가짜 번역 → 규칙 적용/저장을 cProfile 로 실행합니다.
+    (규칙 체인 로드/컴파일은 측정에서 제외, 번역은 네트워크 없는 FakeBackend)
+    """
+    import cProfile
+    import pstats
+    import shutil
+    import tempfile
+    import tracemalloc
+
+    import pipeline
+    from translation import FakeBackend
+
+    rule_chain = pipeline.process_rule_chain()
+    if rule_chain is not None:
+        rule_chain.compile()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = Path(tmp) / path.name
+        shutil.copy2(path, copy)
+        job = pipeline.FileJob(copy, copy.with_stem(copy.stem + ".ko"), "new", True)
+
+        if use_tracemalloc:
+            tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        job = pipeline.prepare_file(job)
+        job = pipeline.translate_file(job, FakeBackend(), {})
+        job = pipeline.finish_file(job, rule_chain)
+        profiler.disable()
+        if use_tracemalloc:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    if job.error:
+        print(f"오류: {job.error}")
+    print(f"파일: {path} (자막 {job.count:,}개, cProfile 실행 중이라 실제보다 느림)")
+    for stage, seconds in job.timings.items():
+        print(f"  {STAGES.get(stage, stage):<14}{seconds * 1000:>10.1f} ms")
+    print()
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
+
+    if use_tracemalloc:
+        print(f"tracemalloc: 최대 {peak / 1024 / 1024:.1f} MB, 종료 시 {current / 1024 / 1024:.1f} MB")
+        for stat in snapshot.statistics("lineno")[:top]:
+            print(f"  {stat}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SRT 파일 하나 처리 프로파일 (cProfile / tracemalloc)")
+    parser.add_argument("input", type=Path, help="프로파일할 .srt (임시 복사본으로 실행)")
+    parser.add_argument("--tracemalloc", action="store_true", help="메모리 할당 위치/최대 사용량도 측정")
+    parser.add_argument("--top", type=int, default=25, help="출력할 함수/할당 위치 수")
+    args = parser.parse_args()
+    profile_file(args.input, args.tracemalloc, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,137 @@
-import re
 import sys
-import shutil
+import time
+import argparse
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-import deepl
-from dotenv import load_dotenv
 import os
 
+from backup_store import BACKUP_DIR_NAME
+from hallucination_filter import process_filter
+from manifest import (
+    LEGACY_OUTPUT,
+    MANIFEST_NAME,
+    NEW,
+    OUTPUT_CHANGED,
+    SETTINGS_CHANGED,
+    STATUS_LABELS,
+    UNCHANGED,
+    FilePlan,
+    Manifest,
+)
+from output_profiles import PROFILES, is_output_stem, parse_profiles
+from pipeline import (
+    FileJob,
+    finish_file,
+    load_texts,
+    merge_file,
+    prepare_file,
+    run_pipeline,
+    translate_file,
+    process_profile_chain,
+    process_rule_chain,
+)
+from quota_planner import (
+    ORDER_PATH,
+    ORDERS,
+    STATE_NAME,
+    QuotaBudget,
+    clear_state,
+    fetch_remaining,
+    load_state,
+    pack_plans,
+    save_state,
+)
+from rate_limit import DEFAULT_MAX_RETRIES, ResilientBackend, RetryPolicy
+from rule_engine import DEFAULT_TEMPLATE
+from run_metrics import RunMetrics
+from srt_stream import REST_PHRASE_RE, merge_stages, parse_srt_string, srt_to_string
+from translation import (
+    BACKENDS,
+    DEFAULT_BATCH_CHARS,
+    DEFAULT_BATCH_ITEMS,
+    DEFAULT_WORKERS,
+    LazyBackend,
+    TranslationError,
+    estimate_texts,
+    translate_texts,
+)
+from translation_memory import DEFAULT_MEMORY_PATH, TranslationMemory, params_key
+from watch_folder import (
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_SETTLE,
+    PRIORITIES,
+    PRIORITY_SMALLEST,
+    QUEUE_NAME,
+    STATUS_NAME,
+    WatchDaemon,
+)
+
 
 # ────────────────────────────────────────────────────────────────
-# 1. 환경 설정 및 DeepL 초기화
+# 1. 환경 설정 및 번역 백엔드 (처음 번역할 때 초기화)
 # ────────────────────────────────────────────────────────────────
 
-# .env 파일에서 환경변수 로드
-# 프로젝트 루트에 .env 파일이 있어야 함 (gitignore 필수!)
-load_dotenv()
+# import 만으로는 .env 를 읽거나 DeepL 을 만들지 않음
+# → 병합/정리 함수는 다른 도구에서 그대로 불러 쓸 수 있고, --no-translate 나
+#   번역할 자막이 없는 실행은 API 키 없이도 동작
 
-# DeepL API 키 가져오기
-DEEPL_API_KEY = os.getenv("DEEPL_API_KEY")
+DEFAULT_BACKEND = "deepl"
 
-# API 키가 없으면 즉시 종료 (보안 및 오류 방지)
-if not DEEPL_API_KEY:
-    print("오류: .env 파일에 DEEPL_API_KEY가 설정되어 있지 않습니다.")
-    print("예시 .env 내용:")
-    print('DEEPL_API_KEY=xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx:fx')
-    sys.exit(1)
 
-# DeepL 번역기 객체 생성
-try:
-    # 기본은 유료 API (api.deepl.com)
-    translator = deepl.Translator(DEEPL_API_KEY)
-    
-    # 무료 계정(api-free.deepl.com) 사용하는 경우 아래 주석 해제
-    translator = deepl.Translator(DEEPL_API_KEY, server_url="https://api-free.deepl.com")
-    
-    print("DeepL 초기화 성공")
-except Exception as e:
-    print(f"DeepL 초기화 실패: {e}")
-    sys.exit(1)
+def deepl_settings() -> dict:
+    """
+    .env 에서 DeepL 설정을 읽어 DeepLBackend 인자로 반환 (DeepL 을 처음 쓸 때 한 번 호출)
+    프로젝트 루트에 .env 파일이 있어야 함 (gitignore 필수!)
+    """
+    from dotenv import load_dotenv  # DeepL 을 쓸 때만 필요
+
+    load_dotenv()
+
+    # API 키가 없으면 번역하지 않음 (보안 및 오류 방지)
+    api_key = os.getenv("DEEPL_API_KEY")
+    if not api_key:
+        raise TranslationError(".env 파일에 DEEPL_API_KEY가 설정되어 있지 않습니다. "
+                               "(예시 .env 내용: DEEPL_API_KEY=xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx:fx)")
+
+    # DeepL 서버 주소 (테스트 시 가짜 서버 주소로 바꿀 수 있음, 예: http://127.0.0.1:8000)
+    # 지정하지 않으면 deepl 이 키로 판단 (:fx 로 끝나면 무료 api-free.deepl.com, 아니면 유료 api.deepl.com)
+    # (deepl 내부 재시도는 끄고 ResilientBackend 가 재시도/속도 제한을 담당)
+    return dict(api_key=api_key, server_url=os.getenv("DEEPL_SERVER_URL"), network_retries=0)
+
+
+def make_client(name: str = DEFAULT_BACKEND, rate: float | None = None,
+                max_concurrency: int = DEFAULT_WORKERS,
+                max_retries: int = DEFAULT_MAX_RETRIES) -> ResilientBackend:
+    """
+    번역 요청 클라이언트 (속도 제한 + 재시도 + 동시 요청 수 자동 조절)
+    실제 백엔드(name: deepl, cache, stub)는 처음 번역/사용량 조회할 때 생성
+    """
+    configure = deepl_settings if name == "deepl" else None
+    return ResilientBackend(LazyBackend(name, configure), rate=rate,
+                            max_concurrency=max_concurrency, retry=RetryPolicy(max_retries))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> ResilientBackend:
+    """현재 번역 클라이언트 (없으면 기본 DeepL 클라이언트, 만드는 것만으로는 초기화하지 않음)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = make_client()
+        return _client
+
+
+def set_client(client: ResilientBackend):
+    """번역 클라이언트 교체 (main() 이 --backend 등 명령줄 설정으로 만든 클라이언트)"""
+    global _client
+    with _client_lock:
+        _client = client
 
 
 # ────────────────────────────────────────────────────────────────
@@ -59,38 +154,22 @@ def translate_ja_to_ko(text: str) -> str:
     
     Returns:
         str: 번역된 한국어 텍스트
-             실패 시 "[번역 실패] 원문" 형식으로 반환
+             재시도를 모두 써도 실패하면 "[번역 실패] 원문" 형식으로 반환
     """
-    # 빈 문자열이면 그대로 반환 (불필요한 API 호출 방지)
-    if not text.strip():
-        return text
-
-    try:
-        result = translator.translate_text(
-            text,                        # 번역 대상 텍스트
-            source_lang="JA",            # 원본 언어: 일본어 고정
-            target_lang="KO",            # 목표 언어: 한국어
-            formality="prefer_less",     # 반말·캐주얼 톤 강하게 유도 (default보다 덜 격식)
-            model_type="quality_optimized",  # 최신 고품질 모델 강제 (응답은 느릴 수 있음)
-            context=(
-                "일본 AV 자막 번역입니다. "
-                "기본적으로 캐주얼한 반말을 사용하지만, 존댓말을 사용할 때는 -요 체의 부드러운 존댓말을 자연스럽게 섞어주세요. "
-                "♡ 같은 이모티콘을 분위기에 맞춰 적절히 추가하여 분위기를 살려주세요."
-            ),                           # 번역 품질 향상을 위한 맥락 지시 (청구 비용 없음)
-            preserve_formatting=True,    # 숫자, 공백, 기호(!?…, ♡ 등) 형식 유지
-            split_sentences="1",         # 구두점 + 줄바꿈 기준으로 문장 분할 (자막에 적합)
-        )
-        return result.text.strip()       # 앞뒤 공백 제거 후 반환
-    except deepl.DeepLException as e:
-        # API 오류 발생 시 콘솔에 로그 남기고 원문에 실패 표시 붙여 반환
-        print(f"번역 오류 발생: {e}")
-        return f"[번역 실패] {text}"
+    # 번역 옵션은 translation.TRANSLATE_OPTIONS 참고
+    # 빈 문자열은 API 호출 없이 그대로, 일시 오류(429/5xx)는 클라이언트가 재시도
+    return translate_texts([text], get_client())[0]
 
 
 # ────────────────────────────────────────────────────────────────
 # 3. SRT 파일 목록 가져오기
 # ────────────────────────────────────────────────────────────────
 
+def is_source_srt(path: Path) -> bool:
+    """처리 대상 .srt 인지 (이미 번역된 .ko.srt / .ko.polite.srt 등은 제외)"""
+    return path.suffix == ".srt" and not is_output_stem(path.stem)
+
+
 def get_srt_files(folder_path: Path) -> list[Path]:
     """
     지정한 폴더(및 하위 폴더)에서 .srt 파일을 모두 찾아 반환합니다.
@@ -99,10 +178,7 @@ def get_srt_files(folder_path: Path) -> list[Path]:
     Returns:
         list[Path]: 처리 대상 .srt 파일 경로 리스트
     """
-    return [
-        p for p in folder_path.rglob("*.srt")           # 재귀적으로 모든 .srt 찾기
-        if p.suffix == ".srt" and not p.stem.endswith(".ko")  # .ko.srt 제외
-    ]
+    return [p for p in folder_path.rglob("*.srt") if is_source_srt(p)]  # 재귀적으로 모든 .srt 찾기
 
 
 # ────────────────────────────────────────────────────────────────
@@ -112,13 +188,11 @@ def get_srt_files(folder_path: Path) -> list[Path]:
 def remove_little_rest_phrases(line: str) -> str:
     """
     일본어 자막에서 자주 나오는 '少し休...' 같은 휴식 표현을 제거합니다.
-    정규표현식으로 패턴 매칭 후 삭제.
+    정규표현식으로 패턴 매칭 후 삭제. (패턴은 srt_stream.REST_PHRASE_RE)
     
     예: "少し休憩…" → ""
     """
-    # 패턴 설명: (공백)? 少(공백)? し(공백)? 休 + 비구두점 문자들 + 구두점 1개 이상
-    pattern = r'(\s)?少(\s)?し(\s)?休[^\.。\,\?]{1,}[\.。\,\?]{1,}'
-    return re.sub(pattern, '', line)
+    return REST_PHRASE_RE.sub('', line)
 
 
 # ────────────────────────────────────────────────────────────────
@@ -130,271 +204,756 @@ def merge_single_char_captions(srt_content: str) -> str:
     SRT 내용에서 '공백 제외 정확히 1글자'인 자막 블록을 다음 블록과 병합합니다.
     → 자막 타이밍이 너무 짧거나 1글자씩 끊겨 나오는 문제를 해결
     
-    처리 흐름:
-    1. SRT를 블록 단위(번호 + 시간 + 텍스트)로 분리
-    2. 각 블록의 텍스트에서 모든 공백 제거 후 길이가 1인지 확인
-    3. 1글자라면 다음 블록 텍스트를 붙이고 시간은 첫 시작~두 번째 끝으로 확장
+    처리 흐름 (srt_stream 의 스트리밍 단계 사용):
+    1. SRT를 Cue(번호 + 시작/종료 ms + 텍스트 줄) 단위로 파싱
+    2. 휴식 표현 제거 후 텍스트가 남지 않은 자막은 삭제
+    3. 공백 제외 1글자라면 다음 자막 텍스트를 붙이고 시간은 첫 시작~두 번째 끝으로 확장
     4. 최종적으로 번호를 1부터 다시 매김
     
     Returns:
         str: 병합 완료된 새로운 SRT 문자열
     """
-    lines = srt_content.strip().splitlines()
-    blocks = []               # SRT 블록 리스트 (번호, 시간, 텍스트들)
-    current_block = []        # 현재 처리 중인 블록
-
-    # 1. 블록 단위로 분리
-    for line in lines:
-        stripped = line.strip()
-        if not stripped:      # 빈 줄 → 블록 종료
-            if current_block:
-                blocks.append(current_block)
-                current_block = []
-            continue
-        current_block.append(line)  # 원본 줄 그대로 저장 (들여쓰기 유지)
-
-    if current_block:
-        blocks.append(current_block)
-
-    merged = []               # 병합 결과 블록 저장
-    i = 0
-
-    while i < len(blocks):
-        block = blocks[i]
-        
-        # 비정상 블록(3줄 미만: 번호+시간+텍스트 최소 구성 안 됨)은 그대로 유지
-        if len(block) < 3:
-            merged.append(block)
-            i += 1
-            continue
-
-        num = block[0]              # 자막 번호 (문자열)
-        time_line = block[1]        # 시간줄 ex) 00:01:23,450 --> 00:01:24,120
-        text_parts = block[2:]      # 텍스트 부분 (1줄 이상 가능)
-
-        # 휴식 표현 제거 적용
-        for j in range(2, len(block)):
-            block[j] = remove_little_rest_phrases(block[j])
-
-        # 텍스트 합쳐서 공백 제거 후 길이 체크 (일본어는 띄어쓰기 거의 없음)
-        text = ' '.join(text_parts).strip()
-        text_clean = re.sub(r'\s+', '', text)  # 모든 공백 제거
-
-        # 병합 조건: 현재가 1글자이고 다음 블록 존재
-        if i + 1 < len(blocks) and len(text_clean) == 1:
-            next_block = blocks[i + 1]
-            if len(next_block) < 3:
-                merged.append(block)
-                i += 1
-                continue
-
-            # 다음 블록 정보 추출
-            next_time_line = next_block[1]
-            next_text_parts = next_block[2:]
-            next_text = ' '.join(next_text_parts).strip()
-
-            # 새 시간 범위: 현재 시작 ~ 다음 종료
-            start_str = time_line.split('-->')[0].strip()
-            next_end_str = next_time_line.split('-->')[1].strip()
-            new_time_line = f"{start_str} --> {next_end_str}"
-
-            # 텍스트 단순 연결 (일본어는 띄어쓰기 없이 자연스럽게 붙음)
-            combined_text = text + next_text
-
-            merged.append([num, new_time_line, combined_text])
-            i += 2  # 다음 블록까지 처리했으므로 2칸 이동
-        else:
-            merged.append(block)
-            i += 1
+    return srt_to_string(merge_stages(parse_srt_string(srt_content)))
+
+
+def merge_files(files: list[Path], cpu_pool=None, backup_dir: Path | None = None,
+                metrics: RunMetrics | None = None) -> int:
+    """
+    번역 없이 병합/정리 단계만 실행합니다. (--no-translate)
+    파일마다 휴식 표현 제거 + 1글자 병합 → 바뀐 파일만 백업 후 원본 덮어쓰기
+    (번역/규칙 적용/.ko.srt 저장/매니페스트 기록 없음, DeepL 초기화도 하지 않음)
+    cpu_pool(프로세스 풀)이 주어지면 여러 코어에서 나눠 실행
+    backup_dir: 백업 저장소 폴더 (기본: 파일 옆 .srt_backups)
+    metrics: 단계별 시간/카운터를 모을 RunMetrics
+
+    Returns:
+        int: 원본이 바뀐 파일 수
+    """
+    jobs = [FileJob(f, output_path_for(f), NEW, new_file=False, backup_dir=backup_dir, ja_filter=False)
+            for f in files]
+    if cpu_pool is not None:
+        results = cpu_pool.map(merge_file, jobs, chunksize=max(1, len(jobs) // 64))
+    else:
+        results = map(merge_file, jobs)
 
-    # ── 최종 SRT 재구성 ──────────────────────────────────────────
-    result_lines = []
-    new_index = 1
+    merged = 0
+    for job in results:
+        print(f"처리 중: {job.path}")
+        for message in job.messages:
+            print(f"  → {message}")
+        if job.error:
+            print(f"  !!! 오류 발생: {job.error}")
+        if metrics is not None:
+            metrics.record_job(job, NEW)
+        merged += job.merged
+    return merged
 
-    for block in merged:
-        if len(block) < 3:
-            continue
 
-        result_lines.append(str(new_index))     # 새 번호
-        result_lines.append(block[1])           # 시간줄
-        result_lines.append(block[2])           # 병합된 텍스트 (또는 원본)
+# ────────────────────────────────────────────────────────────────
+# 6. 다중 바꾸기 규칙 체인 (multiple_replace_groups.template)
+# ────────────────────────────────────────────────────────────────
 
-        # 원본이 여러 줄 텍스트였다면 추가 줄도 그대로 붙임
-        if len(block) > 3:
-            for extra in block[3:]:
-                result_lines.append(extra)
+_rule_chain_reported = False
+_rule_chain_lock = threading.Lock()
 
-        result_lines.append("")                 # SRT 블록 간 빈 줄
-        new_index += 1
 
-    # 마지막 불필요 개행 제거 후 파일 끝에 개행 하나 추가 (SRT 관례)
-    return "\n".join(result_lines).rstrip() + "\n"
+def get_rule_chain():
+    """
+    번역 결과에 적용할 규칙 체인을 반환합니다. (최초 1회만 로드/컴파일)
+    템플릿 파일이 없으면 None → 규칙 적용 단계를 건너뜀
+    (pipeline 의 프로세스별 체인을 함께 사용 → --jobs 작업자도 다시 컴파일하지 않음)
+    """
+    global _rule_chain_reported
+    rule_chain = process_rule_chain(DEFAULT_TEMPLATE)
+    with _rule_chain_lock:
+        if rule_chain is not None and not _rule_chain_reported:
+            _rule_chain_reported = True
+            print(f"다중 바꾸기 규칙 로드: {len(rule_chain)}개")
+    return rule_chain
 
 
 # ────────────────────────────────────────────────────────────────
-# 6. 단일 SRT 파일 처리 (병합 → 번역 → .ko.srt 저장)
+# 7. 단일 SRT 파일 처리 (병합 → 번역 → .ko.srt 저장)
 # ────────────────────────────────────────────────────────────────
 
-def process_srt_file(filepath: Path):
+def current_hashes(ja_filter: bool = True, profiles: tuple = ()) -> tuple[str, str]:
+    """
+    (규칙 체인 지문, 번역 설정 해시) - 매니페스트 비교용
+    환각/반복 필터를 쓰면 필터 지문도 규칙 지문에 포함 (필터를 켜고 끄면 규칙 변경으로 다시 처리)
+    출력 프로파일을 쓰면 규칙 체인 대신 프로파일 조합의 지문 (프로파일을 바꿔도 번역은 재사용)
+    """
+    rule_chain = get_rule_chain()
+    rules_hash = rule_chain.fingerprint if rule_chain is not None else ""
+    if profiles and rule_chain is not None:
+        rules_hash = process_profile_chain(profiles).fingerprint
+    if ja_filter:
+        rules_hash += "+" + process_filter().fingerprint
+    return rules_hash, params_key(get_client().options)
+
+
+def output_paths_for(filepath: Path, profiles: tuple = ()) -> list[Path]:
+    """원본 .srt 에 대응하는 출력 경로 (프로파일이 없으면 .ko.srt 하나, 첫 번째가 매니페스트 기준)"""
+    return [PROFILES[name].output_path(filepath) for name in profiles or ("default",)]
+
+
+def output_path_for(filepath: Path, profiles: tuple = ()) -> Path:
+    """원본 .srt 에 대응하는 .ko.srt 경로 (프로파일이 있으면 첫 번째 프로파일의 출력)"""
+    return output_paths_for(filepath, profiles)[0]
+
+
+def file_status(filepath: Path, output_path: Path, manifest, rules_hash: str,
+                settings_hash: str, extra_outputs: list[Path] = ()) -> str:
+    """
+    매니페스트로 파일 상태 판정 (manifest 상태 상수 반환)
+    매니페스트가 없으면 기존처럼 .ko.srt 존재 여부로만 판단
+    extra_outputs: 두 번째 이후 프로파일의 출력 (매니페스트는 첫 번째 출력만 기록하므로 없어졌는지만 확인)
+    """
+    if manifest is None:
+        return LEGACY_OUTPUT if output_path.exists() else NEW
+
+    status = manifest.quick_status(filepath, output_path, rules_hash, settings_hash)
+    if status is None:
+        # 크기/수정 시각이 달라졌을 때만 내용 해시 계산
+        status = manifest.content_status(filepath, output_path, rules_hash)
+        if status == UNCHANGED:
+            manifest.touch(filepath)
+    if status == UNCHANGED and not all(path.exists() for path in extra_outputs):
+        status = OUTPUT_CHANGED
+    return status
+
+
+def status_for(filepath: Path, manifest, rules_hash: str, settings_hash: str,
+               profiles: tuple = ()) -> str:
+    """파일 상태 판정 (출력 프로파일의 모든 출력 경로 기준)"""
+    outputs = output_paths_for(filepath, profiles)
+    return file_status(filepath, outputs[0], manifest, rules_hash, settings_hash, outputs[1:])
+
+
+def stored_translations(filepath: Path, status: str, manifest=None) -> dict:
+    """저장된 번역 {자막 해시: 번역} (처음 처리하거나 번역 설정이 바뀌었으면 전부 다시 번역)"""
+    if manifest is None or status in (NEW, SETTINGS_CHANGED):
+        return {}
+    return manifest.cue_translations(filepath)
+
+
+def plan_files(files: list[Path], manifest=None, memory=None,
+               batch_chars: int = DEFAULT_BATCH_CHARS,
+               batch_items: int = DEFAULT_BATCH_ITEMS, cpu_pool=None,
+               ja_filter: bool = True, profiles: tuple = ()) -> list[FilePlan]:
+    """
+    파일마다 상태와 예상 청구 문자/요청 수를 계산합니다. (쓰기/번역 없음)
+    병합 → 환각/반복 필터 → 매니페스트 재사용 → 번역 메모리/중복 제거를 모두 반영한 값
+    cpu_pool(프로세스 풀)이 주어지면 파일 읽기/병합을 여러 코어에서 나눠 실행
+    """
+    rules_hash, settings_hash = current_hashes(ja_filter, profiles)
+    plans = [FilePlan(status_for(f, manifest, rules_hash, settings_hash, profiles), f) for f in files]
+    work = [plan for plan in plans if plan.needs_work]
+
+    paths = [plan.path for plan in work]
+    load = partial(load_texts, ja_filter=ja_filter)
+    if cpu_pool is not None:
+        loaded = cpu_pool.map(load, paths, chunksize=max(1, len(paths) // 64))
+    else:
+        loaded = map(load, paths)
+
+    for plan, items in zip(work, loaded):
+        stored = stored_translations(plan.path, plan.status, manifest)
+        pending = [text for h, text in items if h not in stored]
+        plan.cues = len(items)
+        plan.reused = len(items) - len(pending)
+        plan.translate = len(pending)
+        plan.characters = sum(len(text) for text in pending)
+        plan.billable, plan.requests = estimate_texts(pending, batch_chars, batch_items, memory)
+    return plans
+
+
+def plan_srt_file(filepath: Path, manifest=None, memory=None,
+                  batch_chars: int = DEFAULT_BATCH_CHARS,
+                  batch_items: int = DEFAULT_BATCH_ITEMS) -> FilePlan:
+    """파일 하나의 실행 계획 (plan_files 참고)"""
+    return plan_files([filepath], manifest, memory, batch_chars, batch_items)[0]
+
+
+def make_job(plan: FilePlan, backup_dir: Path | None = None, ja_filter: bool = True,
+             profiles: tuple = ()) -> FileJob:
+    """실행 계획 → 파이프라인 작업"""
+    return FileJob(plan.path, output_path_for(plan.path, profiles), plan.status, plan.status == NEW,
+                   backup_dir, ja_filter, profiles)
+
+
+def report_job(job: FileJob, plan: FilePlan, manifest=None, memory=None, elapsed=None,
+               metrics: RunMetrics | None = None):
+    """
+    단계를 모두 마친 작업의 결과 출력 + 매니페스트/지표 기록 (메인 프로세스에서 호출)
+    """
+    if metrics is not None:
+        metrics.record_job(job, plan.status)
+    for message in job.messages:
+        print(f"  → {message}")
+    if job.error:
+        print(f"  !!! 오류 발생: {job.error}")
+        if job.backup:
+            print(f"  (참고: 원본은 백업되었습니다 - {job.backup[:12]}, "
+                  f"복원: python backup_store.py restore \"{job.path}\")")
+        return
+
+    stats = job.stats
+    plan.cues = len(job.hashes)
+    plan.reused = job.reused
+    plan.translate = job.translated
+    plan.sent_characters = stats.characters
+    plan.sent_requests = stats.requests
+
+    if manifest is not None:
+        rules_hash, settings_hash = current_hashes(job.ja_filter, job.profiles)
+        manifest.update(job.path, job.output_path, rules_hash, settings_hash, job.translations)
+
+    took = f", {elapsed:.1f}초" if elapsed is not None else ""
+    print(f"  → 번역 완료: {plan.cues}개 블록 (재사용 {plan.reused}개, 번역 {plan.translate}개){took}")
+    print(f"  → 청구: 예상 {plan.billable:,}자 / {plan.requests}회, "
+          f"실제 {plan.sent_characters:,}자 / {plan.sent_requests}회")
+    if memory is not None and plan.translate:
+        print(f"  → 번역 메모리: 적중 {stats.cache_hits} / 미적중 {stats.cache_misses} "
+              f"(중복 {stats.duplicates}, 절약 {stats.saved_characters:,}자)")
+    if get_rule_chain() is not None:
+        print(f"  → 다중 바꾸기 규칙 적용 완료")
+    for path, count in job.outputs:
+        print(f"  → 한국어 자막 저장 완료: {path.name} ({count}개 자막)")
+
+
+def process_srt_file(filepath: Path, executor=None,
+                     batch_chars: int = DEFAULT_BATCH_CHARS,
+                     batch_items: int = DEFAULT_BATCH_ITEMS,
+                     memory=None, manifest=None, plan: FilePlan | None = None,
+                     backend=None, backup_dir: Path | None = None,
+                     metrics: RunMetrics | None = None, ja_filter: bool = True,
+                     profiles: tuple = ()):
     """
     하나의 .srt 파일을 처리하는 메인 함수
     
-    처리 순서:
-    1. 백업 파일(.bak) 생성
+    처리 순서: (pipeline 모듈의 단계 함수를 차례로 호출, --jobs 모드와 결과 동일)
+    1. 원본을 백업 저장소(.srt_backups, 같은 내용은 한 번만 압축 저장)에 백업
     2. 1글자 자막 병합 → 원본 덮어쓰기 (변경 시에만)
-    3. 병합된 내용에서 자막 텍스트 블록 단위로 번역
-    4. 번역 결과 → .ko.srt 파일로 저장 (원본은 그대로 유지)
+    3. 일본어 환각/반복 자막 필터 (ja_filter, 번역할 자막에서만 빼고 원본에는 쓰지 않음)
+    4. 병합된 내용의 자막 텍스트 블록을 모아 배치 단위로 번역
+       (executor 가 주어지면 여러 파일이 같은 스레드 풀로 동시 요청 수를 공유,
+        memory 가 주어지면 번역 메모리에 있는 문장은 API 호출 없이 재사용)
+    5. 다중 바꾸기 규칙 적용 (Subtitle Edit 템플릿과 동일)
+    6. 결과 → .ko.srt 파일로 저장 (원본은 그대로 유지)
+       (profiles 가 있으면 공통 규칙은 한 번만 적용하고 프로파일마다 .ko.polite.srt 등으로 저장)
+    (원본/.ko.srt 는 임시 파일에 쓴 뒤 교체 → 중간에 끊겨도 반쯤 쓴 파일이 남지 않음)
+    
+    manifest 가 주어지면 증분 처리:
+    - 원본/규칙/번역 설정/출력이 모두 그대로면 스킵
+    - 규칙만 바뀌었으면 저장된 번역에 규칙만 다시 적용 (번역 요청 없음)
+    - 원본 자막 일부가 바뀌었으면 바뀐 자막만 번역
+    manifest 가 없으면 이미 .ko.srt가 존재할 때 스킵
+    
+    DeepL 한도 확인은 main() 의 실행 계획에서 한 번만 합니다.
+    
+    Args:
+        plan: plan_srt_file() 결과 (있으면 상태 판정을 다시 하지 않고 예상치를 함께 출력)
+        backend: 번역 백엔드 (기본: get_client(), 재시도/속도 제한 적용)
+        backup_dir: 백업 저장소 폴더 (기본: 파일 옆 .srt_backups)
+        metrics: 단계별 시간/카운터를 모을 RunMetrics
+        ja_filter: 번역 전 일본어 환각/반복 필터 사용 여부
+        profiles: 출력 프로파일 이름 (output_profiles.PROFILES, 비어 있으면 .ko.srt 하나)
     
-    이미 .ko.srt가 존재하면 스킵
+    Returns:
+        FilePlan: 파일 상태, 재사용/번역한 자막 수, 예상/실제 청구량
     """
     print(f"처리 중: {filepath}")
 
-    backup_path = filepath.with_suffix(filepath.suffix + '.bak')
-    output_path = filepath.with_stem(filepath.stem + ".ko").with_suffix(".srt")
+    if plan is None:
+        rules_hash, settings_hash = current_hashes(ja_filter, profiles)
+        plan = FilePlan(status_for(filepath, manifest, rules_hash, settings_hash, profiles), filepath)
 
     # 이미 번역본이 있으면 스킵 (중복 처리 방지)
-    if output_path.exists():
-        print(f"  → 이미 {output_path.name} 파일이 존재합니다. 스킵.")
-        return
-    
-    # DeepL API 한도 확인
-    usage = translator.get_usage()
-
-    if usage.any_limit_reached:
-        print("\n!!! DeepL API 한도 초과 !!!")
-        print("이번 달 번역 한도를 모두 사용했습니다.")
-        sys.exit(1)
-
-    # DeepL API 잔여량 확인
-    if usage.character.valid:
-        used = usage.character.count
-        limit = usage.character.limit
-        remaining = limit - used
-
-        print(f"  현재 사용: {used:,} / {limit:,} 자  (남음: {remaining:,} 자)")
-    else:
-        print("  경고: character 사용량 정보가 유효하지 않습니다.")
-        print("  → 무료 플랜이 아닌 경우일 수 있으니 한도 체크 없이 진행합니다.")
+    if plan.status in (LEGACY_OUTPUT, UNCHANGED) and metrics is not None:
+        metrics.record_skip(filepath, plan.status)
+    if plan.status == LEGACY_OUTPUT:
+        print(f"  → 이미 {output_path_for(filepath, profiles).name} 파일이 존재합니다. 스킵.")
+        return plan
+    if plan.status == UNCHANGED:
+        print(f"  → 변경 사항 없음. 스킵.")
+        return plan
+    print(f"  → 상태: {STATUS_LABELS[plan.status]}")
 
     #작업시작
-    try:
-        # 1. 원본 백업 (메타데이터까지 복사)
-        shutil.copy2(filepath, backup_path)
-        print(f"  → 백업 생성: {backup_path.name}")
+    start = time.perf_counter()
+    job = prepare_file(make_job(plan, backup_dir, ja_filter, profiles))
+    job = translate_file(job, backend or get_client(), stored_translations(filepath, plan.status, manifest),
+                         executor=executor, max_chars=batch_chars, max_items=batch_items,
+                         memory=memory)
+    job = finish_file(job, get_rule_chain())
+    report_job(job, plan, manifest, memory, time.perf_counter() - start, metrics)
+    return plan
+
+
+def run_pipelined(plans, cpu_pool, jobs: int, budget, executor=None,
+                  batch_chars: int = DEFAULT_BATCH_CHARS,
+                  batch_items: int = DEFAULT_BATCH_ITEMS,
+                  memory=None, manifest=None, backend=None, backup_dir: Path | None = None,
+                  metrics: RunMetrics | None = None, ja_filter: bool = True,
+                  profiles: tuple = ()):
+    """
+    여러 파일을 파이프라인으로 처리합니다. (결과 파일은 process_srt_file 과 같음)
+    
+    - 읽기/병합, 규칙 적용/저장: 프로세스 풀 (cpu_pool, jobs 개 코어)
+    - 번역: 스레드 풀 (jobs 개 파일이 동시에 번역 단계에 있을 수 있음,
+            실제 요청 수는 executor 와 backend 의 동시 요청 수 제한을 따름)
+    - 동시에 진행 중인 파일은 최대 jobs * 2 개, 결과 출력은 입력 순서대로
+    """
+    backend = backend or get_client()
+    by_path = {}
+
+    def jobs_from(plans):
+        for plan in plans:
+            by_path[plan.path] = plan
+            yield make_job(plan, backup_dir, ja_filter, profiles)
+
+    def translate(job):
+        stored = stored_translations(job.path, job.status, manifest)
+        return translate_file(job, backend, stored, executor=executor, max_chars=batch_chars,
+                              max_items=batch_items, memory=memory)
+
+    with ThreadPoolExecutor(max_workers=jobs) as io_pool:
+        stages = [(cpu_pool, prepare_file), (io_pool, translate), (cpu_pool, finish_file)]
+        for job in run_pipeline(jobs_from(plans), stages, window=jobs * 2):
+            plan = by_path.pop(job.path)
+            print(f"처리 중: {job.path}")
+            print(f"  → 상태: {STATUS_LABELS[plan.status]}")
+            report_job(job, plan, manifest, memory, metrics=metrics)
+            budget.settle(plan.billable, plan.sent_characters)
+            print()  # 파일 간 구분용 빈 줄
 
-        # 2. 원본 내용 읽기 (BOM付き UTF-8도 처리)
-        original_content = filepath.read_text(encoding="utf-8-sig")
 
-        # 3. 1글자 자막 병합 수행
-        merged_content = merge_single_char_captions(original_content)
+# ────────────────────────────────────────────────────────────────
+# 8. 실행 계획 (DeepL 문자 한도에 맞춰 파일 선택)
+# ────────────────────────────────────────────────────────────────
 
-        # 병합으로 변경이 있었다면 원본 파일 덮어쓰기
-        if merged_content.strip() != original_content.strip():
-            filepath.write_text(merged_content, encoding="utf-8-sig")
-            print(f"  → 1글자 병합 수정 완료 (원본 덮어쓰기)")
-        else:
-            print(f"  → 1글자 병합 변경 사항 없음")
-
-        # 4. 번역 단계: 블록 단위로 처리 (번호/시간 유지, 텍스트만 번역)
-        lines = merged_content.splitlines()
-        translated_lines = []
-        in_text_block = False           # 현재 텍스트 블록 안에 있는지
-        current_text = []               # 현재 번역 대기 중인 텍스트 줄들
-
-        for line in lines:
-            stripped = line.strip()
-
-            # 빈 줄 → 텍스트 블록 종료 → 번역 실행
-            if not stripped:
-                if current_text:
-                    text_to_translate = "\n".join(current_text)
-                    translated = translate_ja_to_ko(text_to_translate)
-                    translated_lines.extend(translated.splitlines())
-                    current_text = []
-                translated_lines.append("")  # 빈 줄 유지 (SRT 구조)
-                in_text_block = False
-                continue
-
-            # 자막 번호 줄 (숫자만 있는 줄)
-            if re.match(r'^\d+$', stripped):
-                if current_text:  # 이전 블록 번역
-                    text_to_translate = "\n".join(current_text)
-                    translated = translate_ja_to_ko(text_to_translate)
-                    translated_lines.extend(translated.splitlines())
-                    current_text = []
-                translated_lines.append(line)
-                in_text_block = False
-                continue
-
-            # 시간 줄 (--> 포함)
-            if "-->" in stripped:
-                translated_lines.append(line)
-                in_text_block = True
-                continue
-
-            # 실제 텍스트 줄
-            if in_text_block:
-                current_text.append(line)
-            else:
-                translated_lines.append(line)  # 번호/시간 외 기타 줄 (드물게 있음)
+def make_run_plan(plans: list, order: str = ORDER_PATH, backend=None):
+    """
+    사용량을 한 번만 조회하고, 남은 한도 안에 들어가는 파일을 고릅니다.
 
-        # 파일 끝에 남은 마지막 텍스트 블록 번역
-        if current_text:
-            text_to_translate = "\n".join(current_text)
-            translated = translate_ja_to_ko(text_to_translate)
-            translated_lines.extend(translated.splitlines())
+    Returns:
+        (실행할 계획 목록, 보류할 계획 목록, 남은 문자 수 또는 None)
+    """
+    backend = backend or get_client()
+    if not backend.metered or not any(plan.billable for plan in plans):
+        return plans, [], None
+
+    remaining, limit_reached = fetch_remaining(backend)
+    if limit_reached:
+        print("!!! DeepL API 한도 초과 !!!")
+        print("이번 달 번역 한도를 모두 사용했습니다. 번역이 필요 없는 파일만 처리합니다.")
+    elif remaining is None:
+        print("경고: character 사용량 정보가 유효하지 않습니다.")
+        print("→ 무료 플랜이 아닌 경우일 수 있으니 한도 체크 없이 진행합니다.")
+    else:
+        print(f"DeepL 남은 한도: {remaining:,} 자")
+
+    selected, deferred = pack_plans(plans, remaining, order)
+    return selected, deferred, remaining
+
+
+def print_run_plan(selected: list, deferred: list, root: Path):
+    """파일별 예상 청구량 출력"""
+    print(f"===== 실행 계획: {len(selected)}개 파일 처리, {len(deferred)}개 보류 =====")
+    for plan in selected:
+        print(f"  {plan.path.relative_to(root)}: {STATUS_LABELS[plan.status]}, "
+              f"번역 {plan.translate}개 / 재사용 {plan.reused}개, "
+              f"예상 {plan.billable:,}자 / {plan.requests}회")
+    for plan in deferred:
+        print(f"  [보류] {plan.path.relative_to(root)}: 예상 {plan.billable:,}자 (한도 부족)")
+    print(f"  예상 합계: {sum(p.billable for p in selected):,}자 / "
+          f"{sum(p.requests for p in selected):,}회\n")
+
+
+def print_plan_summary(plans: list, dry_run: bool = False):
+    """파일 상태별 개수와 재사용/번역한 자막 수, 예상/실제 청구량 요약"""
+    counts = {}
+    for plan in plans:
+        counts[plan.status] = counts.get(plan.status, 0) + 1
+    title = "미리보기 (--dry-run, 변경 없음)" if dry_run else "처리 요약"
+    print(f"===== {title} =====")
+    for status, label in STATUS_LABELS.items():
+        if counts.get(status):
+            print(f"  {label}: {counts[status]:,}개 파일")
+    reused = sum(plan.reused for plan in plans)
+    translate = sum(plan.translate for plan in plans)
+    verb = "번역 필요" if dry_run else "번역"
+    print(f"  자막: 재사용 {reused:,}개, {verb} {translate:,}개")
+    print(f"  청구: 예상 {sum(p.billable for p in plans):,}자 / {sum(p.requests for p in plans):,}회", end="")
+    if dry_run:
+        print("\n")
+    else:
+        print(f", 실제 {sum(p.sent_characters for p in plans):,}자 / "
+              f"{sum(p.sent_requests for p in plans):,}회\n")
 
-        # 최종 번역 내용 조합
-        translated_content = "\n".join(translated_lines).rstrip() + "\n"
 
-        # 5. 한국어 자막 파일 저장
-        output_path.write_text(translated_content, encoding="utf-8-sig")
-        print(f"  → 한국어 자막 저장 완료: {output_path.name}")
+# ────────────────────────────────────────────────────────────────
+# 9. 폴더 감시 (데몬 모드)
+# ────────────────────────────────────────────────────────────────
 
-    except Exception as e:
-        print(f"  !!! 오류 발생: {e}")
-        if backup_path.exists():
-            print(f"  (참고: 백업 파일은 생성되었습니다 - {backup_path.name})")
+def watch_mode(folder_path: Path, args):
+    """
+    폴더를 계속 감시하며 새로 들어오거나 바뀐 .srt 만 처리합니다. (--watch, Ctrl+C 로 종료)
+    
+    - 쓰는 중인 파일은 --settle 초 동안 크기/수정 시각이 그대로일 때까지 기다림
+    - 매니페스트로 처리할 필요가 없는 파일(변경 없음/기존 번역본)은 대기열에 넣지 않음
+    - 대기열/상태는 처리 폴더의 .srt_watch_queue.json / .srt_watch_status.json
+    - DeepL 한도는 파일마다 미리 확인하지 않음 (한도 초과로 실패한 자막은 매니페스트에 남아
+      파일이 다시 바뀌거나 다음 일괄 실행 때 그 자막만 다시 번역)
+    """
+    manifest = memory = backend = None
+    backup_dir = args.backup_dir or folder_path / BACKUP_DIR_NAME
+    metrics = RunMetrics(args.metrics_log, args.metrics_prom)
+    if not args.no_translate:
+        backend = make_client(args.backend, args.rate, args.workers, args.max_retries)
+        set_client(backend)
+        metrics.client = backend.metrics
+        manifest = None if args.no_manifest else Manifest(folder_path, args.manifest)
+        memory = None if args.no_memory else TranslationMemory(args.memory, backend.options)
+        get_rule_chain()    # 작업자 스레드가 시작되기 전에 한 번 로드
+
+    # 처리한 파일 → 처리 직후 (크기, 수정 시각): 데몬이 직접 덮어쓴 원본(1글자 병합)의 변경 이벤트로
+    # 같은 파일을 다시 처리하지 않도록 그대로인 파일은 건너뜀
+    # (이후 이벤트에서 상태가 달라졌으면 항목을 지움 → 오래 돌아도 처리한 파일 수만큼 쌓이지 않음)
+    handled = {}
+    handled_lock = threading.Lock()
+
+    def file_state(path: Path) -> tuple[int, int] | None:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def needs_work(path: Path) -> bool:
+        if not is_source_srt(path):
+            return False
+        with handled_lock:
+            state = handled.get(path)
+            if state is not None:
+                if state == file_state(path):
+                    return False
+                del handled[path]
+        if args.no_translate:
+            return True
+        rules_hash, settings_hash = current_hashes(not args.no_ja_filter, args.profiles)
+        status = status_for(path, manifest, rules_hash, settings_hash, args.profiles)
+        return status not in (UNCHANGED, LEGACY_OUTPUT)
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        options = dict(executor=executor, batch_chars=args.batch_chars,
+                       batch_items=args.batch_items, memory=memory, manifest=manifest,
+                       backend=backend, backup_dir=backup_dir, metrics=metrics,
+                       ja_filter=not args.no_ja_filter, profiles=args.profiles)
+
+        def handle(path: Path) -> bool:
+            # 대기하는 동안 이미 처리됐을 수 있음 (처리 중에 덮어쓴 원본의 이벤트는 처리가 끝나기 전에 들어옴)
+            if not needs_work(path):
+                return False
+            if args.no_translate:
+                merge_files([path], backup_dir=backup_dir, metrics=metrics)
+            else:
+                process_srt_file(path, **options)
+            with handled_lock:
+                handled[path] = file_state(path)
+            metrics.write_prometheus()
+            print()  # 파일 간 구분용 빈 줄
+            return True
+
+        daemon = WatchDaemon(folder_path, handle, accept=needs_work, workers=args.file_workers,
+                             settle=args.settle, queue_size=args.queue_size,
+                             priority=args.priority, polling=args.poll)
+        signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop.set())
+        daemon.run()
+
+    if metrics.counters["files"]:
+        print(metrics.format_table())
+    metrics.close()
+    if memory is not None:
+        memory.close()
+    if manifest is not None:
+        manifest.close()
 
 
 # ────────────────────────────────────────────────────────────────
-# 7. 프로그램 진입점
+# 10. 프로그램 진입점
 # ────────────────────────────────────────────────────────────────
 
+def parse_args(argv=None):
+    """명령줄 인자 해석"""
+    parser = argparse.ArgumentParser(
+        description="SRT 1글자 자막 병합 + 일본어 → 한국어 번역",
+        epilog='예시: python srt_merge_and_translate.py "C:/Subtitles" --workers 8',
+    )
+    parser.add_argument("folder", help="처리할 .srt 파일이 있는 폴더 (하위 폴더 포함)")
+    parser.add_argument("--backend", choices=tuple(BACKENDS), default=DEFAULT_BACKEND,
+                        help="번역 백엔드: deepl, cache(번역 메모리에 있는 문장만, 요청 없음), "
+                             "stub(네트워크 없는 가짜 번역) (기본 deepl)")
+    parser.add_argument("--no-translate", action="store_true",
+                        help="번역 없이 병합/정리(휴식 표현 제거, 1글자 병합)만 실행해 원본 덮어쓰기")
+    parser.add_argument("--no-ja-filter", action="store_true",
+                        help="번역 전 일본어 환각/반복 자막 필터를 끔 (환각 문장도 번역한 뒤 다중 바꾸기 규칙으로만 정리)")
+    parser.add_argument("--profiles", default="",
+                        help=f"출력 프로파일 (쉼표 구분, {', '.join(PROFILES)}): 번역/공통 규칙은 한 번만 하고 "
+                             "갈라지는 규칙 그룹부터 따로 적용해 a.ko.polite.srt, a.ko.casual.srt 처럼 저장 "
+                             "(기본: 템플릿 그대로 .ko.srt 하나)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"동시 번역 요청 수, 모든 파일이 공유 (기본 {DEFAULT_WORKERS})")
+    parser.add_argument("--file-workers", type=int, default=1,
+                        help="동시에 처리할 파일 수, 스레드만 사용 (기본 1)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="CPU 단계(읽기/병합, 규칙 적용)를 나눠 실행할 프로세스 수. "
+                             "2 이상이면 파일들을 파이프라인으로 처리 (기본 1, --file-workers 대신 사용)")
+    parser.add_argument("--batch-chars", type=int, default=DEFAULT_BATCH_CHARS,
+                        help=f"번역 요청 1회당 최대 문자 수 (기본 {DEFAULT_BATCH_CHARS})")
+    parser.add_argument("--batch-items", type=int, default=DEFAULT_BATCH_ITEMS,
+                        help=f"번역 요청 1회당 최대 블록 수 (기본 {DEFAULT_BATCH_ITEMS})")
+    parser.add_argument("--memory", type=Path, default=DEFAULT_MEMORY_PATH,
+                        help="번역 메모리 DB 경로 (기본: 스크립트 폴더의 translation_memory.db)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="번역 메모리를 사용하지 않음")
+    parser.add_argument("--manifest", type=Path, default=None,
+                        help=f"증분 처리 매니페스트 경로 (기본: 처리 폴더의 {MANIFEST_NAME})")
+    parser.add_argument("--no-manifest", action="store_true",
+                        help="매니페스트 없이 기존처럼 .ko.srt 가 있으면 스킵")
+    parser.add_argument("--backup-dir", type=Path, default=None,
+                        help=f"원본 백업 저장소 폴더 (기본: 처리 폴더의 {BACKUP_DIR_NAME}, "
+                             "관리/복원은 backup_store.py)")
+    parser.add_argument("--metrics-log", type=Path, default=None,
+                        help="파일마다 단계별 시간/카운터를 JSON Lines 이벤트로 덧붙여 기록할 경로")
+    parser.add_argument("--metrics-prom", type=Path, default=None,
+                        help="Prometheus 텍스트 파일 경로 (node_exporter textfile collector 용, 실행 끝에 갱신)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="파일을 쓰거나 번역하지 않고 실행 계획(다시 처리할 파일/예상 청구량)만 출력")
+    parser.add_argument("--order", choices=ORDERS, default=ORDER_PATH,
+                        help="한도가 부족할 때 파일 선택 순서: path(발견 순서), "
+                             "smallest(청구 문자 적은 순) (기본 path)")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="초당 최대 번역 요청 수 (기본: 제한 없음)")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES,
+                        help=f"429/5xx/연결 오류 시 재시도 횟수 (기본 {DEFAULT_MAX_RETRIES})")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"지난 실행에서 한도 부족으로 보류한 파일만 처리 (처리 폴더의 {STATE_NAME})")
+    parser.add_argument("--watch", action="store_true",
+                        help="폴더를 계속 감시하며 새로 들어오거나 바뀐 .srt 만 처리 (Ctrl+C 로 종료, "
+                             f"동시 처리 파일 수는 --file-workers, 상태는 처리 폴더의 {STATUS_NAME})")
+    parser.add_argument("--poll", action="store_true",
+                        help="--watch 에서 inotify 대신 폴링 사용 (네트워크 공유 폴더 등)")
+    parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE,
+                        help=f"--watch: 크기/수정 시각이 이 시간(초) 동안 그대로면 쓰기가 끝난 것으로 봄 "
+                             f"(기본 {DEFAULT_SETTLE:g})")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f"--watch: 작업 대기열 최대 길이 (기본 {DEFAULT_QUEUE_SIZE}, {QUEUE_NAME} 에 저장)")
+    parser.add_argument("--priority", choices=PRIORITIES, default=PRIORITY_SMALLEST,
+                        help="--watch: 대기열 순서: smallest(작은 파일 먼저), fifo(도착 순) (기본 smallest)")
+    args = parser.parse_args(argv)
+    if args.no_translate and args.dry_run:
+        parser.error("--no-translate 와 --dry-run 은 함께 쓸 수 없습니다")
+    if args.watch and (args.dry_run or args.resume):
+        parser.error("--watch 는 --dry-run / --resume 과 함께 쓸 수 없습니다")
+    if args.backend == "cache" and args.no_memory:
+        parser.error("--backend cache 는 번역 메모리가 필요합니다 (--no-memory 와 함께 쓸 수 없음)")
+    try:
+        args.profiles = parse_profiles(args.profiles) if args.profiles else ()
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
 def main():
     """
     프로그램 메인 함수
-    명령줄 인자로 폴더 경로를 받아 모든 .srt 파일을 순차 처리
+    명령줄 인자로 폴더 경로를 받아 모든 .srt 파일을 처리
+    (번역 요청은 --workers 개까지 동시에, 파일은 --file-workers 개까지 동시에)
+    
+    1. 계획: 파일마다 상태와 예상 청구 문자 수 계산 → 사용량 1회 조회 → 한도 안에 드는 파일 선택
+    2. 실행: 실제 보낸 문자 수를 직접 차감, 한도를 넘게 되는 파일은 시작하지 않음
+    3. 보류한 파일이 있으면 상태 파일에 저장 (--resume 으로 이어서 처리)
+    
+    --no-translate 면 병합/정리만 하고 끝냄 (번역 백엔드/매니페스트/번역 메모리 사용 안 함)
     """
-    # 사용법 안내
-    if len(sys.argv) != 2:
-        print("사용법: python merge_and_translate_srt.py \"폴더경로\"")
-        print("예시:")
-        print('  python merge_and_translate_srt.py "C:/Subtitles"')
-        sys.exit(1)
+    args = parse_args()
 
     # 입력 경로 변환 및 검증
-    folder_path = Path(sys.argv[1]).resolve()
+    folder_path = Path(args.folder).resolve()
 
     if not folder_path.is_dir():
         print(f"오류: {folder_path} 는 존재하지 않거나 폴더가 아닙니다.")
         sys.exit(1)
 
+    # 폴더 감시 모드 (전체 목록/실행 계획 없이 들어오는 파일을 그때그때 처리)
+    if args.watch:
+        watch_mode(folder_path, args)
+        return
+
     # 처리 대상 파일 목록 가져오기
     srt_files = get_srt_files(folder_path)
 
+    # 지난 실행에서 보류한 파일만 이어서 처리
+    state_path = folder_path / STATE_NAME
+    if args.resume:
+        pending = load_state(state_path)
+        if pending is None:
+            print(f"이어서 처리할 상태 파일이 없습니다: {state_path}")
+            return
+        pending = set(pending)
+        srt_files = [f for f in srt_files if f.relative_to(folder_path).as_posix() in pending]
+
     if not srt_files:
         print("해당 폴더에 처리할 .srt 파일이 없습니다.")
         return
 
     print(f"발견된 .srt 파일 수: {len(srt_files)}\n")
 
-    # 파일 하나씩 처리
-    for srt_file in srt_files:
-        process_srt_file(srt_file)
-        print()  # 파일 간 구분용 빈 줄
+    start = time.perf_counter()
+
+    # 원본 백업 저장소 (덮어쓰기 전 내용, 같은 내용은 한 번만)
+    backup_dir = args.backup_dir or folder_path / BACKUP_DIR_NAME
+
+    # 단계별 시간/카운터 (실행 끝 요약 표, --metrics-log / --metrics-prom)
+    metrics = RunMetrics(args.metrics_log, args.metrics_prom)
+
+    # 병합/정리만 (번역, 매니페스트, 번역 메모리, 규칙 체인 모두 사용하지 않음)
+    if args.no_translate:
+        cpu_pool = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 else None
+        merged = merge_files(srt_files, cpu_pool, backup_dir, metrics)
+        if cpu_pool is not None:
+            cpu_pool.shutdown()
+        print(f"\n{metrics.format_table()}")
+        metrics.close()
+        print(f"\n===== 병합/정리 완료: {len(srt_files)}개 파일 중 {merged}개 수정 "
+              f"({time.perf_counter() - start:.1f}초) =====")
+        return
 
-    print("===== 모든 파일 처리 완료 =====")
+    # 번역 요청 클라이언트 (속도 제한 + 재시도 + 동시 요청 수 자동 조절)
+    # 실제 백엔드(DeepL 등)는 처음 번역/사용량을 조회할 때 초기화
+    backend = make_client(args.backend, args.rate, args.workers, args.max_retries)
+    set_client(backend)
+    metrics.client = backend.metrics
+
+    # 증분 처리 매니페스트 (이전 실행 결과와 비교해 바뀐 것만 다시 처리)
+    manifest = None if args.no_manifest else Manifest(folder_path, args.manifest)
+    if manifest is not None:
+        print(f"매니페스트: {manifest.path}\n")
+
+    # 번역 메모리 (같은 문장 재번역 방지)
+    memory = None if args.no_memory else TranslationMemory(args.memory, backend.options)
+    if memory is not None:
+        print(f"번역 메모리: {args.memory} ({len(memory):,}개 항목)\n")
+
+    # 출력 프로파일 (번역/공통 규칙은 한 번, 갈라지는 그룹부터 프로파일마다)
+    if args.profiles:
+        profile_chain = process_profile_chain(args.profiles)
+        if profile_chain is not None:
+            print(f"출력 프로파일: {', '.join(args.profiles)}\n{profile_chain.describe()}\n")
+
+    # CPU 단계(읽기/병합, 규칙 적용)용 프로세스 풀 (--jobs 2 이상일 때)
+    cpu_pool = None
+    if args.jobs > 1:
+        rule_chain = get_rule_chain()    # 작업자를 만들기 전에 컴파일 (fork 시 그대로 물려받음)
+        if rule_chain is not None:
+            rule_chain.compile()        # 규칙 팩에서 불러온 정규식은 처음 쓸 때 컴파일되므로 미리
+        if not args.no_ja_filter:
+            process_filter()            # 환각/반복 필터도 미리 로드
+        if args.profiles:
+            process_profile_chain(args.profiles)
+        cpu_pool = ProcessPoolExecutor(max_workers=args.jobs, initializer=process_rule_chain)
+
+    # 1. 실행 계획
+    plans = plan_files(srt_files, manifest, memory, args.batch_chars, args.batch_items, cpu_pool,
+                       ja_filter=not args.no_ja_filter, profiles=args.profiles)
+    work = [plan for plan in plans if plan.needs_work]
+    for plan in plans:
+        if not plan.needs_work:
+            metrics.record_skip(plan.path, plan.status)
+    try:
+        selected, deferred, remaining = make_run_plan(work, args.order, backend)
+    except TranslationError as e:
+        print(f"번역 백엔드 오류: {e}")
+        sys.exit(1)
+    print_run_plan(selected, deferred, folder_path)
+
+    if args.dry_run:
+        print_plan_summary(plans, dry_run=True)
+    else:
+        # 2. 실행 (번역 요청용 공유 스레드 풀: 모든 파일의 동시 요청 수 합계 제한)
+        budget = QuotaBudget(remaining)
+        budget_lock = threading.Lock()
+
+        def run_admit(plan) -> bool:
+            # 시작 전에 예상 문자 수 예약 → 앞 파일들이 예상보다 많이 썼으면 이 파일은 보류
+            if budget.reserve(plan.billable):
+                return True
+            print(f"보류 (남은 한도 부족): {plan.path}\n")
+            with budget_lock:
+                deferred.append(plan)
+            return False
+
+        def run(plan):
+            if not run_admit(plan):
+                return plan
+            process_srt_file(plan.path, plan=plan, **options)
+            budget.settle(plan.billable, plan.sent_characters)
+            print()  # 파일 간 구분용 빈 줄
+            return plan
+
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+            options = dict(executor=executor, batch_chars=args.batch_chars,
+                           batch_items=args.batch_items, memory=memory, manifest=manifest,
+                           backend=backend, backup_dir=backup_dir, metrics=metrics,
+                           ja_filter=not args.no_ja_filter, profiles=args.profiles)
+
+            if cpu_pool is not None:
+                # 파이프라인: CPU 단계는 프로세스 풀, 번역은 스레드 풀에서 겹쳐 실행
+                admitted = (plan for plan in selected if run_admit(plan))
+                run_pipelined(admitted, cpu_pool, args.jobs, budget, **options)
+            elif args.file_workers <= 1:
+                # 파일 하나씩 처리
+                for plan in selected:
+                    run(plan)
+            else:
+                # 여러 파일 동시 처리
+                with ThreadPoolExecutor(max_workers=args.file_workers) as file_pool:
+                    list(file_pool.map(run, selected))
+
+        deferred_ids = {id(plan) for plan in deferred}
+        print_plan_summary([plan for plan in plans if id(plan) not in deferred_ids])
+
+        # 3. 보류한 파일 기록 (다음에 --resume 으로 이어서 처리)
+        if deferred:
+            deferred = [plan for plan in work if id(plan) in deferred_ids]
+            save_state(state_path, folder_path, deferred, budget.remaining, "DeepL 문자 한도 부족")
+            print(f"한도 부족으로 {len(deferred)}개 파일을 보류했습니다. "
+                  f"(예상 {sum(p.billable for p in deferred):,}자)")
+            print(f"→ 한도가 충분해지면 --resume 으로 이어서 처리: {state_path}\n")
+        else:
+            clear_state(state_path)
+
+        if backend.metrics.requests:
+            print(f"번역 요청: {backend.metrics.format()}")
+            print(f"동시 요청 수: 최종 한도 {backend.concurrency.limit} / 최대 {args.workers} "
+                  f"(실제 최대 {backend.concurrency.peak})")
+        if metrics.counters["files"]:
+            print(f"\n단계별 시간 (파일당, 번역 배치/요청은 요청당)\n{metrics.format_table()}\n")
+
+    if cpu_pool is not None:
+        cpu_pool.shutdown()
+    metrics.close()
+    if memory is not None:
+        # 파일별 "번역 메모리: 적중 / 미적중" 과 같은 집계 (TranslationStats 합계)
+        print(f"번역 메모리: 전체 적중 {metrics.counters['cache_hits']:,} / "
+              f"미적중 {metrics.counters['cache_misses']:,}, "
+              f"저장 항목 {len(memory):,}개")
+        memory.close()
+    if manifest is not None:
+        manifest.close()
+
+    print(f"===== 모든 파일 처리 완료 ({time.perf_counter() - start:.1f}초) =====")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,362 @@
+"""
+스트리밍 SRT 파서 / 작성기와 자막 처리 단계(generator)
+
+파일 전체를 문자열로 읽고 splitlines 를 반복하는 대신,
+파일 핸들에서 한 줄씩 읽어 Cue 객체를 하나씩 만들어 흘려보냅니다.
+
+    cues = read_srt(path)                    # Cue 생성기
+    cues = remove_rest_phrases(cues)         # 휴식 표현 제거
+    cues = merge_single_char_cues(cues)      # 1글자 자막 병합
+    write_srt(cues, out)                     # 번호 다시 매겨 저장
+
+각 단계는 Cue 를 받아 Cue 를 내보내는 generator 라서 메모리 사용량이 파일 크기와 무관합니다.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, TextIO
+
+
+# 시간줄: 00:01:23,450 --> 00:01:24,120 (소수점 구분자 . 도 허용)
+TIME_LINE_RE = re.compile(
+    r"^\s*(\d+):(\d{1,2}):(\d{1,2})[,.](\d{1,3})\s*-->\s*(\d+):(\d{1,2}):(\d{1,2})[,.](\d{1,3})"
+)
+
+# 일본어 휴식 표현: (공백)? 少(공백)? し(공백)? 休 + 비구두점 문자들 + 구두점 1개 이상
+REST_PHRASE_RE = re.compile(r'(\s)?少(\s)?し(\s)?休[^\.。\,\?]{1,}[\.。\,\?]{1,}')
+
+# 공백 제거용
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+# ────────────────────────────────────────────────────────────────
+# 1. Cue 자료구조 / 시간 변환
+# ────────────────────────────────────────────────────────────────
+
+class Cue:
+    """자막 블록 하나 (시간은 정수 밀리초, 텍스트는 줄 목록)"""
+
+    __slots__ = ("index", "start", "end", "lines")
+
+    def __init__(self, index: int, start: int, end: int, lines: list[str]):
+        self.index = index      # 원본 자막 번호 (출력 시 다시 매김)
+        self.start = start      # 시작 시간 (ms)
+        self.end = end          # 종료 시간 (ms)
+        self.lines = lines      # 텍스트 줄들
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    def __repr__(self):
+        return f"Cue({self.index}, {format_timestamp(self.start)} --> {format_timestamp(self.end)}, {self.lines!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Cue):
+            return NotImplemented
+        return (self.start, self.end, self.lines) == (other.start, other.end, other.lines)
+
+
+def parse_time_line(line: str) -> tuple[int, int] | None:
+    """시간줄을 (시작 ms, 종료 ms) 로 변환. 시간줄이 아니면 None"""
+    # 빠른 경로: 표준 형식 "00:01:23,450 --> 00:01:24,120" 은 슬라이스로 바로 변환
+    if (len(line) == 29 and line[13:18] == " --> " and line[2] == ":" and line[5] == ":"
+            and line[19] == ":" and line[22] == ":"):
+        try:
+            h1, m1, s1, f1, h2, m2, s2, f2 = map(int, (
+                line[0:2], line[3:5], line[6:8], line[9:12],
+                line[17:19], line[20:22], line[23:25], line[26:29],
+            ))
+            return ((h1 * 60 + m1) * 60 + s1) * 1000 + f1, ((h2 * 60 + m2) * 60 + s2) * 1000 + f2
+        except ValueError:
+            pass
+    m = TIME_LINE_RE.match(line)
+    if not m:
+        return None
+    h1, m1, s1, f1, h2, m2, s2, f2 = m.groups()
+    start = ((int(h1) * 60 + int(m1)) * 60 + int(s1)) * 1000 + int(f1.ljust(3, "0"))
+    end = ((int(h2) * 60 + int(m2)) * 60 + int(s2)) * 1000 + int(f2.ljust(3, "0"))
+    return start, end
+
+
+@lru_cache(maxsize=1 << 16)
+def _format_seconds(seconds: int) -> str:
+    """초 → "00:01:23," (자막 시간은 대부분 가까운 초에 몰려 있어 캐시 적중률이 높음)"""
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},"
+
+
+def format_timestamp(ms: int) -> str:
+    """밀리초 → 00:01:23,450"""
+    if ms < 0:
+        ms = 0
+    seconds, ms = divmod(ms, 1000)
+    return f"{_format_seconds(seconds)}{ms:03d}"
+
+
+def format_time_line(start: int, end: int) -> str:
+    return f"{format_timestamp(start)} --> {format_timestamp(end)}"
+
+
+# ────────────────────────────────────────────────────────────────
+# 2. 스트리밍 파서
+# ────────────────────────────────────────────────────────────────
+
+# 블록 구분: 공백만 있는 줄이 하나 이상
+BLOCK_SPLIT_RE = re.compile(r"\n(?:[^\S\n]*\n)+")
+
+# 파일에서 한 번에 읽을 크기
+CHUNK_SIZE = 1 << 20
+
+
+def _cues_from_block(block: str) -> Iterator[Cue]:
+    """
+    빈 줄로 구분된 블록 하나에서 Cue 를 만듭니다.
+    빈 줄 없이 다음 자막이 이어지는 경우(숫자 줄 + 시간줄)도 나눠서 처리합니다.
+    시간줄이 없는 블록은 자막이 아니므로 버립니다.
+    """
+    if block.startswith("\ufeff"):       # 이어 붙인 파일마다 붙어 있는 BOM
+        block = block[1:]
+    lines = block.split("\n")
+
+    # 빠른 경로: "번호 / 시간줄 / 텍스트..." 이고 텍스트 안에 다른 시간줄이 없음
+    if len(lines) >= 2 and "-->" not in block[len(lines[0]) + len(lines[1]) + 2:]:
+        number = lines[0].strip()
+        times = parse_time_line(lines[1]) if number.isdigit() else None
+        if times is not None:
+            yield Cue(int(number), times[0], times[1], lines[2:])
+            return
+
+    current = None
+    i = 0
+    n = len(lines)
+    while i < n:
+        line = lines[i]
+        times = None
+        # "번호 + 시간줄" 또는 (블록 맨 앞의 번호 없는) "시간줄" 이 새 자막의 시작
+        if i + 1 < n and line.strip().isdigit():
+            times = parse_time_line(lines[i + 1])
+            if times is not None:
+                index = int(line.strip())
+                i += 2
+        if times is None and current is None:
+            times = parse_time_line(line)
+            if times is not None:
+                index = 0
+                i += 1
+        if times is None:
+            if current is not None:
+                current.lines.append(line)
+            i += 1
+            continue
+
+        if current is not None:
+            yield current
+        current = Cue(index, times[0], times[1], [])
+
+    if current is not None:
+        yield current
+
+
+def _iter_blocks(chunks: Iterable[str]) -> Iterator[str]:
+    """텍스트 조각들을 이어 가며 빈 줄 기준 블록 문자열을 내보냄 (앞뒤 공백 줄 제외)"""
+    rest = ""
+    for chunk in chunks:
+        parts = BLOCK_SPLIT_RE.split(rest + chunk.replace("\r\n", "\n"))
+        rest = parts.pop()      # 마지막 조각은 다음 조각과 이어질 수 있음
+        for part in parts:
+            if part.strip():
+                yield part.strip("\n")
+    if rest.strip():
+        yield rest.strip("\n")
+
+
+def parse_srt_blocks(chunks: Iterable[str]) -> Iterator[Cue]:
+    """텍스트 조각(파일 읽기 단위, 줄 단위 모두 가능)에서 Cue 를 하나씩 만들어 냄"""
+    for block in _iter_blocks(chunks):
+        yield from _cues_from_block(block)
+
+
+def parse_srt(lines: Iterable[str]) -> Iterator[Cue]:
+    """
+    줄 단위 입력(파일 핸들, 리스트 등)에서 Cue 를 하나씩 만들어 냅니다.
+    여러 SRT 를 이어 붙인 입력도 처리합니다 (번호는 원본 값 유지).
+    파일 핸들이면 줄 대신 큰 조각으로 읽어 처리합니다.
+    """
+    if hasattr(lines, "read"):
+        return parse_srt_blocks(iter(lambda: lines.read(CHUNK_SIZE), ""))
+    return parse_srt_blocks(line if line.endswith("\n") else line + "\n" for line in lines)
+
+
+def parse_srt_string(content: str) -> Iterator[Cue]:
+    """SRT 문자열 → Cue 생성기"""
+    return parse_srt_blocks([content])
+
+
+def read_srt(path: Path) -> Iterator[Cue]:
+    """SRT 파일을 스트리밍으로 읽음 (BOM付き UTF-8 도 처리)"""
+    with open(path, encoding="utf-8-sig", newline=None) as f:
+        yield from parse_srt(f)
+
+
+def decode_srt_bytes(raw: bytes) -> str:
+    """파일 내용(bytes) → 문자열 (read_text(encoding="utf-8-sig") 와 같음: BOM 제거, 줄바꿈은 \n)"""
+    text = raw.decode("utf-8-sig")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+# ────────────────────────────────────────────────────────────────
+# 3. 스트리밍 작성기
+# ────────────────────────────────────────────────────────────────
+
+def format_cue(cue: Cue, number: int) -> str:
+    """Cue 하나를 SRT 블록 문자열로 (끝에 빈 줄 포함)"""
+    return f"{number}\n{format_time_line(cue.start, cue.end)}\n" + "".join(
+        line + "\n" for line in cue.lines
+    ) + "\n"
+
+
+def write_srt(cues: Iterable[Cue], f: TextIO) -> int:
+    """
+    Cue 들을 번호 1부터 다시 매겨 파일 핸들에 씁니다.
+    마지막 블록 뒤의 빈 줄은 쓰지 않습니다 (파일 끝 개행 하나, SRT 관례)
+
+    Returns:
+        int: 쓴 자막 수
+    """
+    count = 0
+    write = f.write
+    for count, cue in enumerate(cues, start=1):
+        if count > 1:
+            write("\n")
+        write(f"{count}\n{format_timestamp(cue.start)} --> {format_timestamp(cue.end)}\n")
+        for line in cue.lines:
+            write(line + "\n")
+    return count
+
+
+def srt_to_string(cues: Iterable[Cue]) -> str:
+    """Cue 들을 SRT 문자열로 (파일 끝 개행 하나)"""
+    parts = [format_cue(cue, number) for number, cue in enumerate(cues, start=1)]
+    return "".join(parts).rstrip() + "\n"
+
+
+# 새 파일 권한 (mkstemp 는 0600 으로 만들므로 open() 과 같은 0666 & ~umask 로 맞춤)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextmanager
+def atomic_open(path: Path, mode: str = "w", **kwargs):
+    """
+    같은 폴더의 임시 파일(이름.XXXX.tmp, 쓰는 쪽마다 다른 이름)에 쓴 뒤 os.replace 로 교체하는 open()
+    쓰는 도중 실패하거나 중단돼도 기존 파일은 그대로 남음 (반쯤 쓴 파일 없음, 기존 권한 유지)
+    여러 프로세스/스레드가 같은 파일을 동시에 써도 서로의 임시 파일을 건드리지 않음 (마지막 교체가 남음)
+    """
+    path = Path(path)
+    fd, name = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    temp = Path(name)
+    try:
+        with open(fd, mode, **kwargs) as f:
+            yield f
+        try:
+            shutil.copymode(path, temp)
+        except FileNotFoundError:
+            os.chmod(temp, 0o666 & ~_UMASK)
+        os.replace(temp, path)
+    except BaseException:
+        try:
+            os.unlink(temp)
+        except OSError:
+            pass
+        raise
+
+
+def save_srt(cues: Iterable[Cue], path: Path) -> int:
+    """Cue 들을 BOM付き UTF-8 SRT 파일로 저장 (임시 파일에 쓴 뒤 교체)"""
+    with atomic_open(path, "w", encoding="utf-8-sig", newline="\n") as f:
+        return write_srt(cues, f)
+
+
+def save_srt_text(text: str, path: Path):
+    """SRT 문자열을 BOM付き UTF-8 로 저장 (Path.write_text 와 같은 내용, 임시 파일에 쓴 뒤 교체)"""
+    with atomic_open(path, "w", encoding="utf-8-sig") as f:
+        f.write(text)
+
+
+# ────────────────────────────────────────────────────────────────
+# 4. 처리 단계 (Cue generator)
+# ────────────────────────────────────────────────────────────────
+
+def map_lines(cues: Iterable[Cue], func) -> Iterator[Cue]:
+    """각 텍스트 줄에 func(line) 적용"""
+    for cue in cues:
+        cue.lines = [func(line) for line in cue.lines]
+        yield cue
+
+
+def map_text(cues: Iterable[Cue], func) -> Iterator[Cue]:
+    """여러 줄 텍스트 전체에 func(text) 적용 (결과는 다시 줄 단위로)"""
+    for cue in cues:
+        cue.lines = func("\n".join(cue.lines)).split("\n")
+        yield cue
+
+
+def drop_empty_cues(cues: Iterable[Cue]) -> Iterator[Cue]:
+    """빈 줄을 정리하고, 텍스트가 남지 않은 자막은 버림"""
+    for cue in cues:
+        lines = [line for line in cue.lines if line.strip()]
+        if lines:
+            cue.lines = lines
+            yield cue
+
+
+def remove_rest_phrases(cues: Iterable[Cue]) -> Iterator[Cue]:
+    """'少し休...' 같은 일본어 휴식 표현을 줄마다 제거"""
+    sub = REST_PHRASE_RE.sub
+    for cue in cues:
+        cue.lines = [sub("", line) for line in cue.lines]
+        yield cue
+
+
+def merge_single_char_cues(cues: Iterable[Cue]) -> Iterator[Cue]:
+    """
+    '공백 제외 정확히 1글자'인 자막을 다음 자막과 병합합니다.
+    - 시간: 현재 시작 ~ 다음 종료
+    - 텍스트: 각 자막의 줄을 공백으로 이은 뒤 띄어쓰기 없이 연결 (한 줄)
+    - 두 개씩만 병합 (병합 결과는 다시 병합 대상이 아님)
+    """
+    pending = None
+    for cue in cues:
+        if pending is None:
+            if len(WHITESPACE_RE.sub("", "".join(cue.lines))) == 1:
+                pending = cue
+            else:
+                yield cue
+            continue
+
+        text = " ".join(pending.lines).strip()
+        next_text = " ".join(cue.lines).strip()
+        yield Cue(pending.index, pending.start, cue.end, [text + next_text])
+        pending = None
+
+    if pending is not None:
+        yield pending
+
+
+def merge_stages(cues: Iterable[Cue]) -> Iterator[Cue]:
+    """
+    번역 전 정리 단계 묶음
+    휴식 표현 제거 → 빈 자막 삭제 → 1글자 자막 병합
+    """
+    cues = remove_rest_phrases(cues)
+    cues = drop_empty_cues(cues)
+    return merge_single_char_cues(cues)
@@ -0,0 +1,6 @@
+"""저장소 루트의 모듈(rule_engine, srt_stream ...)을 바로 import 할 수 있도록 경로 추가"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,59 @@
+"""백업 저장소: 같은 내용을 여러 작업자가 동시에 백업해도 실패하지 않는지, 임시 파일 권한/정리"""
+
+import os
+import stat
+import threading
+
+from backup_store import BackupStore
+from srt_stream import atomic_open
+
+
+def test_concurrent_backup_of_same_content(tmp_path):
+    source = tmp_path / "a.srt"
+    source.write_bytes(b"1\n00:00:01,000 --> 00:00:02,000\n\xe3\x81\x82\n")
+    errors = []
+
+    for round_number in range(20):
+        store = BackupStore(tmp_path / f"store{round_number}", base=tmp_path)
+        barrier = threading.Barrier(8)
+
+        def worker():
+            barrier.wait()
+            try:
+                for _ in range(10):
+                    store.backup(source)
+            except Exception as e:      # noqa: BLE001 - 모든 실패를 모아 확인
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert store.read(store.pick(source)) == source.read_bytes()
+        assert not list(store.objects.rglob("*.tmp"))
+    assert errors == []
+
+
+def test_atomic_open_permissions_and_cleanup(tmp_path):
+    target = tmp_path / "new.txt"
+    with atomic_open(target, "w", encoding="utf-8") as f:
+        f.write("a")
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(target.stat().st_mode) == 0o666 & ~umask
+
+    target.chmod(0o640)
+    with atomic_open(target, "w", encoding="utf-8") as f:
+        f.write("b")
+    assert stat.S_IMODE(target.stat().st_mode) == 0o640     # 기존 권한 유지
+    assert target.read_text(encoding="utf-8") == "b"
+
+    try:
+        with atomic_open(target, "w", encoding="utf-8") as f:
+            f.write("c")
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert target.read_text(encoding="utf-8") == "b"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["new.txt"]
@@ -0,0 +1,52 @@
+"""change_check: 그룹별 XML 로 나눈 뒤 다시 불러온 규칙이 템플릿과 같은지"""
+
+from change_check import split_xml_by_group
+from rule_engine import DEFAULT_TEMPLATE, RuleChain, load_groups
+
+WHITESPACE_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<Settings>
+  <MultipleSearchAndReplaceList>
+    <Group>
+      <Name>1.공백</Name>
+      <Enabled>True</Enabled>
+      <MultipleSearchAndReplaceItem>
+        <Enabled>True</Enabled>
+        <FindWhat>　</FindWhat>
+        <ReplaceWith> </ReplaceWith>
+        <SearchType>Normal</SearchType>
+        <Description />
+      </MultipleSearchAndReplaceItem>
+      <MultipleSearchAndReplaceItem>
+        <Enabled>True</Enabled>
+        <FindWhat>  </FindWhat>
+        <ReplaceWith>
+</ReplaceWith>
+        <SearchType>Normal</SearchType>
+        <Description />
+      </MultipleSearchAndReplaceItem>
+    </Group>
+  </MultipleSearchAndReplaceList>
+</Settings>
+"""
+
+
+def _rules(groups) -> list[tuple]:
+    return [(group.name, group.enabled, rule.find_what, rule.replace_with, rule.search_type, rule.enabled)
+            for group in groups for rule in group.rules]
+
+
+def test_whitespace_values_survive_split(tmp_path):
+    template = tmp_path / "whitespace.template"
+    template.write_text(WHITESPACE_TEMPLATE, encoding="utf-8")
+    split_xml_by_group(str(template), str(tmp_path / "groups"))
+
+    split = _rules(load_groups(tmp_path / "groups"))
+    assert split == _rules(load_groups(template))
+    assert [(find, replace) for _, _, find, replace, _, _ in split] == [("　", " "), ("  ", "\n")]
+
+
+def test_template_split_round_trip(tmp_path):
+    split_xml_by_group(str(DEFAULT_TEMPLATE), str(tmp_path))
+    original = load_groups(DEFAULT_TEMPLATE)
+    assert _rules(load_groups(tmp_path)) == _rules(original)
+    assert RuleChain(load_groups(tmp_path)).fingerprint == RuleChain(original).fingerprint
@@ -0,0 +1,123 @@
+"""
+타이밍 엔진 성질 테스트 (numpy 필요)
+
+- LEGACY_RULES 는 srt_stream.merge_single_char_cues 와 같은 결과
+- fix_overlaps 결과는 시작 시간 순(단조 증가)이고 겹치지 않음 (min_gap 포함)
+- 텍스트는 순서대로 보존, 최소 표시 시간/읽기 속도는 다음 자막 때문에만 못 지킴
+무작위 규칙 x 무작위 자막은 시드를 고정해 항상 같은 경우를 검사합니다.
+"""
+
+import math
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import cue_timing  # noqa: E402  (numpy 가 없으면 위에서 건너뜀)
+from benchmark import make_timing_cues  # noqa: E402
+from srt_stream import Cue, merge_single_char_cues  # noqa: E402
+
+TRIALS = 300
+
+
+def copy_cues(cues: list[Cue]) -> list[Cue]:
+    return [Cue(cue.index, cue.start, cue.end, list(cue.lines)) for cue in cues]
+
+
+def random_rules(rng: random.Random) -> cue_timing.TimingRules:
+    return cue_timing.TimingRules(
+        merge_max_chars=rng.choice([None, 0, 1, 2, 4]),
+        merge_max_duration=rng.choice([0, 0, 200, 500]),
+        merge_max_gap=rng.choice([None, 0, 300]),
+        max_run=rng.choice([None, 2, 3]),
+        min_duration=rng.choice([0, 700, 1500]),
+        max_cps=rng.choice([None, 8, 17]),
+        close_gap=rng.choice([0, 100, 500]),
+        min_gap=rng.choice([0, 40, 100]),
+    )
+
+
+def check_timing(cues: list[Cue], min_gap: int = 0) -> list[str]:
+    """
+    fix_overlaps 결과가 지켜야 할 조건 검사 (위반 목록, 없으면 빈 목록)
+    - 시작 시간이 줄어들지 않음 (단조 증가)
+    - 종료 ≥ 시작
+    - 겹침 없음 (종료 ≤ 다음 시작, 가능하면 다음 시작 - min_gap 까지)
+    """
+    problems = []
+    n = len(cues)
+    starts = np.fromiter((cue.start for cue in cues), np.int64, n)
+    ends = np.fromiter((cue.end for cue in cues), np.int64, n)
+    checks = [
+        ("시작 시간 역전", starts[1:] < starts[:-1]),
+        ("종료 < 시작", ends < starts),
+        ("다음 자막과 겹침", ends[:-1] > starts[1:]),
+        # 시작끼리 min_gap 보다 가까우면 종료 = 시작 이 최선
+        ("최소 간격 부족", ends[:-1] > np.maximum(starts[1:] - min_gap, starts[:-1])),
+    ]
+    for label, bad in checks:
+        count = int(bad.sum())
+        if count:
+            first = int(np.flatnonzero(bad)[0])
+            problems.append(f"{label}: {count}개 (처음: {first + 1}번째 자막 {cues[first]!r})")
+    return problems
+
+
+def timing_violations(source: list[Cue], result: list[Cue], rules: cue_timing.TimingRules) -> list[str]:
+    """retime_cues 결과가 지켜야 할 성질 (위반 목록)"""
+    problems = check_timing(result, rules.min_gap)
+    # 텍스트는 순서대로 그대로 (병합은 줄바꿈/공백만 바뀜)
+    ordered = sorted(source, key=lambda c: c.start)
+    joined = "".join("".join(c.text.split()) for c in ordered)
+    if joined != "".join("".join(c.text.split()) for c in result):
+        problems.append("텍스트 누락/순서 바뀜")
+    # 최소 표시 시간 / 읽기 속도: 못 지켰으면 다음 자막 때문이어야 함
+    for i, cue in enumerate(result):
+        chars = len("".join(cue.text.split()))
+        need = rules.min_duration
+        if rules.max_cps:
+            need = max(need, math.ceil(chars * 1000 / rules.max_cps))
+        if cue.end - cue.start < need and i + 1 < len(result):
+            if cue.end < max(result[i + 1].start - rules.min_gap, cue.start):
+                problems.append(f"최소 시간/읽기 속도 미달: {cue!r}")
+                break
+        elif cue.end - cue.start < need:
+            problems.append(f"마지막 자막 시간 미달: {cue!r}")
+    return problems
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_legacy_rules_match_merge_single_char_cues(seed):
+    rng = random.Random(seed)
+    cues = make_timing_cues(rng.choice([0, 1, 2, 50, 2000]), seed,
+                            single_char_ratio=rng.choice([0.0, 0.15, 0.6, 1.0]))
+    legacy = list(merge_single_char_cues(copy_cues(cues)))
+    engine = cue_timing.retime_cues(copy_cues(cues), cue_timing.LEGACY_RULES)
+    assert engine == legacy
+    assert [cue.index for cue in engine] == [cue.index for cue in legacy]
+
+
+def test_full_rules_properties():
+    rules = cue_timing.TimingRules(merge_max_chars=1, merge_max_duration=300,
+                                   min_duration=700, max_cps=17, close_gap=200, min_gap=40)
+    cues = make_timing_cues(20000, 0)
+    result = cue_timing.retime_cues(copy_cues(cues), rules)
+    assert len(result) < len(cues)
+    assert timing_violations(cues, result, rules) == []
+
+
+@pytest.mark.parametrize("trial", range(TRIALS))
+def test_random_rules_properties(trial):
+    rng = random.Random(trial)
+    rules = random_rules(rng)
+    source = make_timing_cues(rng.randint(0, 300), seed=trial + 1,
+                              single_char_ratio=rng.choice([0.0, 0.15, 0.6]))
+    result = cue_timing.retime_cues(copy_cues(source), rules)
+    assert timing_violations(source, result, rules) == [], repr(rules)
+
+
+def test_check_timing_detects_violations():
+    cues = [Cue(1, 0, 2000, ["a"]), Cue(2, 1500, 1400, ["b"]), Cue(3, 1000, 3000, ["c"])]
+    labels = [problem.split(":")[0] for problem in check_timing(cues)]
+    assert labels == ["시작 시간 역전", "종료 < 시작", "다음 자막과 겹침", "최소 간격 부족"]
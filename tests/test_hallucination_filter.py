@@ -0,0 +1,47 @@
+"""번역 전 일본어 환각/반복 필터: fixtures/hallucination 의 예제가 기대 결과와 같은지"""
+
+from pathlib import Path
+
+import pytest
+
+from hallucination_filter import FilterStats, HallucinationFilter
+from srt_stream import Cue, decode_srt_bytes, merge_stages, read_srt, srt_to_string
+
+FIXTURE_DIR = Path(__file__).resolve().parent.parent / "fixtures" / "hallucination"
+FIXTURES = sorted(path for path in FIXTURE_DIR.glob("*.srt") if not path.name.endswith(".expected.srt"))
+
+
+@pytest.fixture(scope="module")
+def cue_filter():
+    return HallucinationFilter.from_template()
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=[path.stem for path in FIXTURES])
+def test_fixture_matches_expected(cue_filter, path):
+    cues = cue_filter.apply(merge_stages(read_srt(path)))
+    expected = decode_srt_bytes(path.with_suffix(".expected.srt").read_bytes())
+    assert srt_to_string(cues).strip() == expected.strip()
+
+
+def test_spaced_refrain_is_kept():
+    """window 개 자막보다 띄엄띄엄 되풀이되는 대사는 몇 번 나와도 버리지 않음"""
+    refrain = "気持ちいいよ、もっと"
+    others = [f"違う台詞その{i}です" for i in range(40)]
+    cues = []
+    for i in range(10):
+        for text in [refrain] + others[i * 4:i * 4 + 4]:
+            cues.append(Cue(len(cues) + 1, len(cues) * 1000, len(cues) * 1000 + 900, [text]))
+    stats = FilterStats()
+    result = HallucinationFilter().apply(cues, stats)
+    assert sum(cue.text == refrain for cue in result) == 10
+    assert stats.dropped == 0
+
+
+def test_alternating_loop_is_dropped():
+    """가까이에서 번갈아 도는 반복은 max_repeats 번까지만 남김"""
+    texts = ["そして戻ってきます。", "少し休憩してください。"] * 5
+    cues = [Cue(i + 1, i * 1000, i * 1000 + 900, [text]) for i, text in enumerate(texts)]
+    stats = FilterStats()
+    result = HallucinationFilter().apply(cues, stats)
+    assert len(result) == 4
+    assert stats.dropped == 6
@@ -0,0 +1,93 @@
+"""
+rate_limit 테스트
+
+- percentile 은 최근접 순위 (ceil(fraction * n) 번째 값)
+- SampleWindow 는 최근 값만 보관하고 횟수/합계/최대는 전체 누적
+- get_usage 는 일시 오류를 재시도하되 요청 지표/동시 요청 슬롯은 쓰지 않음
+"""
+
+import pytest
+
+from rate_limit import ClientMetrics, ResilientBackend, RetryPolicy, SampleWindow, percentile
+from translation import TranslationError
+
+
+@pytest.mark.parametrize("values, fraction, expected", [
+    ([], 0.5, 0.0),
+    ([7], 0.5, 7),
+    ([7], 0.95, 7),
+    ([1, 2], 0.5, 1),
+    ([1, 2], 0.95, 2),
+    (list(range(1, 7)), 0.5, 3),
+    (list(range(1, 21)), 0.95, 19),
+    (list(range(1, 101)), 0.5, 50),
+    (list(range(1, 101)), 0.95, 95),
+    (list(range(1, 11)), 0.0, 1),
+    (list(range(1, 11)), 1.0, 10),
+])
+def test_percentile_nearest_rank(values, fraction, expected):
+    assert percentile(values, fraction) == expected
+
+
+def test_sample_window_keeps_recent_values_and_running_totals():
+    window = SampleWindow(size=10)
+    window.extend(range(1, 101))
+    assert len(window.recent) == 10
+    info = window.summary()
+    assert (info["count"], info["total"], info["max"]) == (100, 5050, 100)
+    assert (info["p50"], info["p95"]) == (95, 100)
+
+
+def test_sample_window_empty():
+    info = SampleWindow().summary()
+    assert (info["count"], info["total"], info["p50"], info["p95"]) == (0, 0.0, 0.0, 0.0)
+
+
+class FlakyUsageBackend:
+    name = "flaky"
+    options = {}
+
+    def __init__(self, failures: int, retryable: bool = True):
+        self.failures = failures
+        self.retryable = retryable
+        self.calls = 0
+
+    def translate_batch(self, texts):
+        return list(texts)
+
+    def get_usage(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise TranslationError("Service unavailable", status=503, retryable=self.retryable)
+        return "usage"
+
+
+def make_resilient(backend, max_retries: int = 3) -> ResilientBackend:
+    return ResilientBackend(backend, retry=RetryPolicy(max_retries=max_retries, seed=0),
+                            metrics=ClientMetrics(), sleep=lambda _: None)
+
+
+def test_get_usage_retries_without_request_metrics():
+    backend = FlakyUsageBackend(failures=2)
+    resilient = make_resilient(backend)
+    assert resilient.get_usage() == "usage"
+    assert backend.calls == 3
+    info = resilient.metrics.summary()
+    assert (info["requests"], info["retries"], info["failures"]) == (0, 0, 0)
+    assert resilient.concurrency.peak == 0
+
+
+def test_get_usage_gives_up_after_max_retries():
+    backend = FlakyUsageBackend(failures=10)
+    resilient = make_resilient(backend, max_retries=2)
+    with pytest.raises(TranslationError):
+        resilient.get_usage()
+    assert backend.calls == 3
+    assert resilient.metrics.summary()["failures"] == 0
+
+
+def test_get_usage_does_not_retry_permanent_errors():
+    backend = FlakyUsageBackend(failures=1, retryable=False)
+    with pytest.raises(TranslationError):
+        make_resilient(backend).get_usage()
+    assert backend.calls == 1
@@ -0,0 +1,133 @@
+"""다중 바꾸기 규칙 체인: 트리거 디스패치/리터럴 빠른 경로가 순차 적용(apply_sequential)과 같은 결과인지"""
+
+import random
+import threading
+
+import pytest
+
+from benchmark import make_literal_corpus, make_rule_corpus
+from rule_engine import DEFAULT_TEMPLATE, Rule, RuleChain, RuleGroup, load_groups, load_rule_pack, save_rule_pack
+
+CORPUS_SIZE = 3000
+
+
+@pytest.fixture(scope="module")
+def groups():
+    return load_groups(DEFAULT_TEMPLATE)
+
+
+@pytest.fixture(scope="module", params=[True, False], ids=["literal", "regex"])
+def chain(request, groups):
+    return RuleChain(groups, literal_fast_path=request.param)
+
+
+@pytest.fixture(scope="module")
+def expected(groups):
+    """말뭉치별 (텍스트, 순차 적용 결과) 목록 (순차 적용은 느리므로 한 번만)"""
+    reference = RuleChain(groups)
+    return {make_corpus.__name__: [(text, reference.apply_sequential(text))
+                                   for text in make_corpus(reference, CORPUS_SIZE, 0)]
+            for make_corpus in (make_rule_corpus, make_literal_corpus)}
+
+
+@pytest.mark.parametrize("corpus", ["make_rule_corpus", "make_literal_corpus"], ids=["synthetic", "literal"])
+def test_template_matches_sequential(chain, expected, corpus):
+    pairs = expected[corpus]
+    mismatches = [(text, want, got) for text, want in pairs if (got := chain.apply(text)) != want]
+    assert not mismatches[:5]
+    # 규칙이 실제로 적용되는 말뭉치인지 (아무것도 안 바뀌면 동일성 확인이 의미 없음)
+    assert sum(text != want for text, want in pairs) > len(pairs) // 10
+
+
+def test_template_has_literal_fast_path(groups):
+    chain = RuleChain(groups)
+    assert any(rule.is_literal for rule in chain.rules)
+    assert chain._inert
+    assert not RuleChain(groups, literal_fast_path=False)._inert
+
+
+def test_rule_pack_state_matches(groups, tmp_path):
+    chain = RuleChain(groups)
+    path = tmp_path / "template.rulepack"
+    save_rule_pack(chain, path, "hash")
+    packed = load_rule_pack(path, "hash")
+    assert packed is not None and packed.fingerprint == chain.fingerprint
+    for text in make_literal_corpus(chain, 500, 3):
+        assert packed.apply(text) == chain.apply_sequential(text)
+
+
+def test_rule_pack_concurrent_save(groups, tmp_path):
+    """여러 작업자가 같은 팩을 동시에 저장해도 실패/반쯤 쓴 팩/남은 임시 파일 없음"""
+    chain = RuleChain(groups)
+    path = tmp_path / "template.rulepack"
+    barrier = threading.Barrier(8)
+    errors = []
+
+    def worker():
+        barrier.wait()
+        try:
+            for _ in range(5):
+                save_rule_pack(chain, path, "hash")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    packed = load_rule_pack(path, "hash")
+    assert packed is not None and packed.fingerprint == chain.fingerprint
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def _literal(position: int, find: str, replace: str) -> Rule:
+    return Rule("test", position, find, replace, search_type="CaseSensitive")
+
+
+def _small_chain() -> RuleChain:
+    """
+    0: ab → xy  (바꾼 "xy" 의 "y" 가 2번 규칙 트리거 "yz" 의 앞부분 → 재검사 필요)
+    1: cd → ee  (뒤 트리거와 겹치지 않음 → 재검사 생략)
+    2: yz → OK  (마지막 규칙)
+    3: 삭제 규칙은 양옆이 이어져 트리거가 생길 수 있어 재검사 필요
+    """
+    rules = [_literal(1, "ab", "xy"), _literal(2, "cd", "ee"), _literal(3, "yz", "OK"),
+             _literal(4, "-", ""), _literal(5, "OKOK", "!")]
+    return RuleChain([RuleGroup("test", True, rules)])
+
+
+def test_inert_literals():
+    chain = _small_chain()
+    assert chain.rules[0].is_literal
+    assert 0 not in chain._inert       # 새 트리거 "yz" 를 만들 수 있음
+    assert 1 in chain._inert
+    assert 3 not in chain._inert       # 삭제
+    assert 4 in chain._inert
+
+
+def test_inert_literal_skips_rescan(monkeypatch):
+    chain = _small_chain()
+    calls = []
+    candidates = chain.candidates
+    monkeypatch.setattr(chain, "candidates", lambda text, after=-1: calls.append(after) or candidates(text, after))
+
+    assert chain.apply("cdcd") == "eeee"
+    assert calls == [-1]               # 1번 규칙(inert) 치환 뒤 후보를 다시 계산하지 않음
+
+    calls.clear()
+    assert chain.apply("abz") == "xOK"  # 0번 규칙 치환이 2번 규칙 매칭을 새로 만듦
+    assert calls == [-1, 0, 2]
+
+
+def test_small_chain_matches_sequential():
+    chain = _small_chain()
+    regex_chain = RuleChain(chain.groups, literal_fast_path=False)
+    rng = random.Random(0)
+    pieces = ["ab", "cd", "yz", "y", "z", "-", "OK", "x", "a", "b"]
+    for _ in range(5000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 8)))
+        expected = chain.apply_sequential(text)
+        assert chain.apply(text) == expected, text
+        assert regex_chain.apply(text) == expected, text
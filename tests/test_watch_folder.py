@@ -0,0 +1,55 @@
+"""작업 대기열: 바뀐 내용은 flush()/close() 때 한 번에 저장, 재시작하면 처리 중이던 파일부터 복원"""
+
+import json
+
+from watch_folder import WorkQueue
+
+
+def make_sources(root, count: int) -> list:
+    paths = []
+    for i in range(count):
+        path = root / f"{i}.srt"
+        path.write_text("1\n00:00:01,000 --> 00:00:02,000\nあ\n", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def saved_paths(queue_path) -> list[str]:
+    return [item["path"] for item in json.loads(queue_path.read_text(encoding="utf-8"))["items"]]
+
+
+def test_queue_saves_on_flush_only(tmp_path):
+    queue_path = tmp_path / "queue.json"
+    queue = WorkQueue(tmp_path, queue_path)
+    first, second, third = make_sources(tmp_path, 3)
+    for size, path in enumerate((first, second, third)):
+        queue.put(path, size)
+    assert not queue_path.exists()
+
+    queue.flush()
+    assert saved_paths(queue_path) == ["0.srt", "1.srt", "2.srt"]
+
+    # 바뀐 것이 없으면 다시 쓰지 않음
+    queue_path.write_text("{}", encoding="utf-8")
+    queue.flush()
+    assert queue_path.read_text(encoding="utf-8") == "{}"
+
+    path, _ = queue.get(timeout=0)
+    queue.done(path)
+    queue.get(timeout=0)
+    queue.flush()
+    assert saved_paths(queue_path) == ["1.srt", "2.srt"]
+
+
+def test_queue_close_saves_and_restores_active_first(tmp_path):
+    queue_path = tmp_path / "queue.json"
+    queue = WorkQueue(tmp_path, queue_path)
+    paths = make_sources(tmp_path, 3)
+    for size, path in enumerate(paths):
+        queue.put(path, size)
+    active, _ = queue.get(timeout=0)
+    queue.close()
+
+    restored = WorkQueue(tmp_path, queue_path)
+    assert active == paths[0]
+    assert [restored.get(timeout=0)[0] for _ in range(3)] == paths
@@ -0,0 +1,522 @@
+"""
+번역 백엔드와 배치/동시 번역
+
+- 백엔드: translate_batch(texts) -> list[str] 와 get_usage() 를 가진 객체
+    DeepLBackend     : deepl.Translator 래퍼 (텍스트 목록 1개 = API 요청 1회)
+    CacheOnlyBackend : 번역 메모리에 있는 문장만 사용 (요청 없음, 나머지는 번역 실패 처리)
+    FakeBackend      : 네트워크 없이 지연만 흉내내는 테스트/벤치마크용 백엔드
+- BACKENDS / create_backend(): 이름으로 백엔드 선택 (deepl, cache, stub)
+  LazyBackend 는 처음 번역/사용량 조회할 때 실제 백엔드를 만듦 (import/시작 시 DeepL 초기화 없음)
+- translate_texts(): 번역 메모리 조회 → 중복 제거 → 문자 수/개수 예산으로 배치를 나누고
+  스레드 풀에서 동시에 번역 → 성공한 결과를 번역 메모리에 저장
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from translation_memory import normalize_source
+
+
+# 번역 실패 시 원문 앞에 붙이는 표시
+FAILURE_MARKER = "[번역 실패] "
+
+# DeepL 요청 한 번에 보낼 최대 텍스트 개수 / 문자 수
+# (DeepL 제한: 요청당 텍스트 50개, 본문 128 KiB → 일본어 UTF-8 3바이트 기준 여유 있게)
+DEFAULT_BATCH_ITEMS = 50
+DEFAULT_BATCH_CHARS = 20000
+
+# 동시에 보낼 최대 번역 요청 수
+DEFAULT_WORKERS = 4
+
+# AV 자막 특화 번역 옵션 (translate_text 인자)
+TRANSLATE_OPTIONS = dict(
+    source_lang="JA",                # 원본 언어: 일본어 고정
+    target_lang="KO",                # 목표 언어: 한국어
+    formality="prefer_less",         # 반말·캐주얼 톤 강하게 유도 (default보다 덜 격식)
+    model_type="quality_optimized",  # 최신 고품질 모델 강제 (응답은 느릴 수 있음)
+    context=(
+        "일본 AV 자막 번역입니다. "
+        "기본적으로 캐주얼한 반말을 사용하지만, 존댓말을 사용할 때는 -요 체의 부드러운 존댓말을 자연스럽게 섞어주세요. "
+        "♡ 같은 이모티콘을 분위기에 맞춰 적절히 추가하여 분위기를 살려주세요."
+    ),                               # 번역 품질 향상을 위한 맥락 지시 (청구 비용 없음)
+    preserve_formatting=True,        # 숫자, 공백, 기호(!?…, ♡ 등) 형식 유지
+    split_sentences="1",             # 구두점 + 줄바꿈 기준으로 문장 분할 (자막에 적합)
+)
+
+
+class TranslationError(Exception):
+    """
+    백엔드 번역 요청 실패 (API 오류, 네트워크 오류 등)
+
+    status    : HTTP 상태 코드 (알 수 없으면 None, 429 = 요청 과다)
+    retryable : 잠시 후 다시 시도하면 성공할 수 있는 오류인지 (429, 5xx, 연결 오류)
+    """
+
+    def __init__(self, message: str, status: int | None = None, retryable: bool = False):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+
+    @property
+    def throttled(self) -> bool:
+        return self.status == 429
+
+
+class TranslationStats:
+    """translate_texts() 집계 (보통 파일 하나 단위)"""
+
+    __slots__ = ("texts", "requests", "characters", "cache_hits", "cache_misses", "duplicates",
+                 "saved_characters", "failures", "batch_times")
+
+    def __init__(self):
+        self.texts = 0              # 번역 대상 텍스트 수 (빈 텍스트 제외)
+        self.requests = 0           # 백엔드 요청 수 (배치 수)
+        self.characters = 0         # 번역에 성공해 청구되는 문자 수
+        self.cache_hits = 0         # 번역 메모리에서 찾은 텍스트 수
+        self.cache_misses = 0       # 번역 메모리에 없던 텍스트 수 (번역 메모리를 쓸 때만 셈)
+        self.duplicates = 0         # 같은 호출 안에서 중복이라 다시 보내지 않은 텍스트 수
+        self.saved_characters = 0   # 캐시/중복 제거로 보내지 않은 문자 수
+        self.failures = 0           # 번역 실패 텍스트 수
+        self.batch_times = []       # 배치(요청)별 번역 시간 (초, 재시도/대기 포함)
+
+
+def fake_translate(text: str) -> str:
+    """가짜 번역: 각 줄 앞에 [KO] 를 붙임 (줄 구조 유지)"""
+    return "\n".join(f"[KO] {line}" for line in text.split("\n"))
+
+
+# ────────────────────────────────────────────────────────────────
+# 1. 번역 백엔드
+# ────────────────────────────────────────────────────────────────
+
+class DeepLBackend:
+    """
+    deepl.Translator 를 감싼 백엔드
+
+    network_retries: deepl 클라이언트 내부 재시도 횟수 (0 이면 429/5xx 를 바로 올려서
+    rate_limit.ResilientBackend 가 재시도/동시 요청 수를 직접 조절)
+    deepl 은 이 값을 Translator 마다가 아니라 모듈 전역(deepl.http_client.max_network_retries)으로만
+    받으므로, 이 백엔드의 요청이 진행 중일 때만 바꾸고 마지막 요청이 끝나면 원래 값으로 되돌립니다.
+    (그 사이 같은 프로세스에서 deepl 을 직접 쓰는 다른 코드도 같은 값을 봄)
+    """
+
+    name = "deepl"
+    metered = True              # 문자 수로 청구됨 (실행 전 한도 확인)
+    options = TRANSLATE_OPTIONS
+
+    # 진행 중인 요청 수 / 바꾸기 전 전역 값 (모든 DeepLBackend 가 공유)
+    _retries_lock = threading.Lock()
+    _retries_active = 0
+    _retries_saved = None
+
+    def __init__(self, api_key: str, server_url: str | None = None,
+                 network_retries: int | None = None, **options):
+        import deepl  # 선택 의존성: DeepL 을 실제로 쓸 때만 필요
+
+        self._deepl = deepl
+        self.network_retries = network_retries
+        self.translator = deepl.Translator(api_key, server_url=server_url)
+        self.options = {**TRANSLATE_OPTIONS, **options}
+
+    @contextmanager
+    def _retries(self):
+        """요청 하나 동안 deepl 전역 재시도 횟수를 network_retries 로 (None 이면 그대로)"""
+        if self.network_retries is None:
+            yield
+            return
+        http_client = self._deepl.http_client
+        cls = DeepLBackend
+        with cls._retries_lock:
+            if cls._retries_active == 0:
+                cls._retries_saved = http_client.max_network_retries
+            cls._retries_active += 1
+            http_client.max_network_retries = self.network_retries
+        try:
+            yield
+        finally:
+            with cls._retries_lock:
+                cls._retries_active -= 1
+                if cls._retries_active == 0:
+                    http_client.max_network_retries = cls._retries_saved
+                    cls._retries_saved = None
+
+    def _error(self, e) -> TranslationError:
+        """deepl 예외 → TranslationError (상태 코드/재시도 가능 여부 포함)"""
+        deepl = self._deepl
+        status = getattr(e, "http_status_code", None)
+        if isinstance(e, deepl.TooManyRequestsException):
+            status = 429
+        elif isinstance(e, deepl.QuotaExceededException):
+            status = 456
+        retryable = (status == 429 or (status is not None and status >= 500)
+                     or isinstance(e, deepl.ConnectionException)
+                     or bool(getattr(e, "should_retry", False)))
+        return TranslationError(str(e), status=status, retryable=retryable)
+
+    def translate_batch(self, texts: list[str]) -> list[str]:
+        try:
+            with self._retries():
+                results = self.translator.translate_text(texts, **self.options)
+        except self._deepl.DeepLException as e:
+            raise self._error(e) from e
+        return [result.text.strip() for result in results]
+
+    def get_usage(self):
+        try:
+            with self._retries():
+                return self.translator.get_usage()
+        except self._deepl.DeepLException as e:
+            raise self._error(e) from e
+
+
+class FakeBackend:
+    """
+    네트워크 없이 동작하는 가짜 백엔드
+    요청마다 latency 초 대기 후 "[KO] 원문" 을 돌려줍니다. (줄 구조 유지)
+
+    throttle_rate / error_rate 비율만큼 429 / 503 오류를 흉내냅니다. (재시도 테스트용)
+    """
+
+    name = "fake"
+    metered = True
+    # 가짜 번역이 DeepL 번역과 같은 번역 메모리/매니페스트 키로 저장되지 않도록 설정을 구분
+    options = {**TRANSLATE_OPTIONS, "backend": "fake"}
+
+    def __init__(self, latency: float = 0.0, per_char_latency: float = 0.0,
+                 character_limit: int = 500000, throttle_rate: float = 0.0,
+                 error_rate: float = 0.0, seed: int | None = None):
+        self.latency = latency
+        self.per_char_latency = per_char_latency
+        self.character_limit = character_limit
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.options = dict(FakeBackend.options)
+        self.requests = 0
+        self.characters = 0
+        self.throttled = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def translate_batch(self, texts: list[str]) -> list[str]:
+        chars = sum(len(t) for t in texts)
+        with self._lock:
+            roll = self._random.random()
+            if roll < self.throttle_rate:
+                self.throttled += 1
+                raise TranslationError("Too many requests", status=429, retryable=True)
+            if roll < self.throttle_rate + self.error_rate:
+                self.errors += 1
+                raise TranslationError("Service unavailable", status=503, retryable=True)
+        time.sleep(self.latency + self.per_char_latency * chars)
+        with self._lock:
+            self.requests += 1
+            self.characters += chars
+        return [fake_translate(text) for text in texts]
+
+    def get_usage(self):
+        character = SimpleNamespace(valid=True, count=self.characters, limit=self.character_limit)
+        return SimpleNamespace(character=character,
+                               any_limit_reached=self.characters >= self.character_limit)
+
+
+class CacheOnlyBackend:
+    """
+    번역 메모리 전용 백엔드 (API 요청 없음)
+    translate_texts(memory=...) 가 메모리에서 찾은 문장은 백엔드까지 오지 않으므로,
+    여기로 온 문장은 모두 메모리에 없는 것 → 번역 실패 표시 (다음에 DeepL 로 실행하면 그 자막만 번역)
+    """
+
+    name = "cache"
+    metered = False
+    options = TRANSLATE_OPTIONS     # DeepL 과 같은 설정 → 같은 번역 메모리 항목을 사용
+
+    def translate_batch(self, texts: list[str]) -> list[str]:
+        raise TranslationError(f"번역 메모리에 없는 문장 {len(texts)}개 (cache 백엔드는 번역 요청을 보내지 않음)")
+
+    def get_usage(self):
+        character = SimpleNamespace(valid=False, count=0, limit=0)
+        return SimpleNamespace(character=character, any_limit_reached=False)
+
+
+# 백엔드 이름 → 클래스 (또는 같은 속성(name/metered/options)을 가진 팩토리)
+BACKENDS = {
+    "deepl": DeepLBackend,
+    "cache": CacheOnlyBackend,
+    "stub": FakeBackend,
+}
+
+
+def register_backend(name: str, factory):
+    """백엔드 등록 (다른 도구에서 자체 백엔드를 추가할 때)"""
+    BACKENDS[name] = factory
+
+
+def create_backend(name: str, **kwargs):
+    """이름으로 백엔드 생성 (kwargs 는 생성자 인자)"""
+    try:
+        factory = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"알 수 없는 번역 백엔드: {name} (사용 가능: {', '.join(BACKENDS)})") from None
+    return factory(**kwargs)
+
+
+class LazyBackend:
+    """
+    처음 번역/사용량 조회할 때 실제 백엔드를 만드는 래퍼
+    name/metered/options 는 만들기 전에도 알 수 있어서 매니페스트/번역 메모리 키 계산에 바로 사용
+
+    configure: 생성자 인자를 돌려주는 함수 (.env 읽기 등, 백엔드를 만들 때 한 번만 호출)
+    생성에 실패하면 TranslationError (재시도 불가) → 다음 호출 때 다시 시도
+    """
+
+    def __init__(self, name: str, configure=None):
+        factory = BACKENDS.get(name)
+        if factory is None:
+            raise ValueError(f"알 수 없는 번역 백엔드: {name} (사용 가능: {', '.join(BACKENDS)})")
+        self.name = factory.name
+        self.metered = getattr(factory, "metered", True)
+        self.options = dict(factory.options)
+        self._key = name
+        self._configure = configure
+        self._backend = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        with self._lock:
+            if self._backend is None:
+                try:
+                    kwargs = self._configure() if self._configure is not None else {}
+                    self._backend = create_backend(self._key, **kwargs)
+                except TranslationError:
+                    raise
+                except Exception as e:
+                    raise TranslationError(f"{self._key} 초기화 실패: {e}") from e
+                print(f"번역 백엔드 초기화 성공: {self._key}")
+            return self._backend
+
+    @property
+    def ready(self) -> bool:
+        """실제 백엔드가 만들어졌는지"""
+        return self._backend is not None
+
+    def translate_batch(self, texts: list[str]) -> list[str]:
+        return self.backend.translate_batch(texts)
+
+    def get_usage(self):
+        return self.backend.get_usage()
+
+
+# ────────────────────────────────────────────────────────────────
+# 2. 배치 분할
+# ────────────────────────────────────────────────────────────────
+
+def make_batches(indices: list[int], texts: list[str],
+                 max_chars: int = DEFAULT_BATCH_CHARS,
+                 max_items: int = DEFAULT_BATCH_ITEMS) -> list[list[int]]:
+    """
+    번역할 텍스트 번호를 순서대로 묶어 배치 목록을 만듭니다.
+    한 배치의 텍스트 수는 max_items, 문자 수 합계는 max_chars 를 넘지 않습니다.
+    (max_chars 보다 긴 텍스트 하나는 단독 배치)
+    """
+    batches = []
+    current = []
+    current_chars = 0
+    for i in indices:
+        size = len(texts[i])
+        if current and (len(current) >= max_items or current_chars + size > max_chars):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(i)
+        current_chars += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+# ────────────────────────────────────────────────────────────────
+# 3. 배치 + 동시 번역
+# ────────────────────────────────────────────────────────────────
+
+def _translate_batch(backend, batch: list[str]) -> tuple[list[str], bool, float]:
+    """
+    배치 하나 번역. 실패하면 각 텍스트에 실패 표시를 붙여 반환
+    (결과, 성공 여부, 걸린 시간)
+    """
+    start = time.perf_counter()
+    try:
+        translated = backend.translate_batch(batch)
+        if len(translated) != len(batch):
+            raise TranslationError(f"응답 개수 불일치 ({len(translated)} != {len(batch)})")
+        return translated, True, time.perf_counter() - start
+    except TranslationError as e:
+        print(f"번역 오류 발생: {e}")
+        return [f"{FAILURE_MARKER}{text}" for text in batch], False, time.perf_counter() - start
+
+
+def translate_texts(texts: list[str], backend,
+                    executor: Executor | None = None,
+                    max_workers: int = DEFAULT_WORKERS,
+                    max_chars: int = DEFAULT_BATCH_CHARS,
+                    max_items: int = DEFAULT_BATCH_ITEMS,
+                    memory=None,
+                    stats: TranslationStats | None = None) -> list[str]:
+    """
+    여러 텍스트(자막 블록)를 배치로 묶어 동시에 번역합니다.
+
+    Args:
+        texts: 번역할 텍스트 목록 (여러 줄 텍스트 가능)
+        backend: 번역 백엔드
+        executor: 공유 스레드 풀 (여러 파일이 동시 요청 수를 함께 제한할 때). 없으면 새로 만듦
+        max_workers: executor 가 없을 때 동시 요청 수
+        memory: 번역 메모리 (TranslationMemory). 있으면 조회 후 없는 것만 요청하고 결과 저장
+        stats: 요청 수/청구 문자 수/캐시 적중 등을 누적할 객체
+
+    Returns:
+        list[str]: 입력과 같은 순서의 번역 결과. 빈 텍스트는 그대로 반환
+    """
+    if stats is None:
+        stats = TranslationStats()
+
+    results = list(texts)
+    pending = [i for i, text in enumerate(texts) if text.strip()]
+    stats.texts += len(pending)
+    if not pending:
+        return results
+
+    # 키: 번역 메모리를 쓰면 정규화 원문, 아니면 원문 그대로
+    keys = {i: normalize_source(texts[i]) if memory is not None else texts[i] for i in pending}
+
+    # 1. 번역 메모리 조회
+    if memory is not None:
+        found = memory.get_many(list(keys.values()))
+        remaining = []
+        for i in pending:
+            if keys[i] in found:
+                results[i] = found[keys[i]]
+                stats.cache_hits += 1
+                stats.saved_characters += len(texts[i])
+            else:
+                remaining.append(i)
+        stats.cache_misses += len(remaining)
+        pending = remaining
+
+    # 2. 같은 문장은 한 번만 요청 (첫 번째 텍스트 대표)
+    owners = {}
+    for i in pending:
+        if keys[i] in owners:
+            stats.duplicates += 1
+            stats.saved_characters += len(texts[i])
+        else:
+            owners[keys[i]] = i
+    send = list(owners.values())
+    if not send:
+        return results
+
+    batches = make_batches(send, texts, max_chars, max_items)
+    learned = {}
+
+    def collect(batch, translated, ok, elapsed):
+        stats.requests += 1
+        stats.batch_times.append(elapsed)
+        if ok:
+            stats.characters += sum(len(texts[i]) for i in batch)
+        else:
+            stats.failures += len(batch)    # 실패한 요청은 청구되지 않음
+        for i, text in zip(batch, translated):
+            results[i] = text
+            if ok:
+                learned[keys[i]] = text
+
+    # 3. 배치 번역 (공유 풀 / 임시 풀 / 직렬)
+    if executor is None and (len(batches) == 1 or max_workers <= 1):
+        for batch in batches:
+            collect(batch, *_translate_batch(backend, [texts[i] for i in batch]))
+    else:
+        pool = executor or ThreadPoolExecutor(max_workers=min(max_workers, len(batches)))
+        try:
+            futures = [(batch, pool.submit(_translate_batch, backend, [texts[i] for i in batch]))
+                       for batch in batches]
+            for batch, future in futures:
+                collect(batch, *future.result())
+        finally:
+            if executor is None:
+                pool.shutdown()
+
+    # 4. 중복 텍스트에 대표 결과 복사 + 성공한 번역은 메모리에 저장
+    for i in pending:
+        results[i] = results[owners[keys[i]]]
+    if memory is not None:
+        memory.put_many(learned)
+    return results
+
+
+def estimate_texts(texts: list[str],
+                   max_chars: int = DEFAULT_BATCH_CHARS,
+                   max_items: int = DEFAULT_BATCH_ITEMS,
+                   memory=None) -> tuple[int, int]:
+    """
+    translate_texts() 가 실제로 보낼 (청구 문자 수, 요청 수) 를 미리 계산합니다.
+    번역 메모리는 조회만 하고 적중 통계/사용 시각은 바꾸지 않습니다.
+    """
+    pending = [i for i, text in enumerate(texts) if text.strip()]
+    keys = {i: normalize_source(texts[i]) if memory is not None else texts[i] for i in pending}
+    if memory is not None:
+        known = memory.contains_many(list(keys.values()))
+        pending = [i for i in pending if keys[i] not in known]
+
+    owners = {}
+    for i in pending:
+        owners.setdefault(keys[i], i)
+    send = list(owners.values())
+    return sum(len(texts[i]) for i in send), len(make_batches(send, texts, max_chars, max_items))
+
+
+def translate_cues(cues, backend, window: int | None = None, **options):
+    """
+    Cue 스트림 번역 단계 (generator)
+
+    Cue 를 window 개씩 모아 translate_texts() 로 번역한 뒤 순서대로 내보냅니다.
+    window 가 None 이면 전부 모은 뒤 한 번에 번역합니다 (파일 하나 단위, 배치 효율 최대).
+    나머지 인자(executor, memory, stats 등)는 translate_texts() 로 그대로 전달됩니다.
+    """
+    buffer = []
+
+    def flush():
+        translated = translate_texts([cue.text for cue in buffer], backend, **options)
+        for cue, text in zip(buffer, translated):
+            cue.lines = text.splitlines()
+        return buffer
+
+    for cue in cues:
+        buffer.append(cue)
+        if window is not None and len(buffer) >= window:
+            yield from flush()
+            buffer = []
+    if buffer:
+        yield from flush()
+
+
+def retry_failures(cues, backend, **options) -> int:
+    """
+    번역 실패 표시가 붙은 자막만 원문으로 되돌려 다시 번역합니다. (후처리 재시도)
+    나머지 인자는 translate_texts() 로 그대로 전달됩니다.
+
+    Returns:
+        int: 이번에 번역에 성공한 자막 수
+    """
+    failed = [cue for cue in cues if cue.text.startswith(FAILURE_MARKER)]
+    if not failed:
+        return 0
+    originals = [cue.text[len(FAILURE_MARKER):] for cue in failed]
+    fixed = 0
+    for cue, text in zip(failed, translate_texts(originals, backend, **options)):
+        cue.lines = text.splitlines()
+        fixed += not text.startswith(FAILURE_MARKER)
+    return fixed
@@ -0,0 +1,308 @@
+"""
+번역 메모리 (디스크 캐시)
+
+같은 일본어 문장(신음, 감탄사, 반복되는 짧은 대사)을 DeepL 에 다시 보내지 않도록
+정규화한 원문 + 번역 옵션(formality, context, model_type 등)을 키로 번역 결과를 저장합니다.
+
+- SQLite (WAL 모드) 파일 하나에 저장, 여러 스레드에서 안전하게 사용
+- 메모리 LRU 캐시를 앞단에 두어 자주 쓰는 문장은 DB 조회 없이 바로 반환
+- 최대 항목 수를 넘으면 가장 오래 사용하지 않은 항목부터 삭제
+
+사용법:
+    python translation_memory.py stats
+    python translation_memory.py export 백업.jsonl
+    python translation_memory.py import 백업.jsonl
+    python translation_memory.py prune --max-entries 100000
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+
+# 기본 DB 경로 (환경변수 TRANSLATION_MEMORY_PATH 로 변경 가능)
+DEFAULT_MEMORY_PATH = Path(
+    os.getenv("TRANSLATION_MEMORY_PATH") or Path(__file__).with_name("translation_memory.db")
+)
+
+# DB 최대 항목 수 (초과 시 오래된 항목부터 10% 정리)
+DEFAULT_MAX_ENTRIES = 1_000_000
+
+# 메모리 LRU 캐시 크기
+DEFAULT_FRONT_ENTRIES = 20000
+
+# 캐시 키에 포함할 번역 옵션 (결과에 영향을 주는 것만)
+KEY_OPTIONS = ("source_lang", "target_lang", "formality", "context", "model_type")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memory (
+    params      TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    created     REAL NOT NULL,
+    last_used   REAL NOT NULL,
+    hits        INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (params, source)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS memory_last_used ON memory (last_used);
+"""
+
+
+def normalize_source(text: str) -> str:
+    """
+    캐시 키용 원문 정규화
+    - NFKC (전각/반각 통일)
+    - 줄마다 앞뒤 공백 제거, 연속 공백은 하나로 (줄 구조는 유지)
+    """
+    text = unicodedata.normalize("NFKC", text)
+    lines = (re.sub(r"\s+", " ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def params_key(options: dict) -> str:
+    """번역 옵션 중 결과에 영향을 주는 값들의 해시 (짧은 16진 문자열)"""
+    subset = {name: options.get(name) for name in KEY_OPTIONS}
+    # 가짜 번역 등 DeepL 이 아닌 백엔드는 따로 구분 (DeepL 설정에는 이 값이 없어 기존 키 그대로)
+    if options.get("backend"):
+        subset["backend"] = options["backend"]
+    data = json.dumps(subset, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+
+class TranslationMemory:
+    """
+    정규화 원문 → 번역 결과 저장소
+
+    한 인스턴스는 한 가지 번역 옵션(params)에 대해서만 조회/저장합니다.
+    """
+
+    def __init__(self, path: Path = DEFAULT_MEMORY_PATH, options: dict | None = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 front_entries: int = DEFAULT_FRONT_ENTRIES):
+        self.path = Path(path)
+        self.params = params_key(options or {})
+        self.max_entries = max_entries
+        self.front_entries = front_entries
+
+        self._front = OrderedDict()        # 메모리 LRU: 정규화 원문 → 번역
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._count = self._conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+
+    def __len__(self):
+        return self._count
+
+    # ── 메모리 LRU ──────────────────────────────────────────────
+
+    def _remember(self, source: str, translation: str):
+        self._front[source] = translation
+        self._front.move_to_end(source)
+        while len(self._front) > self.front_entries:
+            self._front.popitem(last=False)
+
+    # ── 조회 / 저장 ─────────────────────────────────────────────
+
+    def get_many(self, sources: list[str]) -> dict:
+        """
+        정규화된 원문 목록을 조회합니다.
+
+        Returns:
+            dict: 찾은 항목만 {정규화 원문: 번역}
+        """
+        found = {}
+        with self._lock:
+            missing = []
+            for source in dict.fromkeys(sources):
+                if source in self._front:
+                    self._front.move_to_end(source)
+                    found[source] = self._front[source]
+                else:
+                    missing.append(source)
+
+            # SQLite 변수 개수 제한을 피해 나눠서 조회
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT source, translation FROM memory WHERE params = ? AND source IN ({marks})",
+                    [self.params, *chunk],
+                )
+                for source, translation in rows:
+                    found[source] = translation
+                    self._remember(source, translation)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE memory SET last_used = ?, hits = hits + 1 WHERE params = ? AND source = ?",
+                    [(now, self.params, source) for source in found],
+                )
+                self._conn.commit()
+
+        return found
+
+    def contains_many(self, sources: list[str]) -> set:
+        """저장된 원문만 골라 반환 (예상 계산용: 적중 통계와 사용 시각은 바꾸지 않음)"""
+        with self._lock:
+            found = {source for source in sources if source in self._front}
+            missing = [source for source in dict.fromkeys(sources) if source not in found]
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT source FROM memory WHERE params = ? AND source IN ({marks})",
+                    [self.params, *chunk],
+                )
+                found.update(source for source, in rows)
+        return found
+
+    def put_many(self, items: dict):
+        """{정규화 원문: 번역} 을 저장합니다. 최대 항목 수를 넘으면 오래된 항목 정리"""
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO memory (params, source, translation, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(self.params, source, translation, now, now) for source, translation in items.items()],
+            )
+            self._count += self._conn.total_changes - before
+            for source, translation in items.items():
+                self._remember(source, translation)
+            if self._count > self.max_entries:
+                self._evict(int(self.max_entries * 0.9))
+            self._conn.commit()
+
+    def _evict(self, keep: int):
+        """가장 오래 사용하지 않은 항목부터 삭제해 keep 개만 남김 (lock 안에서 호출)"""
+        remove = self._count - keep
+        if remove <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM memory WHERE (params, source) IN "
+            "(SELECT params, source FROM memory ORDER BY last_used LIMIT ?)",
+            (remove,),
+        )
+        self._count = self._conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+        self._front.clear()
+
+    def prune(self, max_entries: int) -> int:
+        """항목 수를 max_entries 이하로 줄이고 삭제한 개수를 반환"""
+        with self._lock:
+            before = self._count
+            self._evict(max_entries)
+            self._conn.commit()
+            return before - self._count
+
+    # ── 내보내기 / 가져오기 ─────────────────────────────────────
+
+    def export_jsonl(self, path: Path) -> int:
+        """모든 번역 옵션의 항목을 JSON Lines 로 내보냄"""
+        count = 0
+        with self._lock, open(path, "w", encoding="utf-8") as f:
+            rows = self._conn.execute(
+                "SELECT params, source, translation, created, last_used, hits FROM memory"
+            )
+            for params, source, translation, created, last_used, hits in rows:
+                f.write(json.dumps({
+                    "params": params, "source": source, "translation": translation,
+                    "created": created, "last_used": last_used, "hits": hits,
+                }, ensure_ascii=False) + "\n")
+                count += 1
+        return count
+
+    def import_jsonl(self, path: Path) -> int:
+        """JSON Lines 를 가져옴 (이미 있는 항목은 유지). 추가된 개수를 반환"""
+        now = time.time()
+        rows = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                rows.append((
+                    item.get("params", self.params), normalize_source(item["source"]),
+                    item["translation"], item.get("created", now),
+                    item.get("last_used", now), item.get("hits", 0),
+                ))
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO memory (params, source, translation, created, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            added = self._conn.total_changes - before
+            self._count += added
+            self._conn.commit()
+        return added
+
+    def stats(self) -> dict:
+        """DB 전체 통계"""
+        with self._lock:
+            total, hits = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM memory"
+            ).fetchone()
+            groups = self._conn.execute("SELECT COUNT(DISTINCT params) FROM memory").fetchone()[0]
+        size = sum(p.stat().st_size for p in self.path.parent.glob(self.path.name + "*"))
+        return {"entries": total, "stored_hits": hits, "param_sets": groups, "bytes": size}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ────────────────────────────────────────────────────────────────
+# 명령줄 실행 (통계 / 내보내기 / 가져오기 / 정리)
+# ────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="번역 메모리 관리")
+    parser.add_argument("--db", type=Path, default=DEFAULT_MEMORY_PATH, help="번역 메모리 DB 경로")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="항목 수 / 크기 출력")
+    export = sub.add_parser("export", help="JSON Lines 로 내보내기")
+    export.add_argument("output", type=Path)
+    imp = sub.add_parser("import", help="JSON Lines 가져오기")
+    imp.add_argument("input", type=Path)
+    prune = sub.add_parser("prune", help="오래된 항목 정리")
+    prune.add_argument("--max-entries", type=int, required=True)
+    args = parser.parse_args()
+
+    from translation import TRANSLATE_OPTIONS
+
+    memory = TranslationMemory(args.db, TRANSLATE_OPTIONS)
+    try:
+        if args.command == "stats":
+            info = memory.stats()
+            print(f"번역 메모리: {args.db}")
+            print(f"  항목 수: {info['entries']:,} (옵션 조합 {info['param_sets']}개)")
+            print(f"  누적 재사용: {info['stored_hits']:,}회")
+            print(f"  파일 크기: {info['bytes'] / 1024 / 1024:.1f} MB")
+        elif args.command == "export":
+            print(f"내보내기 완료: {memory.export_jsonl(args.output):,}개 → {args.output}")
+        elif args.command == "import":
+            print(f"가져오기 완료: {memory.import_jsonl(args.input):,}개 추가")
+        elif args.command == "prune":
+            print(f"정리 완료: {memory.prune(args.max_entries):,}개 삭제")
+    finally:
+        memory.close()
+
+
+if __name__ == "__main__":
+    main()
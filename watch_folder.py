@@ -0,0 +1,653 @@
+"""
+폴더 감시 (데몬 모드)
+
+자막 파일이 계속 들어오는 폴더를 매번 전체 rglob 로 다시 훑지 않고,
+바뀐 파일만 찾아 처리합니다.
+
+    감시기 (inotify / 폴링) → 안정화 대기 (쓰는 중인 파일 제외) → 작업 대기열 (우선순위, 크기 제한) → 작업자 스레드
+
+- InotifyWatcher : Linux inotify (ctypes, 추가 의존성 없음). 새로 생긴 하위 폴더도 자동으로 감시
+- PollingWatcher : 그 외 환경. 매번 폴더 mtime 만 확인해 바뀐 폴더만 다시 읽고,
+                   가끔(rescan_every 회마다) 전체 파일 크기/수정 시각 스냅샷을 비교 (제자리 수정 감지)
+- Debouncer      : 크기/수정 시각이 settle 초 동안 그대로인 파일만 '도착 완료'로 넘김
+- WorkQueue      : 우선순위 대기열 (재시도 횟수 → 작은 파일 / 도착 순), 크기 제한,
+                   감시 주기마다 바뀐 경우에만 .srt_watch_queue.json 에 저장
+                   → 재시작하면 남은 작업(처리 중이던 것 포함)부터 이어서
+- WatchDaemon    : 위를 묶어 작업자 스레드에서 handler(path) 실행,
+                   .srt_watch_status.json 에 대기열 길이/처리량 등 상태 기록
+
+이미 처리한 파일인지는 accept(path) 로 호출 쪽(매니페스트)이 판단합니다.
+(재시작 시 처음 한 번은 전체를 훑지만 처리할 필요가 없는 파일은 대기열에 넣지 않음)
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import heapq
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from backup_store import BACKUP_DIR_NAME
+
+
+QUEUE_NAME = ".srt_watch_queue.json"
+STATUS_NAME = ".srt_watch_status.json"
+
+# 대기열 우선순위 (재시도 횟수가 적은 것이 항상 먼저)
+PRIORITY_SMALLEST = "smallest"   # 작은 파일 먼저 (짧은 자막이 오래 기다리지 않음)
+PRIORITY_FIFO = "fifo"           # 도착 순
+PRIORITIES = (PRIORITY_SMALLEST, PRIORITY_FIFO)
+
+DEFAULT_SETTLE = 5.0         # 이 시간(초) 동안 크기/수정 시각이 그대로면 쓰기가 끝난 것으로 봄
+DEFAULT_INTERVAL = 1.0       # 감시 주기 (초)
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_MAX_ATTEMPTS = 3     # handler 예외 시 최대 시도 횟수
+THROUGHPUT_WINDOW = 300.0    # 처리량 계산 구간 (초)
+SKIP_DIRS = {BACKUP_DIR_NAME}  # 감시하지 않는 폴더 (백업 저장소)
+
+
+def _walk(root: Path) -> tuple[list[Path], list[Path]]:
+    """(하위 폴더 포함 모든 폴더, 모든 파일) - 사라진 폴더와 SKIP_DIRS 는 건너뜀"""
+    dirs, files = [], []
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        if directory.name in SKIP_DIRS:
+            continue
+        try:
+            entries = list(os.scandir(directory))
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        dirs.append(directory)
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(Path(entry.path))
+            elif entry.is_file():
+                files.append(Path(entry.path))
+    return dirs, files
+
+
+# ────────────────────────────────────────────────────────────────
+# 1. 감시기
+# ────────────────────────────────────────────────────────────────
+
+class PollingWatcher:
+    """
+    스냅샷 비교 폴링 감시기 (모든 환경)
+
+    파일이 생기거나 지워지거나 이름이 바뀌면 그 폴더의 mtime 이 바뀌므로 보통은 폴더만 stat 하고,
+    제자리에서 다시 쓴 파일(폴더 mtime 그대로)은 rescan_every 회마다 전체 스냅샷 비교로 찾습니다.
+    """
+
+    name = "polling"
+
+    def __init__(self, root: Path, rescan_every: int = 30):
+        self.root = Path(root)
+        self.rescan_every = rescan_every
+        self._dirs = {}       # 폴더 → mtime_ns
+        self._files = {}      # 파일 → (크기, mtime_ns)
+        self._polls = 0
+
+    def _snapshot_dir(self, directory: Path) -> set[Path]:
+        """폴더 하나를 다시 읽어 새로/바뀐 파일 반환 (새 하위 폴더는 통째로)"""
+        changed = set()
+        try:
+            self._dirs[directory] = os.stat(directory).st_mtime_ns
+            entries = list(os.scandir(directory))
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            self._dirs.pop(directory, None)
+            return changed
+        for entry in entries:
+            path = Path(entry.path)
+            if entry.is_dir(follow_symlinks=False):
+                if path not in self._dirs:
+                    changed |= self._add_tree(path)
+            elif entry.is_file():
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                snapshot = (st.st_size, st.st_mtime_ns)
+                if self._files.get(path) != snapshot:
+                    self._files[path] = snapshot
+                    changed.add(path)
+        return changed
+
+    def _add_tree(self, root: Path) -> set[Path]:
+        dirs, _ = _walk(root)
+        changed = set()
+        for directory in dirs:
+            changed |= self._snapshot_dir(directory)
+        return changed
+
+    def scan(self) -> set[Path]:
+        """처음 전체 스냅샷 (모든 파일 반환)"""
+        self._dirs.clear()
+        self._files.clear()
+        return self._add_tree(self.root)
+
+    def poll(self, timeout: float) -> set[Path]:
+        """timeout 초 대기 후 바뀐(새로 생긴) 파일 목록"""
+        time.sleep(timeout)
+        self._polls += 1
+        changed = set()
+        for directory, mtime in list(self._dirs.items()):
+            try:
+                current = os.stat(directory).st_mtime_ns
+            except FileNotFoundError:
+                current = None
+            if current != mtime:
+                changed |= self._snapshot_dir(directory)
+
+        if self.rescan_every and self._polls % self.rescan_every == 0:
+            for path, snapshot in list(self._files.items()):
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    del self._files[path]
+                    continue
+                if (st.st_size, st.st_mtime_ns) != snapshot:
+                    self._files[path] = (st.st_size, st.st_mtime_ns)
+                    changed.add(path)
+        return changed
+
+    def close(self):
+        pass
+
+
+# inotify 상수 (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """
+    Linux inotify 감시기 (ctypes 로 libc 직접 호출)
+    폴더마다 watch 를 걸고, 새 하위 폴더가 생기면 그 폴더도 추가합니다.
+    이벤트 대기열이 넘치면(IN_Q_OVERFLOW) 전체를 다시 훑습니다.
+    """
+
+    name = "inotify"
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    def __init__(self, root: Path):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify 는 Linux 에서만 사용할 수 있습니다")
+        self.root = Path(root)
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, f"inotify_init1 실패: {os.strerror(error)}")
+        self._watches = {}    # watch 번호 → 폴더
+
+    def _add_tree(self, root: Path) -> set[Path]:
+        """root 아래 모든 폴더에 watch 추가, 발견한 파일 반환"""
+        dirs, files = _walk(root)
+        for directory in dirs:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                # 사이에 지워진 폴더는 무시, watch 개수 한도 초과(ENOSPC) 등은 폴링으로 바꾸도록 알림
+                if error == errno.ENOENT:
+                    continue
+                raise OSError(error, f"inotify_add_watch 실패 ({directory}): {os.strerror(error)}")
+            self._watches[wd] = directory
+        return set(files)
+
+    def scan(self) -> set[Path]:
+        """모든 폴더에 watch 를 걸고 현재 파일 전체 반환"""
+        return self._add_tree(self.root)
+
+    def poll(self, timeout: float) -> set[Path]:
+        """이벤트를 timeout 초까지 기다려 바뀐 파일 목록 반환"""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        data = b""
+        while True:
+            try:
+                chunk = os.read(self._fd, 1 << 16)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            data += chunk
+
+        changed = set()
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                changed |= self._add_tree(self.root)
+                continue
+            directory = self._watches.get(wd)
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changed |= self._add_tree(path)
+            else:
+                changed.add(path)
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def make_watcher(root: Path, polling: bool = False):
+    """
+    가능하면 inotify, 안 되면(다른 OS, watch 개수 한도 등) 폴링 감시기
+    Returns: (감시기, 처음 스캔한 파일 전체)
+    """
+    if not polling:
+        watcher = None
+        try:
+            watcher = InotifyWatcher(root)
+            return watcher, watcher.scan()
+        except (OSError, AttributeError) as e:
+            if watcher is not None:
+                watcher.close()
+            print(f"inotify 를 사용할 수 없어 폴링으로 감시합니다: {e}")
+    watcher = PollingWatcher(root)
+    return watcher, watcher.scan()
+
+
+# ────────────────────────────────────────────────────────────────
+# 2. 안정화 대기 (쓰는 중인 파일 제외)
+# ────────────────────────────────────────────────────────────────
+
+class Debouncer:
+    """
+    크기/수정 시각이 settle 초 동안 바뀌지 않은 파일만 ready() 로 넘깁니다.
+    (복사/전사 중인 파일은 계속 커지거나 수정 시각이 바뀌므로 기다림)
+    """
+
+    def __init__(self, settle: float = DEFAULT_SETTLE, clock=time.monotonic):
+        self.settle = settle
+        self._clock = clock
+        self._pending = {}    # 파일 → (크기, mtime_ns, 마지막으로 바뀐 시각)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def touch(self, path: Path, initial: bool = False):
+        """
+        바뀌었을 수 있는 파일 등록
+        initial: 시작 시 전체 스캔에서 찾은 파일 (수정 시각이 settle 보다 오래됐으면 바로 준비 완료)
+        """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self._pending.pop(path, None)
+            return
+        since = self._clock()
+        if initial and time.time() - st.st_mtime_ns / 1e9 >= self.settle:
+            since -= self.settle
+        previous = self._pending.get(path)
+        if previous is None or previous[:2] != (st.st_size, st.st_mtime_ns):
+            self._pending[path] = (st.st_size, st.st_mtime_ns, since)
+
+    def ready(self) -> list[tuple[Path, int]]:
+        """쓰기가 끝난 파일 [(경로, 크기)] (대기 목록에서 빠짐, 빈 파일은 계속 기다림)"""
+        now = self._clock()
+        ready = []
+        for path, (size, mtime, since) in list(self._pending.items()):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                del self._pending[path]
+                continue
+            if (st.st_size, st.st_mtime_ns) != (size, mtime):
+                self._pending[path] = (st.st_size, st.st_mtime_ns, now)
+            elif now - since >= self.settle and size > 0:
+                del self._pending[path]
+                ready.append((path, size))
+        return ready
+
+    def __contains__(self, path: Path) -> bool:
+        return path in self._pending
+
+
+# ────────────────────────────────────────────────────────────────
+# 3. 작업 대기열 (우선순위, 크기 제한, 파일 저장)
+# ────────────────────────────────────────────────────────────────
+
+class WorkQueue:
+    """
+    우선순위 작업 대기열 (여러 스레드에서 안전하게 사용)
+
+    - 같은 파일은 한 번만 대기, 처리 중인 파일이 다시 바뀌면 끝난 뒤 다시 넣음
+    - maxsize 개까지만 (가득 차면 put() 이 False → 호출 쪽에서 나중에 다시)
+    - 바뀐 내용은 flush()/close() 때 path(JSON)에 저장 (데몬은 감시 주기마다 한 번),
+      처리 중이던 파일도 저장해 재시작 후 다시 처리
+    """
+
+    def __init__(self, root: Path, path: Path | None = None, maxsize: int = DEFAULT_QUEUE_SIZE,
+                 priority: str = PRIORITY_SMALLEST):
+        if priority not in PRIORITIES:
+            raise ValueError(f"알 수 없는 우선순위: {priority}")
+        self.root = Path(root)
+        self.path = path
+        self.maxsize = maxsize
+        self.priority = priority
+        self._heap = []           # (우선순위 키, 순번, 경로)
+        self._items = {}          # 경로 → (크기, 시도 횟수) : 대기 중
+        self._active = {}         # 경로 → (크기, 시도 횟수) : 처리 중
+        self._dirty = set()       # 처리 중에 다시 바뀐 파일
+        self._seq = 0
+        self._closed = False
+        self._changed = False     # 마지막 저장 뒤에 바뀜
+        self._cond = threading.Condition()
+        if path is not None:
+            self._load()
+
+    def _key(self, size: int, attempts: int) -> tuple:
+        if self.priority == PRIORITY_SMALLEST:
+            return attempts, size
+        return (attempts,)
+
+    def _push(self, path: Path, size: int, attempts: int):
+        self._seq += 1
+        self._items[path] = (size, attempts)
+        heapq.heappush(self._heap, (self._key(size, attempts), self._seq, path))
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+    @property
+    def active(self) -> list[Path]:
+        with self._cond:
+            return list(self._active)
+
+    def put(self, path: Path, size: int, attempts: int = 0) -> bool:
+        """대기열에 추가 (이미 대기 중이면 True, 가득 차면 False)"""
+        with self._cond:
+            if path in self._items:
+                return True
+            if path in self._active:
+                self._dirty.add(path)
+                return True
+            if len(self._items) >= self.maxsize:
+                return False
+            self._push(path, size, attempts)
+            self._changed = True
+            self._cond.notify()
+            return True
+
+    def get(self, timeout: float | None = None) -> tuple[Path, int] | None:
+        """우선순위가 가장 높은 (경로, 시도 횟수). timeout 동안 없거나 닫히면 None"""
+        with self._cond:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._heap and not self._closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            if self._closed:
+                return None
+            _, _, path = heapq.heappop(self._heap)
+            size, attempts = self._items.pop(path)
+            self._active[path] = (size, attempts)
+            self._changed = True
+            return path, attempts
+
+    def done(self, path: Path, retry: bool = False, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> bool:
+        """
+        처리 끝 (retry=True 면 실패 → 시도 횟수를 늘려 뒤로, max_attempts 를 넘으면 버림)
+        처리 중에 파일이 다시 바뀌었으면 다시 넣음. 다시 넣었으면 True
+        """
+        with self._cond:
+            size, attempts = self._active.pop(path)
+            dirty = path in self._dirty
+            self._dirty.discard(path)
+            requeue = (retry and attempts + 1 < max_attempts) or dirty
+            if requeue and path not in self._items:
+                self._push(path, size, attempts + 1 if retry else 0)
+                self._cond.notify()
+            self._changed = True
+            return requeue
+
+    def flush(self):
+        """마지막 저장 뒤에 바뀌었으면 파일에 저장 (put/get/done 마다 쓰지 않고 모아서 한 번)"""
+        with self._cond:
+            if self._changed:
+                self._save()
+
+    def close(self):
+        """대기 중인 get() 을 모두 깨워 None 반환 (남은 작업은 파일에 그대로)"""
+        with self._cond:
+            self._closed = True
+            self._save()
+            self._cond.notify_all()
+
+    # ── 저장 / 불러오기 ─────────────────────────────────────────
+
+    def relative(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return str(path)
+
+    def _save(self):
+        """대기 + 처리 중 목록 저장 (임시 파일에 쓴 뒤 교체, 잠금 안에서 호출)"""
+        self._changed = False
+        if self.path is None:
+            return
+        # 처리 중이던 파일이 먼저 (재시작하면 이어서)
+        entries = list(self._active.items()) + [
+            (path, self._items[path]) for _, _, path in sorted(self._heap) if path in self._items
+        ]
+        state = {
+            "saved": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "items": [
+                {"path": self.relative(path), "size": size, "attempts": attempts}
+                for path, (size, attempts) in entries
+            ],
+        }
+        temp = self.path.with_suffix(self.path.suffix + ".tmp")
+        temp.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(temp, self.path)
+
+    def _load(self):
+        try:
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"작업 대기열 파일을 읽지 못해 새로 시작합니다 ({self.path}): {e}")
+            return
+        for item in state.get("items", []):
+            path = self.root / item["path"]
+            if path.exists() and path not in self._items:
+                self._push(path, item.get("size", 0), item.get("attempts", 0))
+
+
+# ────────────────────────────────────────────────────────────────
+# 4. 데몬
+# ────────────────────────────────────────────────────────────────
+
+class WatchStats:
+    """처리 통계 (상태 파일용, 여러 스레드에서 안전하게 사용)"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.processed = 0
+        self.skipped = 0                 # handler 가 False 를 돌려준 파일 (처리할 필요 없었음)
+        self.failed = 0
+        self.last = None                 # 마지막으로 처리한 파일 (상대 경로)
+        self._recent = deque()           # (끝난 시각, 걸린 시간)
+        self._lock = threading.Lock()
+
+    def record(self, name: str, elapsed: float, ok: bool, skipped: bool = False):
+        now = time.time()
+        with self._lock:
+            if skipped:
+                self.skipped += 1
+                return
+            if ok:
+                self.processed += 1
+            else:
+                self.failed += 1
+            self.last = name
+            self._recent.append((now, elapsed))
+            while self._recent and now - self._recent[0][0] > THROUGHPUT_WINDOW:
+                self._recent.popleft()
+
+    def throughput(self) -> tuple[float, float | None]:
+        """(최근 구간 분당 처리 파일 수, 파일당 평균 처리 시간(초) 또는 None)"""
+        now = time.time()
+        with self._lock:
+            recent = [elapsed for at, elapsed in self._recent if now - at <= THROUGHPUT_WINDOW]
+        window = min(THROUGHPUT_WINDOW, max(now - self.started, 1.0))
+        average = sum(recent) / len(recent) if recent else None
+        return len(recent) * 60.0 / window, average
+
+
+class WatchDaemon:
+    """
+    폴더 감시 데몬
+
+    daemon = WatchDaemon(root, handler, accept=is_source)
+    daemon.run()        # stop 이벤트가 설정되거나 Ctrl+C 까지
+
+    handler(path) 는 작업자 스레드에서 호출되며, 예외가 나면 max_attempts 번까지 다시 시도합니다.
+    (False 를 돌려주면 처리할 필요가 없었던 파일로 따로 집계)
+    """
+
+    def __init__(self, root: Path, handler, accept=None, workers: int = 1,
+                 settle: float = DEFAULT_SETTLE, interval: float = DEFAULT_INTERVAL,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, priority: str = PRIORITY_SMALLEST,
+                 polling: bool = False, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 queue_path: Path | None = None, status_path: Path | None = None):
+        self.root = Path(root).resolve()
+        self.handler = handler
+        self.accept = accept or (lambda path: True)
+        self.workers = max(1, workers)
+        self.interval = interval
+        self.polling = polling
+        self.max_attempts = max_attempts
+        self.status_path = status_path or self.root / STATUS_NAME
+        self.queue = WorkQueue(self.root, queue_path or self.root / QUEUE_NAME, queue_size, priority)
+        self.debouncer = Debouncer(settle)
+        self.backlog = deque()      # 쓰기가 끝났지만 대기열이 가득 차 아직 넣지 못한 파일
+        self.stats = WatchStats()
+        self.stop = threading.Event()
+        self.watcher = None
+
+    def _worker(self):
+        while not self.stop.is_set():
+            item = self.queue.get(timeout=self.interval)
+            if item is None:
+                continue
+            path, attempts = item
+            start = time.perf_counter()
+            ok, skipped = True, False
+            try:
+                skipped = self.handler(path) is False
+            except Exception as e:
+                ok = False
+                print(f"!!! 처리 실패 ({attempts + 1}/{self.max_attempts}): {path}: {e}")
+            self.stats.record(self.queue.relative(path), time.perf_counter() - start, ok, skipped)
+            self.queue.done(path, retry=not ok, max_attempts=self.max_attempts)
+
+    def _offer(self, paths, initial: bool = False):
+        for path in paths:
+            try:
+                if self.accept(path):
+                    self.debouncer.touch(path, initial=initial)
+            except OSError:
+                pass    # 판정 중에 지워지거나 이동한 파일
+
+    def _fill_queue(self):
+        """대기열에 자리가 있는 만큼 backlog 에서 옮김 (그 사이 다시 쓰이기 시작한 파일은 안정화 대기로)"""
+        while self.backlog:
+            path, size = self.backlog[0]
+            if path not in self.debouncer and not self.queue.put(path, size):
+                break   # 대기열이 가득 참 → 다음 주기에 다시
+            self.backlog.popleft()
+
+    def write_status(self):
+        """상태 파일 기록 (대기열 길이, 처리 중, 처리량 등)"""
+        per_minute, average = self.stats.throughput()
+        status = {
+            "updated": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.stats.started)),
+            "pid": os.getpid(),
+            "watcher": self.watcher.name if self.watcher is not None else None,
+            "queue_depth": len(self.queue),
+            "queue_limit": self.queue.maxsize,
+            "settling": len(self.debouncer),
+            "backlog": len(self.backlog),
+            "active": [self.queue.relative(path) for path in self.queue.active],
+            "workers": self.workers,
+            "processed": self.stats.processed,
+            "skipped": self.stats.skipped,
+            "failed": self.stats.failed,
+            "files_per_minute": round(per_minute, 2),
+            "average_seconds": round(average, 3) if average is not None else None,
+            "last_processed": self.stats.last,
+        }
+        temp = self.status_path.with_suffix(self.status_path.suffix + ".tmp")
+        temp.write_text(json.dumps(status, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(temp, self.status_path)
+
+    def run(self, status_every: float = 5.0):
+        """감시 시작 (stop 이 설정되거나 Ctrl+C 까지, 끝날 때 처리 중인 파일은 마저 처리)"""
+        self.watcher, files = make_watcher(self.root, self.polling)
+        print(f"폴더 감시 시작: {self.root} ({self.watcher.name}, 작업자 {self.workers}개, "
+              f"대기열 {len(self.queue)}개 복원)")
+        self._offer(files, initial=True)
+
+        threads = [threading.Thread(target=self._worker, name=f"watch-worker-{i}", daemon=True)
+                   for i in range(self.workers)]
+        for thread in threads:
+            thread.start()
+
+        last_status = 0.0
+        try:
+            while not self.stop.is_set():
+                self.backlog.extend(self.debouncer.ready())
+                self._fill_queue()
+                self.queue.flush()
+                if time.monotonic() - last_status >= status_every:
+                    self.write_status()
+                    last_status = time.monotonic()
+                self._offer(self.watcher.poll(self.interval))
+        except KeyboardInterrupt:
+            print("\n중지 요청: 처리 중인 파일을 마치고 종료합니다.")
+        finally:
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+            self.queue.close()
+            self.watcher.close()
+            self.write_status()
+            print(f"폴더 감시 종료: 처리 {self.stats.processed}개, 실패 {self.stats.failed}개, "
+                  f"대기열 {len(self.queue)}개 남음 ({self.queue.path})")